@@ -0,0 +1,55 @@
+"""
+`GET /contacts` pages listed by the database versus from the owner's
+in-process address book, for an owner of the seeded table (see bench_contact_indexes.py).
+
+    PYTHONPATH=src:. python benchmarks/bench_address_book.py [limit]
+"""
+import asyncio
+import sys
+
+from benchmarks.common import SETTINGS, app_client, measure
+from contacts.helpers.address_book import AddressBooks
+from contacts.helpers.security import generate_jwt
+from contacts.models.schemas.auth import PayloadData
+
+
+FIRST_SEED_USER_ID = 2_100_000_000
+REQUESTS = 500
+
+
+async def main(limit: int) -> None:
+    async with app_client() as client:
+        token = generate_jwt(
+            PayloadData(sub=FIRST_SEED_USER_ID, role="user"),
+            lifespan_min=30,
+            secret=SETTINGS.secret,
+        )
+        headers = {"Authorization": f"Bearer {token}"}
+        shapes = {
+            "first page": {"limit": limit},
+            "by organisation": {"limit": limit, "order_by": "organisation"},
+        }
+        first = await client.get("/contacts", params={"limit": limit}, headers=headers)
+        first.raise_for_status()
+        shapes["second page"] = {"limit": limit, "cursor": first.json()["next_cursor"]}
+
+        enabled = AddressBooks(
+            budget_bytes=SETTINGS.contacts_address_book_budget_bytes,
+            ttl_s=SETTINGS.contacts_address_book_ttl_s,
+            max_contacts=SETTINGS.contacts_address_book_max_contacts,
+        )
+        for address_books in (None, enabled):
+            client.app.state.address_books = address_books
+            source = "address book" if address_books else "database"
+            for name, params in shapes.items():
+                await measure(
+                    f"GET /contacts {name} ({source})",
+                    lambda params=params: client.get("/contacts", params=params, headers=headers),
+                    requests=REQUESTS,
+                )
+
+        print(enabled.stats)
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 20))
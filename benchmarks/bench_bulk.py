@@ -0,0 +1,52 @@
+"""
+Contacts created per second, one POST /contacts each against POST /contacts/bulk.
+
+    PYTHONPATH=src:. python benchmarks/bench_bulk.py [contacts] [batch_size]
+"""
+import asyncio
+import sys
+import time
+import uuid
+
+from benchmarks.common import app_client, create_bench_user, login
+
+
+def contact_json() -> dict:
+    return {
+        "last_name": "Ivanov",
+        "first_name": "Ivan",
+        "middle_name": "Ivanovich",
+        "organisation": "Acme",
+        "job_title": "Engineer",
+        "email": f"{uuid.uuid4().hex[:10]}@example.com",
+        "phone_number": str(uuid.uuid4().int)[:11],
+    }
+
+
+async def main(contacts: int, batch_size: int) -> None:
+    async with app_client() as client:
+        _, username, password = await create_bench_user(client)
+        headers = {"Authorization": f"Bearer {(await login(client, username, password))['access_token']}"}
+
+        started_at = time.perf_counter()
+        for _ in range(contacts):
+            response = await client.post("/contacts", json=contact_json(), headers=headers)
+            response.raise_for_status()
+        single_s = time.perf_counter() - started_at
+
+        started_at = time.perf_counter()
+        for _ in range(0, contacts, batch_size):
+            batch = [contact_json() for _ in range(batch_size)]
+            response = await client.post("/contacts/bulk", json={"contacts": batch}, headers=headers)
+            response.raise_for_status()
+            assert response.json()["created"] == batch_size
+        bulk_s = time.perf_counter() - started_at
+
+        print(f"POST /contacts         {contacts / single_s:9.1f} contacts/s")
+        print(f"POST /contacts/bulk    {contacts / bulk_s:9.1f} contacts/s  (batches of {batch_size})")
+
+
+if __name__ == "__main__":
+    contacts = int(sys.argv[1]) if len(sys.argv) > 1 else 2_000
+    batch_size = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+    asyncio.run(main(contacts, batch_size))
@@ -0,0 +1,70 @@
+"""
+Connection pool checkouts, transactions and statements issued per request.
+
+    PYTHONPATH=src:. python benchmarks/bench_checkouts.py
+"""
+import asyncio
+import uuid
+
+from sqlalchemy import event
+
+from benchmarks.common import app_client, create_bench_user, login
+
+
+def contact_json() -> dict:
+    return {
+        "last_name": "Ivanov",
+        "first_name": "Ivan",
+        "middle_name": "Ivanovich",
+        "organisation": "Acme",
+        "job_title": "Engineer",
+        "email": f"{uuid.uuid4().hex[:10]}@example.com",
+        "phone_number": str(uuid.uuid4().int)[:11],
+    }
+
+
+async def main() -> None:
+    async with app_client() as client:
+        engine = client.app.state.engine.sync_engine
+        counters = {"checkouts": 0, "transactions": 0, "statements": 0}
+
+        @event.listens_for(engine.pool, "checkout")
+        def on_checkout(*args) -> None:
+            counters["checkouts"] += 1
+
+        @event.listens_for(engine, "begin")
+        def on_begin(*args) -> None:
+            counters["transactions"] += 1
+
+        @event.listens_for(engine, "before_cursor_execute")
+        def on_execute(*args) -> None:
+            counters["statements"] += 1
+
+        _, username, password = await create_bench_user(client)
+        headers = {"Authorization": f"Bearer {(await login(client, username, password))['access_token']}"}
+        contact_id = (await client.post("/contacts", json=contact_json(), headers=headers)).json()["contact"]["id"]
+
+        requests = {
+            "POST /contacts": lambda: client.post("/contacts", json=contact_json(), headers=headers),
+            "GET /contacts": lambda: client.get("/contacts", headers=headers),
+            "PUT /contacts/{id}": lambda: client.put(f"/contacts/{contact_id}", json=contact_json(), headers=headers),
+            "GET /users/me": lambda: client.get("/users/me", headers=headers),
+            "DELETE /contacts/{id}": lambda: client.delete(f"/contacts/{contact_id}", headers=headers),
+            "POST /users/register": lambda: client.post(
+                "/users/register",
+                json={"username": f"bench-{uuid.uuid4().hex[:12]}", "password": "bench", "role": "user"},
+            ),
+        }
+        for name, request in requests.items():
+            counters.update(checkouts=0, transactions=0, statements=0)
+            response = await request()
+            response.raise_for_status()
+            print(
+                f"{name:<24} checkouts {counters['checkouts']}  "
+                f"transactions {counters['transactions']}  "
+                f"statements {counters['statements']}"
+            )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
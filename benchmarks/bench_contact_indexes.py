@@ -0,0 +1,114 @@
+"""
+`GET /contacts` latency on a large seeded table, to compare with and
+without the contact indexes (revision 0c6a3f8e2d47).
+
+    PYTHONPATH=src:. python benchmarks/bench_contact_indexes.py [rows] [owners]
+    alembic downgrade e98411ac11b6
+    PYTHONPATH=src:. python benchmarks/bench_contact_indexes.py [rows] [owners]
+    alembic upgrade head
+
+Seeded users and contacts are kept between runs, pass `--cleanup` to remove them.
+"""
+import asyncio
+import sys
+
+from sqlalchemy import text
+
+from benchmarks.common import SETTINGS, app_client, measure
+from contacts.helpers.security import generate_jwt
+from contacts.models.schemas.auth import PayloadData
+
+
+FIRST_SEED_USER_ID = 2_100_000_000
+REQUESTS = 50
+SORT_COLUMNS = ("last_name", "organisation", "phone_number")
+
+SEED_USERS = text("""
+    INSERT INTO users (id, username, hashed_password, role)
+    SELECT :first_id + n, 'seed-' || n, '!', 'user'
+    FROM generate_series(0, :owners - 1) AS n
+    ON CONFLICT DO NOTHING
+""")
+SEED_CONTACTS = text("""
+    INSERT INTO contacts (
+        id, owner_id, last_name, first_name, middle_name,
+        organisation, job_title, email, phone_number
+    )
+    SELECT
+        gen_random_uuid(),
+        :first_id + n % :owners,
+        'last-' || substr(md5(random()::text), 1, 10),
+        'first-' || substr(md5(random()::text), 1, 10),
+        'middle-' || substr(md5(random()::text), 1, 10),
+        'org-' || (random() * 500)::int,
+        'job-' || (random() * 50)::int,
+        substr(md5(random()::text), 1, 12) || '@example.com',
+        lpad(((random() * 1e10)::bigint)::text, 11, '7')
+    FROM generate_series(1, :rows) AS n
+    ON CONFLICT DO NOTHING
+""")
+SEEDED_CONTACTS = text("SELECT count(*) FROM contacts WHERE owner_id >= :first_id")
+DELETE_SEEDED = (
+    text("DELETE FROM contacts WHERE owner_id >= :first_id"),
+    text("DELETE FROM users WHERE id >= :first_id"),
+)
+
+
+async def seed(engine, rows: int, owners: int) -> None:
+    async with engine.begin() as conn:
+        seeded = await conn.scalar(SEEDED_CONTACTS, {"first_id": FIRST_SEED_USER_ID})
+        if seeded >= rows:
+            return
+        print(f"seeding {rows - seeded} contacts for {owners} users...")
+        params = {"first_id": FIRST_SEED_USER_ID, "owners": owners, "rows": rows - seeded}
+        await conn.execute(SEED_USERS, params)
+        await conn.execute(SEED_CONTACTS, params)
+        await conn.execute(text("ANALYZE contacts"))
+
+
+async def explain(engine, order_by: str) -> str:
+    """Scan node and execution time of the query behind the endpoint"""
+    async with engine.connect() as conn:
+        plan = await conn.execute(
+            text(
+                "EXPLAIN ANALYZE SELECT * FROM contacts "
+                f"WHERE owner_id = :owner_id ORDER BY {order_by}"
+            ),
+            {"owner_id": FIRST_SEED_USER_ID},
+        )
+        lines = plan.scalars().all()
+        scan = next(line for line in lines if "Scan" in line).strip(" ->")
+        return f"{scan.split('  (')[0]}, {lines[-1]}"
+
+
+async def main(rows: int, owners: int) -> None:
+    async with app_client() as client:
+        engine = client.app.state.engine
+        if "--cleanup" in sys.argv:
+            async with engine.begin() as conn:
+                for stmt in DELETE_SEEDED:
+                    await conn.execute(stmt, {"first_id": FIRST_SEED_USER_ID})
+            return
+
+        await seed(engine, rows, owners)
+        token = generate_jwt(
+            PayloadData(sub=FIRST_SEED_USER_ID, role="user"),
+            lifespan_min=30,
+            secret=SETTINGS.secret,
+        )
+        headers = {"Authorization": f"Bearer {token}"}
+        print(f"{rows} contacts, ~{rows // owners} per user")
+        for order_by in SORT_COLUMNS:
+            print(f"  {await explain(engine, order_by)}")
+            await measure(
+                f"GET /contacts?order_by={order_by}",
+                lambda: client.get("/contacts", params={"order_by": order_by}, headers=headers),
+                requests=REQUESTS,
+            )
+
+
+if __name__ == "__main__":
+    args = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    rows = int(args[0]) if args else 1_000_000
+    owners = int(args[1]) if len(args) > 1 else 1_000
+    asyncio.run(main(rows, owners))
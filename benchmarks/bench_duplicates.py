@@ -0,0 +1,143 @@
+"""
+Throughput, memory and recall of the duplicate contacts detection job.
+
+Seeds owners whose contacts are drawn from a small pool of names, then
+plants a reformatted copy of some of them: different case, email alias,
+8 instead of the +7 trunk prefix, a typo in half of the last names.
+
+    PYTHONPATH=src:. python benchmarks/bench_duplicates.py [rows] [owners] [workers]
+
+Seeded users and contacts are kept between runs, pass `--cleanup` to remove them.
+"""
+import asyncio
+import resource
+import sys
+import time
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from benchmarks.common import SETTINGS
+from contacts.db.events import create_engine
+from contacts.helpers.duplicate_detection import DuplicateDetection
+
+
+FIRST_SEED_USER_ID = 2_110_000_000
+PLANTED_SHARE = 0.05
+
+SEED_USERS = text("""
+    INSERT INTO users (id, username, hashed_password, role)
+    SELECT :first_id + n, 'dup-seed-' || n, '!', 'user'
+    FROM generate_series(0, :owners - 1) AS n
+    ON CONFLICT DO NOTHING
+""")
+SEED_CONTACTS = text("""
+    INSERT INTO contacts (
+        id, owner_id, last_name, first_name, middle_name,
+        organisation, job_title, email, phone_number
+    )
+    SELECT
+        gen_random_uuid(), :first_id + n % :owners, last_name, first_name, NULL,
+        'org', 'job', lower(first_name || '.' || last_name) || (random() * 100)::int || '@example.com',
+        '7' || lpad(((random() * 1e10)::bigint)::text, 10, '0')
+    FROM (
+        SELECT
+            n,
+            initcap(substr(md5('last' || (random() * 2000)::int), 1, 7)) AS last_name,
+            initcap(substr(md5('first' || (random() * 300)::int), 1, 5)) AS first_name
+        FROM generate_series(1, :rows) AS n
+    ) AS names
+    ON CONFLICT DO NOTHING
+""")
+# job_title remembers the original, so recall can be measured
+PLANT_DUPLICATES = text("""
+    INSERT INTO contacts (
+        id, owner_id, last_name, first_name, middle_name,
+        organisation, job_title, email, phone_number
+    )
+    SELECT
+        gen_random_uuid(), owner_id,
+        CASE WHEN random() < 0.5 THEN upper(last_name) ELSE last_name || 'a' END,
+        lower(first_name), NULL, organisation, 'dup ' || id,
+        replace(split_part(email, '@', 1), '.', '') || '+home@example.com',
+        '8 (' || substr(phone_number, 2, 3) || ') ' || substr(phone_number, 5)
+    FROM contacts
+    WHERE owner_id >= :first_id AND random() < :share
+    ON CONFLICT DO NOTHING
+""")
+SEEDED_CONTACTS = text("SELECT count(*) FROM contacts WHERE owner_id >= :first_id")
+PLANTED_FOUND = text("""
+    SELECT count(*), count(original.contact_id)
+    FROM contacts AS copy
+    LEFT JOIN contact_duplicates AS found ON found.contact_id = copy.id
+    LEFT JOIN contact_duplicates AS original
+        ON original.contact_id = substr(copy.job_title, 5)::uuid
+        AND original.cluster_id = found.cluster_id
+    WHERE copy.owner_id >= :first_id AND copy.job_title LIKE 'dup %'
+""")
+DELETE_SEEDED = (
+    text("DELETE FROM contacts WHERE owner_id >= :first_id"),
+    text("DELETE FROM users WHERE id >= :first_id"),
+)
+
+
+async def seed(engine, rows: int, owners: int) -> None:
+    async with engine.begin() as conn:
+        seeded = await conn.scalar(SEEDED_CONTACTS, {"first_id": FIRST_SEED_USER_ID})
+        if seeded >= rows:
+            return
+        print(f"seeding {rows} contacts for {owners} users...")
+        params = {"first_id": FIRST_SEED_USER_ID, "owners": owners, "rows": rows, "share": PLANTED_SHARE}
+        await conn.execute(SEED_USERS, params)
+        await conn.execute(SEED_CONTACTS, params)
+        await conn.execute(PLANT_DUPLICATES, params)
+        await conn.execute(text("ANALYZE contacts"))
+
+
+async def main(rows: int, owners: int, workers: int) -> None:
+    engine = create_engine(SETTINGS.async_db_conn_str, SETTINGS)
+    try:
+        if "--cleanup" in sys.argv:
+            async with engine.begin() as conn:
+                for stmt in DELETE_SEEDED:
+                    await conn.execute(stmt, {"first_id": FIRST_SEED_USER_ID})
+            return
+
+        await seed(engine, rows, owners)
+        detection = DuplicateDetection(
+            workers=workers,
+            batch_size=SETTINGS.contacts_duplicates_batch_size,
+            fetch_size=SETTINGS.contacts_duplicates_fetch_size,
+            threshold=SETTINGS.contacts_duplicates_threshold,
+            max_block=SETTINGS.contacts_duplicates_max_block,
+        )
+        started_at = time.perf_counter()
+        stats = await detection.run(async_sessionmaker(engine, expire_on_commit=False))
+        elapsed_s = time.perf_counter() - started_at
+
+        async with engine.connect() as conn:
+            planted, found = (await conn.execute(PLANTED_FOUND, {"first_id": FIRST_SEED_USER_ID})).one()
+    finally:
+        await engine.dispose()
+
+    print(
+        f"{stats['contacts']} contacts in {elapsed_s:.1f} s ({stats['contacts'] / elapsed_s:.0f} contacts/s) "
+        f"with {workers} workers"
+    )
+    print(
+        f"pairs scored {stats['pairs_scored']}, blocks skipped {stats['blocks_skipped']}, "
+        f"clusters {stats['clusters']}, duplicates {stats['duplicates']}"
+    )
+    print(f"planted duplicates found {found} of {planted} ({found / planted:.1%})")
+    print(
+        f"peak RSS {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss // 1024} MiB, "
+        f"largest worker {resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss // 1024} MiB"
+    )
+
+
+if __name__ == "__main__":
+    args = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    rows = int(args[0]) if args else 1_000_000
+    owners = int(args[1]) if len(args) > 1 else 1_000
+    workers = int(args[2]) if len(args) > 2 else SETTINGS.contacts_duplicates_workers
+    asyncio.run(main(rows, owners, workers))
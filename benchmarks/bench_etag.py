@@ -0,0 +1,60 @@
+"""
+`GET /contacts` and `GET /users/me` answered in full versus revalidated
+with `If-None-Match`, for an owner of the seeded table (see bench_contact_indexes.py).
+
+    PYTHONPATH=src:. python benchmarks/bench_etag.py [limit]
+"""
+import asyncio
+import sys
+
+from benchmarks.common import SETTINGS, app_client, create_bench_user, login, measure
+from contacts.helpers.security import generate_jwt
+from contacts.models.schemas.auth import PayloadData
+
+
+FIRST_SEED_USER_ID = 2_100_000_000
+REQUESTS = 200
+
+
+async def main(limit: int) -> None:
+    async with app_client() as client:
+        token = generate_jwt(
+            PayloadData(sub=FIRST_SEED_USER_ID, role="user"),
+            lifespan_min=30,
+            secret=SETTINGS.secret,
+        )
+        headers = {"Authorization": f"Bearer {token}"}
+        params = {"limit": limit}
+        response = await client.get("/contacts", params=params, headers=headers)
+        response.raise_for_status()
+        conditional = {**headers, "If-None-Match": response.headers["ETag"]}
+        print(f"page of {len(response.json()['contacts'])} contacts, {len(response.content)} bytes")
+
+        await measure(
+            "GET /contacts",
+            lambda: client.get("/contacts", params=params, headers=headers),
+            requests=REQUESTS,
+        )
+        await measure(
+            "GET /contacts (304)",
+            lambda: client.get("/contacts", params=params, headers=conditional),
+            requests=REQUESTS,
+        )
+
+        _, username, password = await create_bench_user(client)
+        me_headers = {"Authorization": f"Bearer {(await login(client, username, password))['access_token']}"}
+        me_etag = (await client.get("/users/me", headers=me_headers)).headers["ETag"]
+        await measure("GET /users/me", lambda: client.get("/users/me", headers=me_headers), requests=REQUESTS)
+        await measure(
+            "GET /users/me (304)",
+            lambda: client.get("/users/me", headers={**me_headers, "If-None-Match": me_etag}),
+            requests=REQUESTS,
+        )
+
+        stats = client.app.state.conditional_gets.stats
+        for route, counters in stats.items():
+            print(f"{route}: {counters['not_modified']} of {counters['tagged']} not modified")
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000))
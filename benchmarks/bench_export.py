@@ -0,0 +1,83 @@
+"""
+Time to first byte, throughput and memory growth of GET /contacts/export
+as an admin, over every contact in the table and over one seeded owner's.
+The whole table has to be sorted before the first row, one owner's contacts
+are read in order from the (owner_id, <column>, id) index.
+The app is driven over ASGI, the test client would buffer the whole body.
+
+    PYTHONPATH=src:. python benchmarks/bench_export.py
+
+Seed a large table first, e.g. with bench_contact_indexes.py.
+"""
+import asyncio
+import os
+import time
+
+from benchmarks.bench_contact_indexes import FIRST_SEED_USER_ID
+from benchmarks.common import SETTINGS, app_client, create_bench_user, login
+
+
+def current_rss() -> int:
+    with open("/proc/self/statm") as statm:
+        return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+
+async def export(app, query_string: str, token: str) -> None:
+    path = f"{SETTINGS.api_prefix}/contacts/export"
+    scope = {
+        "type": "http",
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": query_string.encode(),
+        "root_path": "",
+        "headers": [(b"authorization", f"Bearer {token}".encode())],
+        "client": ("127.0.0.1", 1),
+        "server": ("127.0.0.1", 8000),
+    }
+    requested = False
+
+    async def receive() -> dict:
+        nonlocal requested
+        if requested:
+            await asyncio.Event().wait()
+        requested = True
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    stats = {"bytes": 0, "first_byte_s": None, "peak_rss": current_rss()}
+    rss_before = stats["peak_rss"]
+    started_at = time.perf_counter()
+
+    async def send(message: dict) -> None:
+        if message["type"] != "http.response.body" or not message.get("body"):
+            return
+        if stats["first_byte_s"] is None:
+            stats["first_byte_s"] = time.perf_counter() - started_at
+        stats["bytes"] += len(message["body"])
+        stats["peak_rss"] = max(stats["peak_rss"], current_rss())
+
+    await app(scope, receive, send)
+    elapsed = time.perf_counter() - started_at
+    print(
+        f"{query_string:<32} {stats['bytes'] / 2 ** 20:8.1f} MiB in {elapsed:6.1f} s  "
+        f"first byte {stats['first_byte_s'] * 1000:7.1f} ms  "
+        f"RSS growth {(stats['peak_rss'] - rss_before) / 2 ** 20:6.1f} MiB"
+    )
+
+
+async def main() -> None:
+    async with app_client() as client:
+        _, username, password = await create_bench_user(client, role="admin")
+        token = (await login(client, username, password))["access_token"]
+        for query_string in (
+            "format=csv",
+            "format=vcf",
+            f"format=csv&owner_id={FIRST_SEED_USER_ID}",
+        ):
+            await export(client.app, query_string, token)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
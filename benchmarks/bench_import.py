@@ -0,0 +1,64 @@
+"""
+CSV import throughput and the process's memory growth while it runs.
+A tenth of the rows repeat an earlier number, so the merge has duplicates to skip.
+
+    PYTHONPATH=src:. python benchmarks/bench_import.py [rows]
+"""
+import asyncio
+import os
+import sys
+import time
+
+from sqlalchemy import delete
+
+from benchmarks.common import app_client, create_bench_user, login
+from contacts.models.db.tables import Contact
+
+
+def current_rss() -> int:
+    with open("/proc/self/statm") as statm:
+        return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+
+async def csv_body(rows: int, peak: list[int]):
+    yield b"last_name,first_name,middle_name,organisation,job_title,email,phone_number\n"
+    lines = []
+    for row in range(rows):
+        number = row - row % 10 if row % 10 == 9 else row
+        lines.append(f"Ivanov,Ivan,Ivanovich,Acme,Engineer,i{row}@example.com,{70_000_000_000 + number}\n")
+        if len(lines) == 1_000:
+            peak[0] = max(peak[0], current_rss())
+            yield "".join(lines).encode()
+            lines = []
+    if lines:
+        yield "".join(lines).encode()
+
+
+async def main(rows: int) -> None:
+    async with app_client() as client:
+        user_id, username, password = await create_bench_user(client)
+        headers = {
+            "Authorization": f"Bearer {(await login(client, username, password))['access_token']}",
+            "Content-Type": "text/csv",
+        }
+
+        rss_before = current_rss()
+        peak = [rss_before]
+        started_at = time.perf_counter()
+        response = await client.post("/contacts/import", content=csv_body(rows, peak), headers=headers, timeout=None)
+        response.raise_for_status()
+        elapsed = time.perf_counter() - started_at
+        report = response.json()
+
+        print(
+            f"{rows} rows in {elapsed:.1f} s ({rows / elapsed:.0f} rows/s), "
+            f"accepted {report['accepted']} rejected {report['rejected']} duplicated {report['duplicated']}"
+        )
+        print(f"RSS growth {(peak[0] - rss_before) / 2 ** 20:.1f} MiB")
+
+        async with client.app.state.engine.begin() as conn:
+            await conn.execute(delete(Contact).where(Contact.owner_id == user_id))
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000))
@@ -0,0 +1,75 @@
+"""
+Cost of a `GET /contacts` page by depth, keyset cursor against OFFSET.
+Seeds one user with `rows` contacts (shared with bench_contact_indexes).
+
+    PYTHONPATH=src:. python benchmarks/bench_pagination.py [rows]
+    PYTHONPATH=src:. python benchmarks/bench_contact_indexes.py --cleanup
+"""
+import asyncio
+import sys
+
+from sqlalchemy import text
+
+from benchmarks.common import SETTINGS, app_client, measure
+from benchmarks.bench_contact_indexes import FIRST_SEED_USER_ID, seed
+from contacts.helpers.pagination import encode_cursor
+from contacts.helpers.security import generate_jwt
+from contacts.models.schemas.auth import PayloadData
+from contacts.models.schemas.meta import ContactsCursor
+
+
+PAGE_SIZE = 100
+REQUESTS = 30
+ORDER_BY = "last_name"
+
+ROW_AT = text(
+    f"SELECT {ORDER_BY}, id FROM contacts WHERE owner_id = :owner_id "
+    f"ORDER BY {ORDER_BY}, id OFFSET :offset LIMIT 1"
+)
+OFFSET_PAGE = text(
+    f"EXPLAIN ANALYZE SELECT * FROM contacts WHERE owner_id = :owner_id "
+    f"ORDER BY {ORDER_BY}, id OFFSET :offset LIMIT {PAGE_SIZE + 1}"
+)
+KEYSET_PAGE = text(
+    f"EXPLAIN ANALYZE SELECT * FROM contacts WHERE owner_id = :owner_id "
+    f"AND ({ORDER_BY}, id) > (:value, :id) ORDER BY {ORDER_BY}, id LIMIT {PAGE_SIZE + 1}"
+)
+
+
+async def execution_time(conn, stmt, params: dict) -> str:
+    plan = (await conn.execute(stmt, params)).scalars().all()
+    return plan[-1].split(": ")[1]
+
+
+async def main(rows: int) -> None:
+    async with app_client() as client:
+        engine = client.app.state.engine
+        await seed(engine, rows, owners=1)
+
+        token = generate_jwt(
+            PayloadData(sub=FIRST_SEED_USER_ID, role="user"),
+            lifespan_min=30,
+            secret=SETTINGS.secret,
+        )
+        headers = {"Authorization": f"Bearer {token}"}
+
+        for depth in (0, rows // 10, rows // 2, rows - PAGE_SIZE - 1):
+            params = {"owner_id": FIRST_SEED_USER_ID, "offset": max(depth - 1, 0)}
+            async with engine.connect() as conn:
+                value, id = (await conn.execute(ROW_AT, params)).one()
+                offset_ms = await execution_time(conn, OFFSET_PAGE, {**params, "offset": depth})
+                keyset_ms = await execution_time(conn, KEYSET_PAGE, {**params, "value": value, "id": id})
+
+            query = {"order_by": ORDER_BY, "limit": PAGE_SIZE}
+            if depth:
+                query["cursor"] = encode_cursor(ContactsCursor(order_by=ORDER_BY, value=value, id=id))
+            print(f"row {depth:>8}: OFFSET query {offset_ms}, keyset query {keyset_ms}")
+            await measure(
+                f"  GET /contacts from row {depth}",
+                lambda: client.get("/contacts", params=query, headers=headers),
+                requests=REQUESTS,
+            )
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000))
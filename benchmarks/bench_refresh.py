@@ -0,0 +1,38 @@
+"""
+Refresh-token exchange versus password login throughput.
+
+    PYTHONPATH=src:. python benchmarks/bench_refresh.py [requests] [concurrency]
+"""
+import asyncio
+import sys
+
+from benchmarks.common import app_client, create_bench_user, login, measure
+
+
+async def main(requests: int, concurrency: int) -> None:
+    async with app_client() as client:
+        _, username, password = await create_bench_user(client)
+
+        await measure(
+            "password login",
+            lambda: login(client, username, password),
+            requests=requests,
+            concurrency=concurrency,
+        )
+
+        tokens = [(await login(client, username, password))["refresh_token"] for _ in range(concurrency)]
+
+        async def refresh(slot: list[str] = tokens) -> None:
+            # every worker keeps rotating its own token chain
+            token = slot.pop()
+            response = await client.post("/auth/refresh", json={"refresh_token": token})
+            response.raise_for_status()
+            slot.append(response.json()["refresh_token"])
+
+        await measure("refresh token", refresh, requests=requests, concurrency=concurrency)
+
+
+if __name__ == "__main__":
+    requests = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    asyncio.run(main(requests, concurrency))
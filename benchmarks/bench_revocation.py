@@ -0,0 +1,39 @@
+"""
+Per-request overhead of the revocation check.
+
+Fills the Bloom filter with revoked jti values, then measures a probe
+for tokens that were never revoked and the resulting false-positive rate
+(every false positive costs one primary-key lookup).
+
+    PYTHONPATH=src python benchmarks/bench_revocation.py [revoked] [fp_rate]
+"""
+import sys
+import timeit
+import uuid
+
+from contacts.helpers.bloom import BloomFilter
+
+
+PROBES = 200_000
+
+
+def main(revoked: int, fp_rate: float) -> None:
+    bloom = BloomFilter(capacity=revoked, fp_rate=fp_rate)
+    for _ in range(revoked):
+        bloom.add(uuid.uuid4().hex)
+
+    valid = [uuid.uuid4().hex for _ in range(PROBES)]
+    probe = iter(valid * 3)
+    seconds = min(timeit.repeat(lambda: next(probe) in bloom, number=PROBES // 4, repeat=3))
+    false_positives = sum(jti in bloom for jti in valid)
+
+    print(f"filter: {revoked} entries, {bloom.size / 8 / 1024:.1f} KiB, {bloom.hash_count} hashes")
+    print(f"probe: {seconds / (PROBES // 4) * 1e6:.2f} us per request")
+    print(f"false positives: configured {fp_rate:.4%}, expected {bloom.expected_fp_rate:.4%}, "
+          f"measured {false_positives / PROBES:.4%}")
+
+
+if __name__ == "__main__":
+    revoked = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    fp_rate = float(sys.argv[2]) if len(sys.argv) > 2 else 0.001
+    main(revoked, fp_rate)
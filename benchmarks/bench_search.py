@@ -0,0 +1,70 @@
+"""
+`GET /contacts/search` on a large seeded table: the plan shows the GIN index
+on the search vector, latency is measured for rare and common words.
+
+    PYTHONPATH=src:. python benchmarks/bench_search.py [rows] [owners]
+
+Seeds through bench_contact_indexes.py, pass `--cleanup` there to remove them.
+"""
+import asyncio
+import sys
+
+from sqlalchemy import text
+from sqlalchemy.dialects import postgresql
+
+from benchmarks.bench_contact_indexes import FIRST_SEED_USER_ID, seed
+from benchmarks.common import SETTINGS, app_client, measure
+from contacts.db.crud.contacts import search_contacts_stmt
+from contacts.helpers.search import prefix_tsquery
+from contacts.helpers.security import generate_jwt
+from contacts.models.schemas.auth import PayloadData
+
+
+REQUESTS = 50
+
+
+async def explain(engine, q: str, scoped: bool) -> str:
+    """Index scan node and execution time of the query behind the endpoint"""
+    stmt = search_contacts_stmt(scoped, keyset=False).limit(101).params(
+        search_query=prefix_tsquery(q),
+        owner_id=FIRST_SEED_USER_ID,
+    )
+    sql = stmt.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True})
+    async with engine.connect() as conn:
+        plan = await conn.exec_driver_sql(f"EXPLAIN ANALYZE {sql}")
+        lines = plan.scalars().all()
+        scan = next(line for line in lines if "Index Scan" in line or "Seq Scan" in line).strip(" ->")
+        return f"{scan.split('  (')[0]}, {lines[-1]}"
+
+
+async def main(rows: int, owners: int) -> None:
+    async with app_client() as client:
+        engine = client.app.state.engine
+        await seed(engine, rows, owners)
+        async with engine.connect() as conn:
+            rare = (await conn.scalar(text(
+                "SELECT split_part(email, '@', 1) FROM contacts WHERE owner_id = :owner_id LIMIT 1"
+            ), {"owner_id": FIRST_SEED_USER_ID}))[:6]
+
+        print(f"{rows} contacts, ~{rows // owners} per user")
+        for role, scoped in (("user", True), ("admin", False)):
+            token = generate_jwt(
+                PayloadData(sub=FIRST_SEED_USER_ID, role=role),
+                lifespan_min=30,
+                secret=SETTINGS.secret,
+            )
+            headers = {"Authorization": f"Bearer {token}"}
+            for q in (rare, "job-7", "org-4"):
+                print(f"  {await explain(engine, q, scoped)}")
+                await measure(
+                    f"{role} ?q={q}",
+                    lambda: client.get("/contacts/search", params={"q": q}, headers=headers),
+                    requests=REQUESTS,
+                )
+
+
+if __name__ == "__main__":
+    args = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    rows = int(args[0]) if args else 1_000_000
+    owners = int(args[1]) if len(args) > 1 else 1_000
+    asyncio.run(main(rows, owners))
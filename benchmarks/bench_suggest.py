@@ -0,0 +1,66 @@
+"""
+Per-keystroke latency of `GET /contacts/suggest` for a seeded owner,
+the first request builds the owner's prefix index.
+
+    PYTHONPATH=src:. python benchmarks/bench_suggest.py [rows] [owners]
+
+Seeds through bench_contact_indexes.py, pass `--cleanup` there to remove them.
+"""
+import asyncio
+import itertools
+import sys
+import time
+
+from benchmarks.bench_contact_indexes import FIRST_SEED_USER_ID, seed
+from benchmarks.common import SETTINGS, app_client, measure, report
+from contacts.helpers.security import generate_jwt
+from contacts.models.schemas.auth import PayloadData
+
+
+REQUESTS = 2_000
+
+
+async def main(rows: int, owners: int) -> None:
+    async with app_client() as client:
+        await seed(client.app.state.engine, rows, owners)
+        token = generate_jwt(
+            PayloadData(sub=FIRST_SEED_USER_ID, role="user"),
+            lifespan_min=30,
+            secret=SETTINGS.secret,
+        )
+        headers = {"Authorization": f"Bearer {token}"}
+        contact_index = client.app.state.contact_index
+
+        started_at = time.perf_counter()
+        await client.get("/contacts/suggest", params={"prefix": "a"}, headers=headers)
+        owner_index = contact_index.get(FIRST_SEED_USER_ID)
+        print(
+            f"first request, building the index of {len(owner_index)} contacts: "
+            f"{(time.perf_counter() - started_at) * 1000:.1f} ms, "
+            f"{owner_index.size / 2 ** 10:.0f} KiB"
+        )
+
+        # what a user types: every prefix of a few of their contacts' values
+        values = [contact[1] for contact in owner_index.suggest("last", 20)]
+        prefixes = itertools.cycle([value[:length] for value in values for length in range(1, len(value) + 1)])
+
+        latencies = []
+        started_at = time.perf_counter()
+        for _ in range(REQUESTS):
+            lookup_started_at = time.perf_counter()
+            owner_index.suggest(next(prefixes), SETTINGS.contacts_suggest_limit)
+            latencies.append(time.perf_counter() - lookup_started_at)
+        report("prefix index lookup", latencies, time.perf_counter() - started_at)
+
+        await measure(
+            "GET /contacts/suggest",
+            lambda: client.get("/contacts/suggest", params={"prefix": next(prefixes)}, headers=headers),
+            requests=REQUESTS,
+        )
+
+
+if __name__ == "__main__":
+    args = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    rows = int(args[0]) if args else 1_000_000
+    owners = int(args[1]) if len(args) > 1 else 1_000
+    asyncio.run(main(rows, owners))
@@ -0,0 +1,92 @@
+"""
+Shared setup for benchmarks that run against the application.
+
+They expect the same environment as the tests: a reachable database
+from `Settings` with the schema migrated, plus `SECRET` and `API_PREFIX`.
+"""
+import asyncio
+import contextlib
+import statistics
+import time
+import uuid
+from typing import AsyncIterator, Awaitable, Callable
+
+from asgi_lifespan import LifespanManager
+from httpx import AsyncClient
+from sqlalchemy import insert
+
+from contacts.core.settings import get_settings
+from contacts.helpers.security import hash_password
+from contacts.main import get_app
+from contacts.models.db.tables import User
+
+
+SETTINGS = get_settings()
+
+
+@contextlib.asynccontextmanager
+async def app_client() -> AsyncIterator[AsyncClient]:
+    app = get_app()
+    base_url = f"http://bench{SETTINGS.api_prefix}"
+    async with LifespanManager(app), AsyncClient(app=app, base_url=base_url) as client:
+        client.app = app
+        yield client
+
+
+async def create_bench_user(client: AsyncClient, role: str = "user") -> tuple[int, str, str]:
+    """Creates a throwaway user and returns its id, username and password"""
+    username = f"bench-{uuid.uuid4().hex[:12]}"
+    password = uuid.uuid4().hex
+    async with client.app.state.engine.begin() as conn:
+        user_id = await conn.scalar(
+            insert(User).
+            values(
+                id=uuid.uuid4().int % 2_000_000_000,
+                username=username,
+                hashed_password=hash_password(password, rounds=SETTINGS.bcrypt_rounds),
+                role=role,
+            ).
+            returning(User.id)
+        )
+
+    return user_id, username, password
+
+
+async def login(client: AsyncClient, username: str, password: str) -> dict:
+    response = await client.post("/auth/token", data={"username": username, "password": password})
+    response.raise_for_status()
+    return response.json()
+
+
+async def measure(
+    name: str,
+    call: Callable[[], Awaitable],
+    requests: int,
+    concurrency: int = 1,
+) -> list[float]:
+    """Runs `call` `requests` times with `concurrency` workers and prints latency and throughput"""
+    latencies: list[float] = []
+    remaining = iter(range(requests))
+
+    async def worker() -> None:
+        for _ in remaining:
+            started_at = time.perf_counter()
+            await call()
+            latencies.append(time.perf_counter() - started_at)
+
+    started_at = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started_at
+
+    report(name, latencies, elapsed)
+    return latencies
+
+
+def report(name: str, latencies: list[float], elapsed: float) -> None:
+    ordered = sorted(latencies)
+    p50 = statistics.median(ordered) * 1000
+    p99 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))] * 1000
+    print(
+        f"{name:<32} {len(ordered) / elapsed:9.1f} req/s "
+        f"p50 {p50:8.2f} ms  p99 {p99:8.2f} ms"
+    )
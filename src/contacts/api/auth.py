@@ -3,47 +3,157 @@ from fastapi import (
     Request, 
     HTTPException, 
     Depends,
+    BackgroundTasks,
 )
 from fastapi.security import OAuth2PasswordRequestForm
+from datetime import datetime, timedelta
+
 from sqlalchemy.ext.asyncio import AsyncSession
 from loguru import logger
 
-from contacts.models.schemas.auth import Token, PayloadData
+from contacts.models.schemas.auth import Token, PayloadData, RefreshTokenIn
 from contacts.models.db.entities import UserInDb
-from contacts.helpers.security import generate_jwt
-from contacts.helpers.auth import authenticate_user
-from .dependencies.db import get_session
+from contacts.helpers.security import (
+    generate_jwt,
+    needs_rehash,
+    generate_refresh_token,
+    hash_refresh_token,
+)
+from contacts.helpers.auth import authenticate_user, rehash_password
+from contacts.helpers.hashing import PasswordHasher
+from .dependencies.db import get_session, UnitOfWorkRoute
+from .dependencies.api import get_password_hasher, get_payload_from_jwt
+from contacts.db.crud.tokens import (
+    create_refresh_token,
+    rotate_refresh_token,
+    get_revoked_refresh_token_owner,
+    revoke_refresh_token,
+    revoke_user_refresh_tokens,
+)
 from contacts.resources.errors.auth import (
     INCORRECT_CREDENTIALS_EXCEPTION,
+    INVALID_REFRESH_TOKEN_EXCEPTION,
 )
 
 
-router = APIRouter()
+router = APIRouter(route_class=UnitOfWorkRoute)
+
+
+def get_access_token(request: Request, user_id: int, role: str) -> str:
+    return generate_jwt(
+        payload=PayloadData(sub=user_id, role=role),
+        lifespan_min=request.app.state.settings.access_token_lifespan_min,
+        secret=request.app.state.secret,
+    )
+
+
+def get_refresh_token_expiry(request: Request) -> datetime:
+    lifespan_min = request.app.state.settings.refresh_token_lifespan_min
+    return datetime.utcnow() + timedelta(minutes=lifespan_min)
 
 
 @router.post("/token", response_model=Token)
 async def access_token_login(
     request: Request,
+    background_tasks: BackgroundTasks,
     form_data: OAuth2PasswordRequestForm = Depends(),
     db_session: AsyncSession = Depends(get_session),
+    hasher: PasswordHasher = Depends(get_password_hasher),
 ) -> Token:
     user: UserInDb = await authenticate_user(
         form_data.username, 
         form_data.password, 
         db_session,
+        hasher=hasher,
+        cache=request.app.state.user_cache,
     )
 
     if user is None:
         raise INCORRECT_CREDENTIALS_EXCEPTION
 
-    data = PayloadData(
-        sub=user.id,
-        role=user.role,
+    if needs_rehash(user.hashed_password, hasher.rounds):
+        background_tasks.add_task(
+            rehash_password,
+            user=user,
+            password=form_data.password,
+            session=request.app.state.session_factory(),
+            hasher=hasher,
+            cache=request.app.state.user_cache,
+        )
+
+    refresh_token = generate_refresh_token()
+    await create_refresh_token(
+        session=db_session,
+        user_id=user.id,
+        token_hash=hash_refresh_token(refresh_token),
+        expires_at=get_refresh_token_expiry(request),
     )
-    token = generate_jwt(
-        payload=data,
-        lifespan_min=30,
-        secret=request.app.state.secret,
+
+    return Token(
+        access_token=get_access_token(request, user.id, user.role),
+        token_type="bearer",
+        refresh_token=refresh_token,
+    )
+
+
+@router.post("/refresh", response_model=Token)
+async def refresh_access_token(
+    request: Request,
+    token_in: RefreshTokenIn,
+    db_session: AsyncSession = Depends(get_session),
+) -> Token:
+    """Exchanges a refresh token for a new access token and a new refresh token"""
+    token_hash = hash_refresh_token(token_in.refresh_token)
+    refresh_token = generate_refresh_token()
+    owner = await rotate_refresh_token(
+        session=db_session,
+        token_hash=token_hash,
+        new_token_hash=hash_refresh_token(refresh_token),
+        expires_at=get_refresh_token_expiry(request),
+    )
+
+    if owner is None:
+        # A rotated token being presented again means it leaked,
+        # so every session of its owner is closed
+        user_id = await get_revoked_refresh_token_owner(session=db_session, token_hash=token_hash)
+        if user_id is not None:
+            logger.warning(f"Refresh token reuse detected for user {user_id}")
+            await revoke_user_refresh_tokens(session=db_session, user_id=user_id)
+            # the error response must not roll the revocation back
+            await db_session.commit()
+        raise INVALID_REFRESH_TOKEN_EXCEPTION
+
+    user_id, role = owner
+    return Token(
+        access_token=get_access_token(request, user_id, role),
+        token_type="bearer",
+        refresh_token=refresh_token,
     )
 
-    return Token(access_token=token, token_type="bearer")
+
+@router.post("/revoke", status_code=204)
+async def revoke_token(
+    token_in: RefreshTokenIn,
+    db_session: AsyncSession = Depends(get_session),
+) -> None:
+    await revoke_refresh_token(
+        session=db_session,
+        token_hash=hash_refresh_token(token_in.refresh_token),
+    )
+
+
+@router.post("/logout", status_code=204)
+async def logout(
+    request: Request,
+    payload: PayloadData = Depends(get_payload_from_jwt),
+    db_session: AsyncSession = Depends(get_session),
+) -> None:
+    """Revokes the access token the request was made with"""
+    if payload.jti is None:
+        return
+
+    await request.app.state.revocation_list.revoke(
+        jti=payload.jti,
+        expires_at=payload.exp.replace(tzinfo=None),
+        session=db_session,
+    )
@@ -1,7 +1,13 @@
 import uuid
+from typing import AsyncIterator, List
 
+import orjson
 from loguru import logger
-from fastapi import APIRouter, Depends, Request
+from fastapi import APIRouter, Depends, Request, HTTPException, Query
+from fastapi.responses import Response, StreamingResponse
+from pydantic import ValidationError
+from sqlalchemy.engine import RowMapping
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from contacts.models.db.entities import ContactInDb
@@ -10,34 +16,215 @@ from contacts.models.schemas.contacts import (
     ContactInCreate,
     ContactInUpdate,
     ContactInResponse,
-    ContactsInResponse
+    ContactsInResponse,
+    ContactsInBulkCreate,
+    ContactsInBulkResponse,
+    BulkItemResult,
+    ContactsImportReport,
+    ImportRowError,
+    ContactsAffected,
 )
 from contacts.models.schemas.auth import PayloadData
-from contacts.models.schemas.meta import ContactsFilterParams, OrderContactsByEnum
-from .dependencies.db import get_session
+from contacts.models.schemas.meta import (
+    ContactsFilterParams,
+    ContactsCursor,
+    ContactsSearchCursor,
+    OrderContactsByEnum,
+    ExportFormatEnum,
+    UserRoleEnum,
+)
+from .dependencies.db import get_session, UnitOfWorkRoute
 from .dependencies.api import (
     process_jwt, 
     get_payload_from_jwt, 
-    validate_contact_ownership,
-    check_contact_existence,
+    get_read_session,
     get_filter_params, 
     validate_phone_number,
 )
+from contacts.db.crud.users import get_user_version
 from contacts.db.crud.contacts import (
-    get_user_contacts_with_filters, 
-    create_contact as create_contact_, 
+    scoped_filters,
+    get_contact,
+    get_user_contacts_with_filters,
+    stream_user_contacts_with_filters,
+    search_user_contacts,
+    get_owner_contact_rows,
+    suggest_owner_contacts,
+    get_owner_address_book,
+    create_contact as create_contact_,
+    create_contacts,
+    import_contacts as import_contacts_,
     update_contact as update_contact_,
+    update_contacts_by_filter,
     delete_contact as delete_contact_,
+    delete_contacts_by_filter,
+)
+from contacts.helpers.contacts import numbers_in_use, normalize_phone_number
+from contacts.helpers.pagination import (
+    encode_cursor,
+    decode_cursor,
+    encode_search_cursor,
+    decode_search_cursor,
 )
-from contacts.helpers.contacts import user_has_contact_with_such_number
+from contacts.helpers.search import prefix_tsquery
+from contacts.helpers.prefix_index import CONTACT_FIELDS, normalize
+from contacts.helpers.address_book import AddressBooks, OwnerAddressBook
+from contacts.helpers.imports import CSV_MEDIA_TYPE, VCARD_MEDIA_TYPES, csv_records, vcard_records
+from contacts.helpers.exports import csv_chunks, vcard_chunks
+from contacts.helpers.etags import strong_etag, not_modified_response
+from contacts.models.db.tables import Contact
 from contacts.resources.errors.contacts import (
     USER_HAS_PHONE_NUM_EXCEPTION,
     ORDER_PARAMS_EXCEPTION,
     CONTACT_DOES_NOT_EXIST_EXCEPTION,
+    PAGE_SIZE_EXCEPTION,
+    BULK_SIZE_EXCEPTION,
+    INVALID_CONTACT_EXCEPTION,
+    DUPLICATE_PHONE_NUM_EXCEPTION,
+    UNSUPPORTED_IMPORT_FORMAT_EXCEPTION,
+    EXPORT_FORMAT_EXCEPTION,
+    FILTER_REQUIRED_EXCEPTION,
+    FILTERED_PHONE_NUM_UPDATE_EXCEPTION,
+    SEARCH_QUERY_EXCEPTION,
+)
+from contacts.resources.errors.users import USER_CONTACT_OWNERSHIP_EXCEPTION
+
+
+router = APIRouter(route_class=UnitOfWorkRoute)
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+EXPORT_ENCODERS = {
+    ExportFormatEnum.csv.value: (csv_chunks, CSV_MEDIA_TYPE),
+    ExportFormatEnum.vcf.value: (vcard_chunks, VCARD_MEDIA_TYPES[0]),
+}
+IMPORT_REPORTED_ERRORS = 100
+# contact columns are bounded, one oversized value must not fail a whole import's merge
+CONTACT_FIELD_LENGTHS = {
+    field: column.type.length
+    for field, column in Contact.__table__.columns.items()
+    if field in ContactInCreate.__fields__
+}
+
+# where a listed contact's fields sit in an address book row, in ContactWithId's order
+CONTACT_WITH_ID_COLUMNS = tuple(
+    (field, CONTACT_FIELDS.index(field)) for field in ContactWithId.__fields__
 )
 
 
-router = APIRouter()
+def get_writable_owner(payload: PayloadData) -> int | None:
+    """Owner the request's writes are restricted to, admins may write any contact"""
+    if payload.role == UserRoleEnum.admin.value:
+        return None
+    return payload.sub
+
+
+async def ndjson_lines(
+    first_batch: List[RowMapping],
+    batches: AsyncIterator[List[RowMapping]],
+) -> AsyncIterator[bytes]:
+    """One JSON object per contact, written a fetched batch at a time"""
+    yield b"".join(orjson.dumps(dict(row), default=str) + b"\n" for row in first_batch)
+    async for batch in batches:
+        yield b"".join(orjson.dumps(dict(row), default=str) + b"\n" for row in batch)
+
+
+async def valid_import_chunks(
+    records: AsyncIterator[dict],
+    report: ContactsImportReport,
+    chunk_size: int,
+) -> AsyncIterator[List[tuple]]:
+    """
+    Rows that pass ContactInCreate rules, ready to be staged, `chunk_size` at a time.
+    Rejections are counted into the report as they go by
+    """
+    chunk: List[tuple] = []
+    number = 0
+    async for record in records:
+        number += 1
+        try:
+            contact = ContactInCreate.parse_obj(record)
+            validate_phone_number(contact)
+            if any(len(getattr(contact, field)) > length for field, length in CONTACT_FIELD_LENGTHS.items()):
+                raise INVALID_CONTACT_EXCEPTION
+        except ValidationError:
+            exception = INVALID_CONTACT_EXCEPTION
+        except HTTPException as exc:
+            exception = exc
+        else:
+            chunk.append((
+                number,
+                uuid.uuid4(),
+                contact.last_name,
+                contact.first_name,
+                contact.middle_name,
+                contact.organisation,
+                contact.job_title,
+                contact.email,
+                contact.phone_number,
+            ))
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+            continue
+
+        report.rejected += 1
+        if len(report.errors) < IMPORT_REPORTED_ERRORS:
+            report.errors.append(
+                ImportRowError(record=number, status_code=exception.status_code, detail=exception.detail)
+            )
+
+    if chunk:
+        yield chunk
+
+
+async def get_address_book(
+    request: Request,
+    owner_id: int,
+    db_session: AsyncSession,
+) -> OwnerAddressBook | None:
+    """The owner's in-process address book, None if they're disabled or the owner has too many contacts"""
+    address_books: AddressBooks | None = request.app.state.address_books
+    if address_books is None or address_books.oversized(owner_id):
+        return None
+
+    book = address_books.get(owner_id)
+    if book is None:
+        generation = address_books.begin_build(owner_id)
+        book = address_books.build(
+            owner_id,
+            generation,
+            *await get_owner_address_book(owner_id, address_books.max_contacts, db_session),
+        )
+    return book
+
+
+def address_book_page(rows: List[tuple], order_by: str, limit: int, headers: dict) -> Response:
+    """A page of `limit` + 1 address book rows answered as the list query's would be"""
+    if len(rows) == 0:
+        raise CONTACT_DOES_NOT_EXIST_EXCEPTION
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(
+            ContactsCursor(order_by=order_by, value=last[CONTACT_FIELDS.index(order_by)], id=last[0])
+        )
+
+    # rows were validated when written
+    contacts = [{field: row[column] for field, column in CONTACT_WITH_ID_COLUMNS} for row in rows]
+    return Response(
+        orjson.dumps({"contacts": contacts, "next_cursor": next_cursor}),
+        media_type="application/json",
+        headers=headers,
+    )
+
+
+async def unmatched_write_exception(contact_id: uuid.UUID, db_session: AsyncSession) -> HTTPException:
+    """Tells a missing contact from someone else's once a scoped write matched nothing"""
+    if await get_contact(id=contact_id, db_session=db_session) is None:
+        return CONTACT_DOES_NOT_EXIST_EXCEPTION
+    return USER_CONTACT_OWNERSHIP_EXCEPTION
 
 
 @router.post(
@@ -54,23 +241,123 @@ async def create_contact(
 ) -> ContactInResponse:
     request_user_id = payload.sub
 
-    if await user_has_contact_with_such_number(
-        user_id=request_user_id,
-        phone_number=request_contact.phone_number,
-        session=db_session,
-    ):
-        raise USER_HAS_PHONE_NUM_EXCEPTION
-
     contact = await create_contact_(
         contact=ContactInDb(owner_id=request_user_id, **request_contact.dict()),
         db_session=db_session,
     )
+    if contact is None:
+        raise USER_HAS_PHONE_NUM_EXCEPTION
 
     return ContactInResponse(
         contact=ContactWithId(**contact.dict())
     )
 
 
+@router.post(
+    "/bulk",
+    response_model=ContactsInBulkResponse,
+    dependencies=[Depends(process_jwt)],
+)
+async def create_contacts_bulk(
+    request_contacts: ContactsInBulkCreate,
+    request: Request,
+    payload: PayloadData = Depends(get_payload_from_jwt),
+    db_session: AsyncSession = Depends(get_session),
+) -> ContactsInBulkResponse:
+    """Creates what it can and reports every item, a failed item doesn't fail the batch"""
+    if len(request_contacts.contacts) > request.app.state.settings.contacts_bulk_max_size:
+        raise BULK_SIZE_EXCEPTION
+
+    results: dict[int, BulkItemResult] = {}
+    valid: dict[int, ContactInCreate] = {}
+    for index, item in enumerate(request_contacts.contacts):
+        try:
+            contact = ContactInCreate.parse_obj(item)
+            validate_phone_number(contact)
+        except ValidationError:
+            exception = INVALID_CONTACT_EXCEPTION
+        except HTTPException as exc:
+            exception = exc
+        else:
+            valid[index] = contact
+            continue
+        results[index] = BulkItemResult(index=index, status_code=exception.status_code, detail=exception.detail)
+
+    stored = await numbers_in_use(
+        user_id=payload.sub,
+        phone_numbers={contact.phone_number for contact in valid.values()},
+        session=db_session,
+    )
+    claimed: set[str] = set()
+    to_create: dict[int, ContactInDb] = {}
+    for index, contact in valid.items():
+        phone_number = normalize_phone_number(contact.phone_number)
+        if phone_number in stored:
+            exception = USER_HAS_PHONE_NUM_EXCEPTION
+        elif phone_number in claimed:
+            exception = DUPLICATE_PHONE_NUM_EXCEPTION
+        else:
+            claimed.add(phone_number)
+            to_create[index] = ContactInDb(owner_id=payload.sub, **contact.dict())
+            continue
+        results[index] = BulkItemResult(index=index, status_code=exception.status_code, detail=exception.detail)
+
+    # a number stored concurrently since the lookup is skipped by the insert
+    created = set(await create_contacts(list(to_create.values()), db_session))
+    for index, contact in to_create.items():
+        if contact.id in created:
+            results[index] = BulkItemResult(index=index, status_code=201, id=contact.id)
+        else:
+            results[index] = BulkItemResult(
+                index=index,
+                status_code=USER_HAS_PHONE_NUM_EXCEPTION.status_code,
+                detail=USER_HAS_PHONE_NUM_EXCEPTION.detail,
+            )
+
+    return ContactsInBulkResponse(
+        created=len(created),
+        results=[results[index] for index in range(len(request_contacts.contacts))],
+    )
+
+
+@router.post(
+    "/import",
+    response_model=ContactsImportReport,
+    dependencies=[Depends(process_jwt)],
+)
+async def import_contacts(
+    request: Request,
+    payload: PayloadData = Depends(get_payload_from_jwt),
+    db_session: AsyncSession = Depends(get_session),
+) -> ContactsImportReport:
+    """
+    Imports a CSV file (with a header of contact field names) or vCards for the caller.
+    The body is parsed as it arrives, numbers the caller already has are skipped
+    """
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    if content_type == CSV_MEDIA_TYPE:
+        records = csv_records(request.stream())
+    elif content_type in VCARD_MEDIA_TYPES:
+        records = vcard_records(request.stream())
+    else:
+        raise UNSUPPORTED_IMPORT_FORMAT_EXCEPTION
+
+    report = ContactsImportReport()
+    staged, inserted = await import_contacts_(
+        owner_id=payload.sub,
+        chunks=valid_import_chunks(
+            records,
+            report,
+            chunk_size=request.app.state.settings.contacts_import_chunk_size,
+        ),
+        db_session=db_session,
+    )
+    report.accepted = inserted
+    report.duplicated = staged - inserted
+
+    return report
+
+
 @router.get(
     "", 
     response_model=ContactsInResponse, 
@@ -78,37 +365,301 @@ async def create_contact(
 )
 async def get_contacts(
     request: Request,
+    response: Response,
     order_by: str = OrderContactsByEnum.last_name,
+    limit: int | None = None,
+    cursor: str | None = None,
     filter_params: ContactsFilterParams = Depends(get_filter_params),
     payload: PayloadData = Depends(get_payload_from_jwt),
-    db_session: AsyncSession = Depends(get_session),
+    db_session: AsyncSession = Depends(get_read_session),
 ) -> ContactsInResponse:
     if order_by not in OrderContactsByEnum._member_names_:
         raise ORDER_PARAMS_EXCEPTION
 
+    settings = request.app.state.settings
+    if limit is None:
+        limit = settings.contacts_page_size
+    if not 0 < limit <= settings.contacts_max_page_size:
+        raise PAGE_SIZE_EXCEPTION
+    after = decode_cursor(cursor, order_by) if cursor else None
+    streamed = NDJSON_MEDIA_TYPE in request.headers.get("accept", "")
+
+    # an admin listing everyone's contacts has no single version to tag it with
+    filters = scoped_filters(payload.sub, filter_params, payload.role)
+    headers = {}
+    book = None
+    if "owner_id" in filters:
+        if not streamed:
+            book = await get_address_book(request, filters["owner_id"], db_session)
+        # read before the contacts: a write landing in between costs the client a refetch,
+        # never a stale page under a newer tag. A book was read with its version
+        if book is not None:
+            version = book.version
+        else:
+            version = await get_user_version(db_session, filters["owner_id"])
+        headers["ETag"] = strong_etag(version, filters, order_by, limit, cursor, streamed)
+        not_modified = not_modified_response(request, headers["ETag"])
+        if not_modified is not None:
+            return not_modified
+
+    if streamed:
+        # everything after the cursor, no page limit
+        batches = stream_user_contacts_with_filters(
+            user_id=payload.sub,
+            role=payload.role,
+            filter_params=filter_params,
+            order_by=order_by,
+            db_session=db_session,
+            fetch_size=settings.contacts_stream_fetch_size,
+            after=after,
+        )
+        first_batch = await anext(batches, None)
+        if first_batch is None:
+            raise CONTACT_DOES_NOT_EXIST_EXCEPTION
+
+        return StreamingResponse(
+            ndjson_lines(first_batch, batches),
+            media_type=NDJSON_MEDIA_TYPE,
+            headers=headers,
+        )
+
+    if book is not None:
+        rows = book.page(
+            {field: value for field, value in filters.items() if field != "owner_id"},
+            order_by,
+            limit + 1,
+            after,
+        )
+        if rows is not None:
+            return address_book_page(rows, order_by, limit, headers)
+
+    # one extra row tells whether another page follows
     contacts = await get_user_contacts_with_filters(
         user_id=payload.sub,
+        role=payload.role,
         filter_params=filter_params,
         order_by=order_by,
         db_session=db_session,
+        limit=limit + 1,
+        after=after,
     )
     if len(contacts) == 0:
         raise CONTACT_DOES_NOT_EXIST_EXCEPTION
 
+    next_cursor = None
+    if len(contacts) > limit:
+        contacts = contacts[:limit]
+        last = contacts[-1]
+        next_cursor = encode_cursor(
+            ContactsCursor(order_by=order_by, value=getattr(last, order_by), id=last.id)
+        )
+
+    response.headers.update(headers)
+    return ContactsInResponse(
+        contacts=[ContactWithId(**contact.dict()) for contact in contacts],
+        next_cursor=next_cursor,
+    )
+
+
+@router.get(
+    "/search",
+    response_model=ContactsInResponse,
+    dependencies=[Depends(process_jwt)],
+)
+async def search_contacts(
+    request: Request,
+    q: str,
+    limit: int | None = None,
+    cursor: str | None = None,
+    payload: PayloadData = Depends(get_payload_from_jwt),
+    db_session: AsyncSession = Depends(get_read_session),
+) -> ContactsInResponse:
+    """Contacts whose names, workplace or email start with every word of `q`, best matches first"""
+    query = prefix_tsquery(q)
+    if query is None:
+        raise SEARCH_QUERY_EXCEPTION
+
+    settings = request.app.state.settings
+    if limit is None:
+        limit = settings.contacts_page_size
+    if not 0 < limit <= settings.contacts_max_page_size:
+        raise PAGE_SIZE_EXCEPTION
+    after = decode_search_cursor(cursor, query) if cursor else None
+
+    matches = await search_user_contacts(
+        user_id=payload.sub,
+        role=payload.role,
+        query=query,
+        db_session=db_session,
+        limit=limit + 1,
+        after=after,
+    )
+    if len(matches) == 0:
+        raise CONTACT_DOES_NOT_EXIST_EXCEPTION
+
+    next_cursor = None
+    if len(matches) > limit:
+        matches = matches[:limit]
+        last = matches[-1]
+        next_cursor = encode_search_cursor(
+            ContactsSearchCursor(query=query, rank=last["rank"], id=last["id"])
+        )
+
     return ContactsInResponse(
-        contacts=[ContactWithId(**contact.dict()) for contact in contacts]
+        contacts=[ContactWithId(**match) for match in matches],
+        next_cursor=next_cursor,
+    )
+
+
+@router.get(
+    "/suggest",
+    response_model=ContactsInResponse,
+    dependencies=[Depends(process_jwt)],
+)
+async def suggest_contacts(
+    request: Request,
+    prefix: str,
+    limit: int | None = None,
+    payload: PayloadData = Depends(get_payload_from_jwt),
+    db_session: AsyncSession = Depends(get_read_session),
+) -> Response:
+    """
+    Typeahead over the caller's own contacts: names, organisation or email starting with `prefix`.
+    Served from the in-process prefix index, the database is only read to build it.
+    Owners whose index doesn't fit the budget are looked up by index range scans instead
+    """
+    if limit is None:
+        limit = request.app.state.settings.contacts_suggest_limit
+    if not 0 < limit <= request.app.state.settings.contacts_max_page_size:
+        raise PAGE_SIZE_EXCEPTION
+
+    term = normalize(prefix)
+    contact_index = request.app.state.contact_index
+    if not term:
+        suggestions = []
+    elif contact_index.oversized(payload.sub):
+        suggestions = await suggest_owner_contacts(
+            owner_id=payload.sub, prefix=term, limit=limit, db_session=db_session,
+        )
+    else:
+        index = contact_index.get(payload.sub)
+        if index is None:
+            generation = contact_index.begin_build(payload.sub)
+            index = contact_index.build(
+                payload.sub,
+                generation,
+                await get_owner_contact_rows(owner_id=payload.sub, db_session=db_session),
+            )
+        suggestions = index.suggest(term, limit)
+    if len(suggestions) == 0:
+        raise CONTACT_DOES_NOT_EXIST_EXCEPTION
+
+    # indexed contacts were validated when written, skip doing it twice per keystroke
+    return Response(
+        orjson.dumps({"contacts": [dict(zip(CONTACT_FIELDS, contact)) for contact in suggestions]}, default=str),
+        media_type="application/json",
+    )
+
+
+@router.get(
+    "/export",
+    response_class=StreamingResponse,
+    dependencies=[Depends(process_jwt)],
+)
+async def export_contacts(
+    request: Request,
+    export_format: str = Query(ExportFormatEnum.csv.value, alias="format"),
+    order_by: str = OrderContactsByEnum.last_name,
+    filter_params: ContactsFilterParams = Depends(get_filter_params),
+    payload: PayloadData = Depends(get_payload_from_jwt),
+    db_session: AsyncSession = Depends(get_read_session),
+) -> StreamingResponse:
+    """The listing as a file, encoded a fetched batch at a time"""
+    if order_by not in OrderContactsByEnum._member_names_:
+        raise ORDER_PARAMS_EXCEPTION
+    if export_format not in EXPORT_ENCODERS:
+        raise EXPORT_FORMAT_EXCEPTION
+
+    batches = stream_user_contacts_with_filters(
+        user_id=payload.sub,
+        role=payload.role,
+        filter_params=filter_params,
+        order_by=order_by,
+        db_session=db_session,
+        fetch_size=request.app.state.settings.contacts_stream_fetch_size,
+    )
+    first_batch = await anext(batches, None)
+    if first_batch is None:
+        raise CONTACT_DOES_NOT_EXIST_EXCEPTION
+
+    encode, media_type = EXPORT_ENCODERS[export_format]
+    return StreamingResponse(
+        encode(first_batch, batches),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="contacts.{export_format}"'},
     )
 
 
+@router.patch(
+    "",
+    response_model=ContactsAffected,
+    dependencies=[Depends(process_jwt)],
+)
+async def update_contacts(
+    request_contact: ContactInUpdate,
+    dry_run: bool = False,
+    filter_params: ContactsFilterParams = Depends(get_filter_params),
+    payload: PayloadData = Depends(get_payload_from_jwt),
+    db_session: AsyncSession = Depends(get_session),
+) -> ContactsAffected:
+    """Updates every contact the filters match in one statement, `dry_run` only counts them"""
+    if not filter_params.dict(exclude_none=True):
+        raise FILTER_REQUIRED_EXCEPTION
+    if request_contact.phone_number is not None:
+        raise FILTERED_PHONE_NUM_UPDATE_EXCEPTION
+
+    affected = await update_contacts_by_filter(
+        user_id=payload.sub,
+        role=payload.role,
+        filter_params=filter_params,
+        db_session=db_session,
+        dry_run=dry_run,
+        **request_contact.dict(exclude={"phone_number"}),
+    )
+
+    return ContactsAffected(affected=affected, dry_run=dry_run)
+
+
+@router.delete(
+    "",
+    response_model=ContactsAffected,
+    dependencies=[Depends(process_jwt)],
+)
+async def delete_contacts(
+    dry_run: bool = False,
+    filter_params: ContactsFilterParams = Depends(get_filter_params),
+    payload: PayloadData = Depends(get_payload_from_jwt),
+    db_session: AsyncSession = Depends(get_session),
+) -> ContactsAffected:
+    """Deletes every contact the filters match in one statement, `dry_run` only counts them"""
+    if not filter_params.dict(exclude_none=True):
+        raise FILTER_REQUIRED_EXCEPTION
+
+    affected = await delete_contacts_by_filter(
+        user_id=payload.sub,
+        role=payload.role,
+        filter_params=filter_params,
+        db_session=db_session,
+        dry_run=dry_run,
+    )
+
+    return ContactsAffected(affected=affected, dry_run=dry_run)
+
+
 @router.put(
     "/{contact_id}", 
     status_code=204,
-    dependencies=[
-    Depends(process_jwt),
-    Depends(check_contact_existence),
-    Depends(validate_contact_ownership),
-    Depends(validate_phone_number),
-    ],
+    dependencies=[Depends(process_jwt), Depends(validate_phone_number)],
 )
 async def update_contact(
     contact_id: uuid.UUID,
@@ -116,20 +667,33 @@ async def update_contact(
     payload: PayloadData = Depends(get_payload_from_jwt),
     db_session: AsyncSession = Depends(get_session),
 ) -> None:
-    await update_contact_(db_session=db_session, id=contact_id, **request_contact.dict())
+    try:
+        contact = await update_contact_(
+            db_session=db_session,
+            id=contact_id,
+            owner_id=get_writable_owner(payload),
+            **request_contact.dict(),
+        )
+    except IntegrityError:
+        # the new number is one the owner already has, the transaction is rolled back
+        raise USER_HAS_PHONE_NUM_EXCEPTION
+    if contact is None:
+        raise await unmatched_write_exception(contact_id, db_session)
 
 
 @router.delete(
     "/{contact_id}",
     status_code=204,
-    dependencies=[
-        Depends(process_jwt),
-        Depends(check_contact_existence),
-        Depends(validate_contact_ownership),
-    ],
+    dependencies=[Depends(process_jwt)],
 )
 async def delete_contact(
     contact_id: uuid.UUID,
+    payload: PayloadData = Depends(get_payload_from_jwt),
     db_session: AsyncSession = Depends(get_session),
 ) -> None:
-    await delete_contact_(db_session=db_session, id=contact_id)
+    if not await delete_contact_(
+        db_session=db_session,
+        id=contact_id,
+        owner_id=get_writable_owner(payload),
+    ):
+        raise await unmatched_write_exception(contact_id, db_session)
@@ -1,4 +1,4 @@
-import jwt
+from typing import AsyncIterator
 
 from loguru import logger
 from fastapi import Request, Depends
@@ -6,27 +6,22 @@ from fastapi.security import OAuth2PasswordBearer
 from pydantic import EmailStr
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from contacts.helpers.security import ALGORITHM, validate_jwt
-from contacts.helpers.contacts import contact_is_owned_by_user
+from contacts.helpers.security import verify_jwt
+from contacts.helpers.hashing import PasswordHasher
 from .db import get_session
-from contacts.db.crud.users import get_user
-from contacts.db.crud.contacts import get_contact
-from contacts.models.schemas.auth import Token, PayloadData
+from contacts.models.schemas.auth import PayloadData
 from contacts.models.schemas.meta import UserRoleEnum, ContactsFilterParams
 from contacts.models.schemas.contacts import BaseContact
-from contacts.models.schemas.users import UserInCreate
 from contacts.resources.errors.users import (
-    USERNAME_EXIST_EXCEPTION,
-    USER_ID_EXIST_EXCEPTION,
-    USER_CONTACT_OWNERSHIP_EXCEPTION,
+    ADMIN_RIGHTS_EXCEPTION,
 )
 from contacts.resources.errors.contacts import (
-    CONTACT_DOES_NOT_EXIST_EXCEPTION,
     PHONE_NUM_FORMAT_EXCEPTION,
     PHONE_NUM_LEN_EXCEPTION,
 )
 from contacts.resources.errors.auth import (
     NO_TOKEN_EXCEPTION,
+    REVOKED_TOKEN_EXCEPTION,
 )
 
 
@@ -35,34 +30,58 @@ oauth2_scheme = OAuth2PasswordBearer(
 )
 
 
-def get_payload_from_jwt(request: Request, token: str = Depends(oauth2_scheme)) -> PayloadData:
-    payload = jwt.decode(token, request.app.state.secret, algorithms=[ALGORITHM])
-    return PayloadData(**payload)
-
-
-def process_jwt(request: Request, token: Token = Depends(oauth2_scheme)) -> None:
-    """Entrypoint for token processing"""
+async def get_payload_from_jwt(
+    request: Request,
+    token: str = Depends(oauth2_scheme),
+    db_session: AsyncSession = Depends(get_session),
+) -> PayloadData:
+    """
+    Entrypoint for token processing.
+    FastAPI caches the result per request, so the token is verified once
+    no matter how many dependencies ask for the claims
+    """
     if token is None:
         raise NO_TOKEN_EXCEPTION
-    validate_jwt(token, request.app.state.secret)
 
+    payload = verify_jwt(
+        token,
+        request.app.state.secret,
+        cache=request.app.state.token_cache,
+    )
+    if payload.jti is not None and await request.app.state.revocation_list.is_revoked(
+        payload.jti, session=db_session
+    ):
+        raise REVOKED_TOKEN_EXCEPTION
+
+    request.state.user_id = payload.sub
+    return payload
+
+
+async def get_read_session(
+    request: Request,
+    payload: PayloadData = Depends(get_payload_from_jwt),
+) -> AsyncIterator[AsyncSession]:
+    """
+    Session for read-only handlers, served by a replica unless
+    the caller has just written and must read its own writes
+    """
+    session_factory = request.app.state.replica_router.read_session_factory(payload.sub)
+    async with session_factory() as session:
+        await session.begin()
+        yield session
 
-async def validate_contact_ownership(
-    contact_id: str,
-    payload: PayloadData = Depends(get_payload_from_jwt), 
-    db_session: AsyncSession = Depends(get_session),
-) -> None:
-    """Checks if user has rights to interact with requested contact"""
-    if payload.role == UserRoleEnum.admin.value:
-        return
-    
-    if payload.role == UserRoleEnum.user.value:
-        if not await contact_is_owned_by_user(
-            contact_id=contact_id, 
-            user_id=payload.sub, 
-            session=db_session
-        ):
-            raise USER_CONTACT_OWNERSHIP_EXCEPTION
+
+def get_password_hasher(request: Request) -> PasswordHasher:
+    return request.app.state.password_hasher
+
+
+def process_jwt(payload: PayloadData = Depends(get_payload_from_jwt)) -> None:
+    """Requires a valid token for routes that don't use the claims"""
+
+
+def require_admin(payload: PayloadData = Depends(get_payload_from_jwt)) -> None:
+    if payload.role != UserRoleEnum.admin.value:
+        raise ADMIN_RIGHTS_EXCEPTION
 
 
 def get_filter_params(
@@ -95,21 +114,3 @@ def validate_phone_number(request_contact: BaseContact) -> None:
         int(request_contact.phone_number)
     except ValueError:
         raise PHONE_NUM_FORMAT_EXCEPTION
-
-
-async def check_contact_existence(contact_id: str, db_sesion = Depends(get_session)) -> None:
-    contact = await get_contact(id=contact_id, db_session=db_sesion)
-    if contact is None:
-        raise CONTACT_DOES_NOT_EXIST_EXCEPTION
-
-
-async def check_user_uniqueness(
-    user: UserInCreate, 
-    session: AsyncSession = Depends(get_session)
-) -> None:
-    user_db = await get_user(username=user.username, session=session)
-    if user_db:
-        raise USERNAME_EXIST_EXCEPTION
-    user_db = await get_user(id=user.id, session=session)
-    if user_db:
-        raise USER_ID_EXIST_EXCEPTION
@@ -1,11 +1,59 @@
-from fastapi import Request
-from sqlalchemy.orm import sessionmaker
+from typing import AsyncIterator, Callable
+
+from fastapi import Request, Response
+from fastapi.routing import APIRoute
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from contacts.db.session import CONTACT_CHANGES
+
+
+READ_ONLY_METHODS = frozenset(("GET", "HEAD", "OPTIONS"))
+
+
+async def get_session(request: Request) -> AsyncIterator[AsyncSession]:
+    """
+    Request's unit of work: every dependency and the handler share
+    one session, one connection and one transaction.
+    Committed by UnitOfWorkRoute, rolled back on close otherwise
+    """
+    async with request.app.state.session_factory() as session:
+        await session.begin()
+        request.state.db_session = session
+        yield session
+
+
+class UnitOfWorkRoute(APIRoute):
+    """
+    Commits the request's transaction once the handler succeeded,
+    before the response is sent (dependency teardown runs only after it).
+    The caller's reads then stick to the primary for a while,
+    and the committed contact writes reach the in-process contact indexes
+    """
+
+    def get_route_handler(self) -> Callable:
+        route_handler = super().get_route_handler()
+
+        async def unit_of_work_handler(request: Request) -> Response:
+            response = await route_handler(request)
+
+            session: AsyncSession | None = getattr(request.state, "db_session", None)
+            if (
+                session is not None
+                and request.method not in READ_ONLY_METHODS
+                and session.in_transaction()
+            ):
+                await session.commit()
+
+                changes = session.info.pop(CONTACT_CHANGES, None)
+                if changes:
+                    request.app.state.contact_index.apply(changes)
+                    if request.app.state.address_books is not None:
+                        request.app.state.address_books.apply(changes)
+
+                user_id = getattr(request.state, "user_id", None)
+                if user_id is not None:
+                    request.app.state.replica_router.mark_write(user_id)
+
+            return response
 
-def get_session(request: Request) -> AsyncSession:
-    Session = sessionmaker(
-        request.app.state.engine,
-        class_=AsyncSession,
-    )
-    return Session()
+        return unit_of_work_handler
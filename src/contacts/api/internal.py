@@ -0,0 +1,62 @@
+from fastapi import APIRouter, Request, Depends
+
+from .dependencies.api import require_admin
+from .dependencies.db import UnitOfWorkRoute
+from contacts.resources.errors.contacts import DUPLICATE_DETECTION_RUNNING_EXCEPTION
+
+
+router = APIRouter(
+    route_class=UnitOfWorkRoute,
+    dependencies=[Depends(require_admin)],
+)
+
+
+@router.get("/db-pool")
+async def get_db_pool_stats(request: Request) -> dict:
+    """Live connection pool usage, idle connection wait and new connection time percentiles"""
+    pool = request.app.state.engine.sync_engine.pool
+    return pool.monitor.stats(pool)
+
+
+@router.get("/caches")
+async def get_cache_stats(request: Request) -> dict:
+    """Size and hit rate of the in-process caches"""
+    return {
+        "tokens": request.app.state.token_cache.stats,
+        "users": request.app.state.user_cache.stats,
+        "contact_prefixes": request.app.state.contact_index.stats,
+        "address_books": request.app.state.address_books and request.app.state.address_books.stats,
+    }
+
+
+@router.get("/revoked-tokens")
+async def get_revoked_token_stats(request: Request) -> dict:
+    """Revoked access tokens Bloom filter: size, probes and measured false positive rate"""
+    return request.app.state.revocation_list.stats
+
+
+@router.get("/password-hasher")
+async def get_password_hasher_stats(request: Request) -> dict:
+    """Calls rejected by the bcrypt pool, queue wait and hash duration"""
+    return request.app.state.password_hasher.stats.as_dict()
+
+
+@router.get("/conditional-gets")
+async def get_conditional_get_stats(request: Request) -> dict:
+    """Share of tagged responses per route answered with 304 Not Modified"""
+    return request.app.state.conditional_gets.stats
+
+
+@router.post("/duplicates", status_code=202)
+async def detect_duplicates(request: Request) -> dict:
+    """Starts the duplicate contacts detection job in the background"""
+    detection = request.app.state.duplicate_detection
+    if not detection.start(request.app.state.session_factory):
+        raise DUPLICATE_DETECTION_RUNNING_EXCEPTION
+    return detection.stats
+
+
+@router.get("/duplicates")
+async def get_duplicates_detection(request: Request) -> dict:
+    """Progress of the running duplicate detection job, or results of the last one"""
+    return request.app.state.duplicate_detection.stats
@@ -1,9 +1,10 @@
 from fastapi import APIRouter
 
-from contacts.api import auth, contacts, users
+from contacts.api import auth, contacts, users, internal
 
 
 router = APIRouter()
 router.include_router(auth.router, prefix="/auth")
 router.include_router(contacts.router, prefix="/contacts")
 router.include_router(users.router, prefix="/users")
+router.include_router(internal.router, prefix="/internal")
@@ -2,6 +2,7 @@ from loguru import logger
 from fastapi import (
     APIRouter, 
     Request, 
+    Response,
     Depends,
 )
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -11,15 +12,18 @@ from contacts.models.schemas.auth import PayloadData
 from contacts.models.db.entities import UserInDb
 from contacts.api.dependencies.api import (
     process_jwt,
-    check_user_uniqueness,
     get_payload_from_jwt, 
+    get_password_hasher,
+    get_read_session,
 )
-from contacts.api.dependencies.db import get_session
+from contacts.api.dependencies.db import get_session, UnitOfWorkRoute
 from contacts.db.crud.users import create_user, get_user
-from contacts.helpers.security import hash_password
+from contacts.helpers.etags import strong_etag, not_modified_response
+from contacts.helpers.hashing import PasswordHasher
+from contacts.resources.errors.users import USERNAME_EXIST_EXCEPTION, USER_ID_EXIST_EXCEPTION
 
 
-router = APIRouter()
+router = APIRouter(route_class=UnitOfWorkRoute)
 
 
 @router.get(
@@ -29,10 +33,18 @@ router = APIRouter()
     )
 async def get_me(
     request: Request,
+    response: Response,
     payload: PayloadData = Depends(get_payload_from_jwt),
-    db_session: AsyncSession = Depends(get_session),
+    db_session: AsyncSession = Depends(get_read_session),
 ) -> BaseUser:
-    user = await get_user(session=db_session, id=payload.sub)
+    user = await get_user(session=db_session, id=payload.sub, cache=request.app.state.user_cache)
+    # nothing here depends on the contacts, the (usually cached) user row is the version
+    etag = strong_etag(user.id, user.username, user.role)
+    not_modified = not_modified_response(request, etag)
+    if not_modified is not None:
+        return not_modified
+
+    response.headers["ETag"] = etag
     return UserInResponse(
         user=BaseUser(id=user.id, username=user.username, role=user.role)
     )
@@ -41,19 +53,29 @@ async def get_me(
 @router.post(
     "/register", 
     response_model=UserInResponse,
-    status_code=201, 
-    dependencies=[Depends(check_user_uniqueness)],
+    status_code=201,
 )
 async def register_user(
     user: UserInCreate,
     db_session: AsyncSession = Depends(get_session),
+    hasher: PasswordHasher = Depends(get_password_hasher),
 ) -> UserInResponse:
-    user = UserInDb(
-        username=user.username,
-        hashed_password=hash_password(user.password),
-        role=user.role,
+    user_in_db = await create_user(
+        session=db_session,
+        user=UserInDb(
+            id=user.id,
+            username=user.username,
+            hashed_password=await hasher.hash(user.password),
+            role=user.role,
+        ),
     )
-    user = await create_user(session=db_session, user=user)
+    if user_in_db is None:
+        # the insert hit a unique constraint, find out which one
+        if await get_user(session=db_session, username=user.username):
+            raise USERNAME_EXIST_EXCEPTION
+        raise USER_ID_EXIST_EXCEPTION
+
+    user = user_in_db
     return UserInResponse(
         user=BaseUser(id=user.id, username=user.username, role=user.role)
     )
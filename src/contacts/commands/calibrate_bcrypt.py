@@ -0,0 +1,39 @@
+"""
+Picks the bcrypt cost for this host.
+
+    PYTHONPATH=src python -m contacts.commands.calibrate_bcrypt --target-ms 250
+
+Put the printed value into `BCRYPT_ROUNDS`, existing hashes are
+upgraded or downgraded on the next successful login.
+"""
+import argparse
+
+from contacts.helpers.security import (
+    BCRYPT_MIN_ROUNDS,
+    BCRYPT_MAX_ROUNDS,
+    calibrate_bcrypt_rounds,
+)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--target-ms", type=float, default=250.0, help="latency budget of one hash")
+    parser.add_argument("--min-rounds", type=int, default=BCRYPT_MIN_ROUNDS)
+    parser.add_argument("--max-rounds", type=int, default=BCRYPT_MAX_ROUNDS)
+    parser.add_argument("--samples", type=int, default=3, help="hashes measured per cost")
+    args = parser.parse_args()
+
+    rounds, timings = calibrate_bcrypt_rounds(
+        target_ms=args.target_ms,
+        min_rounds=args.min_rounds,
+        max_rounds=args.max_rounds,
+        samples=args.samples,
+    )
+
+    for cost, ms in timings.items():
+        print(f"cost {cost:>2}: {ms:9.1f} ms")
+    print(f"BCRYPT_ROUNDS={rounds}")
+
+
+if __name__ == "__main__":
+    main()
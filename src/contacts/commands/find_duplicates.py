@@ -0,0 +1,60 @@
+"""
+Finds likely duplicate contacts of every owner.
+
+    PYTHONPATH=src python -m contacts.commands.find_duplicates --workers 8
+
+Clusters replace each owner's previous results in the contact_duplicates table.
+The same job runs in the API process on `POST /internal/duplicates`.
+"""
+import argparse
+import asyncio
+
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from contacts.core.settings import get_settings
+from contacts.db.events import create_engine
+from contacts.helpers.duplicate_detection import DuplicateDetection
+
+
+async def run(detection: DuplicateDetection) -> dict:
+    settings = get_settings()
+    engine = create_engine(settings.async_db_conn_str, settings)
+    try:
+        return await detection.run(async_sessionmaker(engine, expire_on_commit=False))
+    finally:
+        await engine.dispose()
+
+
+def main() -> None:
+    settings = get_settings()
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--workers", type=int, default=settings.contacts_duplicates_workers)
+    parser.add_argument(
+        "--batch-size", type=int, default=settings.contacts_duplicates_batch_size,
+        help="contacts scored by one worker at a time, owners aren't split",
+    )
+    parser.add_argument("--fetch-size", type=int, default=settings.contacts_duplicates_fetch_size)
+    parser.add_argument(
+        "--threshold", type=float, default=settings.contacts_duplicates_threshold,
+        help="lowest pair score, from 0 to 1, that counts as a duplicate",
+    )
+    parser.add_argument(
+        "--max-block", type=int, default=settings.contacts_duplicates_max_block,
+        help="contacts sharing a blocking key above which the key is skipped",
+    )
+    args = parser.parse_args()
+
+    stats = asyncio.run(run(DuplicateDetection(
+        workers=args.workers,
+        batch_size=args.batch_size,
+        fetch_size=args.fetch_size,
+        threshold=args.threshold,
+        max_block=args.max_block,
+    )))
+
+    for name, value in stats.items():
+        print(f"{name}: {value}")
+
+
+if __name__ == "__main__":
+    main()
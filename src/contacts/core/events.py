@@ -5,6 +5,8 @@ from loguru import logger
 
 from .settings import Settings
 from contacts.db.events import connect_to_db, disconnect_from_db
+from contacts.helpers.hashing import PasswordHasher
+from contacts.helpers.revocation import RevocationList
 
 
 def get_startup_handler(app: FastAPI, settings: Settings) -> Callable:
@@ -13,13 +15,32 @@ def get_startup_handler(app: FastAPI, settings: Settings) -> Callable:
 
         await connect_to_db(app, settings)
 
+        app.state.password_hasher = PasswordHasher(
+            workers=settings.hasher_workers,
+            queue_size=settings.hasher_queue_size,
+            timeout_s=settings.hasher_timeout_s,
+            rounds=settings.bcrypt_rounds,
+        )
+        app.state.password_hasher.start()
+
+        app.state.revocation_list = RevocationList(
+            capacity=settings.revocation_bloom_capacity,
+            fp_rate=settings.revocation_bloom_fp_rate,
+            sync_interval_s=settings.revocation_sync_interval_s,
+        )
+        await app.state.revocation_list.start(app.state.session_factory)
+
     return start_app
 
 
 def get_shutdown_handler(app: FastAPI) -> Callable:
     async def stop_app() -> None:
         logger.debug("Stopping app")
-        
+
+        await app.state.revocation_list.stop()
+        await app.state.duplicate_detection.stop()
         await disconnect_from_db(app)
 
+        app.state.password_hasher.shutdown()
+
     return stop_app
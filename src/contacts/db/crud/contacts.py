@@ -1,33 +1,298 @@
 import uuid
-from typing import List
+from functools import lru_cache
+from typing import AsyncIterator, List, Tuple
 
 from loguru import logger
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.engine import ChunkedIteratorResult
-from sqlalchemy import insert, update, delete
+from sqlalchemy.engine import ChunkedIteratorResult, RowMapping
+from sqlalchemy import (
+    update,
+    delete,
+    bindparam,
+    func,
+    and_,
+    or_,
+    tuple_,
+    true,
+    union_all,
+    literal_column,
+    Boolean,
+    Column,
+    Float,
+    Integer,
+    MetaData,
+    String,
+    Table,
+)
 from sqlalchemy.future import select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.sql import Select
 
-from contacts.models.db.tables import Contact
+from contacts.models.db.tables import CONTACT_SUGGEST_COLUMNS, Contact, User, contact_suggest_term
 from contacts.models.db.entities import ContactInDb
-from contacts.models.schemas.meta import ContactsFilterParams, UserRoleEnum
-from .users import get_user
+from contacts.models.schemas.meta import (
+    ContactsFilterParams,
+    ContactsCursor,
+    ContactsSearchCursor,
+    UserRoleEnum,
+)
+from contacts.db.session import transaction, record_contact_change
+from contacts.helpers.cache import UPSERT, DELETE, INVALIDATE
+from contacts.helpers.address_book import ORDER_FIELDS
+
+
+SELECT_CONTACT_BY_ID = select(Contact).where(Contact.id == bindparam("id"))
+
+# Writes carry the authorization: they match only if the caller owns the
+# contact or `any_owner` is set (admins), so no ownership check runs beforehand
+CONTACT_WRITABLE = and_(
+    Contact.id == bindparam("contact_id"),
+    or_(Contact.owner_id == bindparam("writer_id"), bindparam("any_owner", type_=Boolean)),
+)
+DELETE_CONTACT = (
+    delete(Contact).
+    where(CONTACT_WRITABLE).
+    returning(Contact.id, Contact.owner_id).
+    execution_options(synchronize_session=False)
+)
+# A number the owner already has is skipped by the unique index,
+# so nothing looks it up beforehand
+PHONE_NUMBER_CONFLICT = (Contact.owner_id, Contact.normalized_phone)
+INSERT_CONTACT = (
+    pg_insert(Contact).
+    on_conflict_do_nothing(index_elements=PHONE_NUMBER_CONFLICT).
+    returning(Contact)
+)
+INSERT_CONTACTS = (
+    pg_insert(Contact).
+    on_conflict_do_nothing(index_elements=PHONE_NUMBER_CONFLICT).
+    returning(Contact.id)
+)
+
+CONTACT_UPDATABLE_FIELDS = (
+    "last_name",
+    "first_name",
+    "middle_name",
+    "organisation",
+    "job_title",
+    "email",
+    "phone_number",
+)
+# Fields left as NULL keep their current value, so no prior SELECT is needed
+UPDATE_CONTACT = (
+    update(Contact).
+    where(CONTACT_WRITABLE).
+    values({
+        field: func.coalesce(bindparam(f"new_{field}", type_=getattr(Contact, field).type), getattr(Contact, field))
+        for field in CONTACT_UPDATABLE_FIELDS
+    }).
+    returning(Contact).
+    execution_options(synchronize_session=False)
+)
+
+# Numbers stay unique per owner, one value can't be given to many contacts
+CONTACT_FILTERED_UPDATE_FIELDS = tuple(
+    field for field in CONTACT_UPDATABLE_FIELDS if field != "phone_number"
+)
+
+# An import's rows wait here until they are merged, the table is private
+# to the transaction. `record` is the row's position in the uploaded file
+IMPORT_STAGING = Table(
+    "contacts_import",
+    MetaData(),
+    Column("record", Integer),
+    Column("id", Contact.id.type),
+    *(Column(field, String) for field in CONTACT_UPDATABLE_FIELDS),
+    prefixes=["TEMPORARY"],
+    postgresql_on_commit="DROP",
+)
+IMPORT_STAGING_COLUMNS = tuple(IMPORT_STAGING.c.keys())
+# First occurrence of each number in the file, unless the owner already has it:
+# later ones conflict on the unique index. A Core insert, the ORM would take
+# the parameters for rows to insert
+MERGE_IMPORTED_CONTACTS = (
+    pg_insert(Contact.__table__).
+    from_select(
+        ["id", "owner_id", *CONTACT_UPDATABLE_FIELDS],
+        select(
+            IMPORT_STAGING.c.id,
+            bindparam("importer_id", type_=Integer),
+            *(IMPORT_STAGING.c[field] for field in CONTACT_UPDATABLE_FIELDS),
+        ).
+        order_by(IMPORT_STAGING.c.record)
+    ).
+    on_conflict_do_nothing(index_elements=["owner_id", "normalized_phone"])
+)
+
+# Canonical filter order, so the same set of filters always maps to the same statement
+CONTACT_FILTER_FIELDS = tuple(ContactsFilterParams.__fields__)
+# What a listed contact carries in a response, streamed rows skip the ORM
+CONTACT_RESPONSE_COLUMNS = (
+    Contact.id,
+    Contact.last_name,
+    Contact.first_name,
+    Contact.middle_name,
+    Contact.organisation,
+    Contact.job_title,
+    Contact.email,
+    Contact.phone_number,
+)
+
+SELECT_OWNER_CONTACT_ROWS = select(*CONTACT_RESPONSE_COLUMNS).where(Contact.owner_id == bindparam("owner_id"))
+
+# Typeahead without the prefix index: the first `limit` matches of every
+# suggest column, each a range scan on its ix_contacts_owner_id_lower_<column>.
+# Merged by the matching value, a contact matching twice is dropped by the caller
+SUGGEST_MATCHES = union_all(*(
+    select(contact_suggest_term(column).label("term"), *CONTACT_RESPONSE_COLUMNS).
+    where(
+        Contact.owner_id == bindparam("owner_id"),
+        contact_suggest_term(column).like(bindparam("pattern"), escape="\\"),
+    ).
+    order_by(contact_suggest_term(column)).
+    limit(bindparam("limit"))
+    for column in CONTACT_SUGGEST_COLUMNS
+)).subquery("matches")
+SELECT_SUGGESTIONS = (
+    select(*(SUGGEST_MATCHES.c[column.key] for column in CONTACT_RESPONSE_COLUMNS)).
+    order_by(SUGGEST_MATCHES.c.term, SUGGEST_MATCHES.c.id)
+)
+
+# An address book: the owner's version, then each contact with its position in
+# every sort order, numbered by Postgres so the collation is the list query's.
+# The LIMIT bounds the work for an owner too big to keep, the outer join
+# returns the version of an owner without contacts
+OWNED_CONTACTS = (
+    select(*CONTACT_RESPONSE_COLUMNS).
+    where(Contact.owner_id == bindparam("owner_id")).
+    limit(bindparam("max_rows")).
+    cte("owned_contacts")
+)
+SELECT_OWNER_ADDRESS_BOOK = (
+    select(
+        User.version,
+        *OWNED_CONTACTS.c,
+        *(
+            func.row_number().over(order_by=(OWNED_CONTACTS.c[field], OWNED_CONTACTS.c.id))
+            for field in ORDER_FIELDS
+        ),
+    ).
+    select_from(User).
+    outerjoin(OWNED_CONTACTS, true()).
+    where(User.id == bindparam("owner_id"))
+)
+
+
+@lru_cache(maxsize=512)
+def select_contacts_stmt(
+    filter_fields: tuple[str, ...],
+    order_by: str,
+    keyset: bool = False,
+    limited: bool = False,
+    response_columns: bool = False,
+) -> Select:
+    """
+    Statement for one filter shape, values are bound at execution.
+    Reusing the object keeps its cache key memoized between requests
+    """
+    column = getattr(Contact, order_by)
+    stmt = select(*CONTACT_RESPONSE_COLUMNS) if response_columns else select(Contact)
+    if filter_fields:
+        stmt = stmt.where(*(getattr(Contact, field) == bindparam(field) for field in filter_fields))
+
+    if keyset:
+        # a range scan on the (owner_id, <column>, id) index, however deep the page is
+        stmt = stmt.where(
+            tuple_(column, Contact.id) >
+            tuple_(bindparam("cursor_value", type_=String), bindparam("cursor_id", type_=Contact.id.type))
+        )
+
+    stmt = stmt.order_by(column, Contact.id)
+    if limited:
+        stmt = stmt.limit(bindparam("page_limit"))
+
+    return stmt
+
+
+@lru_cache(maxsize=512)
+def filtered_write_stmt(filter_fields: tuple[str, ...], action: str) -> Select:
+    """
+    Set-based statement over every contact matching one filter shape:
+    `count` (a dry run), `update` or `delete`.
+    Filter values are bound as `filter_<field>`, UPDATE reserves the column names
+    """
+    where = [getattr(Contact, field) == bindparam(f"filter_{field}") for field in filter_fields]
+    if action == "count":
+        return select(func.count()).select_from(Contact).where(*where)
+    if action == "update":
+        return (
+            update(Contact).
+            where(*where).
+            values({
+                field: func.coalesce(
+                    bindparam(f"new_{field}", type_=getattr(Contact, field).type),
+                    getattr(Contact, field),
+                )
+                for field in CONTACT_FILTERED_UPDATE_FIELDS
+            }).
+            execution_options(synchronize_session=False)
+        )
+    if action == "delete":
+        return delete(Contact).where(*where).execution_options(synchronize_session=False)
+
+    raise ValueError(f"Unknown filtered write: {action}")
+
+
+SEARCH_QUERY = func.to_tsquery(
+    literal_column("'simple'::regconfig"),
+    bindparam("search_query", type_=String),
+)
+
+
+@lru_cache(maxsize=8)
+def search_contacts_stmt(scoped: bool, keyset: bool) -> Select:
+    """
+    Contacts matching a tsquery, best ranked first.
+    Pages follow (rank, id) from the previous page's last match.
+    Postgres can't estimate how many rows a prefix matches: it would pick the GIN
+    index for an owner's search and scan every owner's matches of a short prefix.
+    An owner's contacts are few, so they are read through the owner index first
+    and only searches across owners use the GIN index
+    """
+    source = Contact.__table__
+    if scoped:
+        source = (
+            select(source).
+            where(source.c.owner_id == bindparam("owner_id")).
+            cte("owned_contacts").
+            prefix_with("MATERIALIZED")
+        )
+    rank = func.ts_rank(source.c.search_vector, SEARCH_QUERY, type_=Float)
+
+    stmt = (
+        select(*(source.c[column.key] for column in CONTACT_RESPONSE_COLUMNS), rank.label("rank")).
+        where(source.c.search_vector.bool_op("@@")(SEARCH_QUERY))
+    )
+    if keyset:
+        stmt = stmt.where(
+            tuple_(-rank, source.c.id) >
+            tuple_(-bindparam("cursor_rank", type_=Float), bindparam("cursor_id", type_=Contact.id.type))
+        )
+
+    return stmt.order_by(rank.desc(), source.c.id).limit(bindparam("page_limit"))
 
 
 async def create_contact(
     contact: ContactInDb,
     db_session: AsyncSession,
-) -> ContactInDb:
-    async with db_session.begin():
-        stmt = (
-            insert(Contact).values(**contact.dict())
-        )
-        await db_session.execute(stmt)
-        stmt = (
-            select(Contact).where(Contact.id == contact.id)
-        )
-        contact: Contact = await db_session.scalar(stmt)
+) -> ContactInDb | None:
+    """Returns None if the owner already has a contact with the number"""
+    async with transaction(db_session):
+        contact: Contact | None = await db_session.scalar(INSERT_CONTACT, contact.dict())
+        if contact is None:
+            return contact
 
-        return ContactInDb(
+        created = ContactInDb(
             id=contact.id,
             owner_id=contact.owner_id,
             last_name=contact.last_name,
@@ -38,15 +303,70 @@ async def create_contact(
             email=contact.email,
             phone_number=contact.phone_number,
         )
+        record_contact_change(db_session, UPSERT, created)
+
+        return created
+
+
+async def create_contacts(
+    contacts: List[ContactInDb],
+    db_session: AsyncSession,
+) -> List[uuid.UUID]:
+    """
+    Inserts the batch with multi-row INSERT ... RETURNING statements.
+    Returns the ids inserted, contacts whose number the owner already has are skipped
+    """
+    if not contacts:
+        return []
+
+    async with transaction(db_session):
+        result = await db_session.execute(INSERT_CONTACTS, [contact.dict() for contact in contacts])
+        created = list(result.scalars())
+        created_ids = set(created)
+        for contact in contacts:
+            if contact.id in created_ids:
+                record_contact_change(db_session, UPSERT, contact)
+
+        return created
+
+
+async def import_contacts(
+    owner_id: int,
+    chunks: AsyncIterator[List[Tuple]],
+    db_session: AsyncSession,
+) -> Tuple[int, int]:
+    """
+    COPYs each chunk of rows (in IMPORT_STAGING_COLUMNS order) into a temporary table,
+    then merges them into the owner's contacts with one INSERT ... SELECT.
+    Returns how many rows were staged and how many of them were inserted
+    """
+    staged = 0
+    async with transaction(db_session):
+        connection = await db_session.connection()
+        await connection.run_sync(IMPORT_STAGING.create)
+        driver_connection = (await connection.get_raw_connection()).driver_connection
+
+        async for chunk in chunks:
+            await driver_connection.copy_records_to_table(
+                IMPORT_STAGING.name,
+                records=chunk,
+                columns=IMPORT_STAGING_COLUMNS,
+            )
+            staged += len(chunk)
+
+        if not staged:
+            return 0, 0
+
+        result = await db_session.execute(MERGE_IMPORTED_CONTACTS, {"importer_id": owner_id})
+        if result.rowcount:
+            record_contact_change(db_session, INVALIDATE, owner_id)
+
+        return staged, result.rowcount
 
 
 async def get_contact(id: uuid.UUID, db_session: AsyncSession) -> ContactInDb | None:
-    async with db_session.begin():
-        stmt = (
-            select(Contact).
-            where(Contact.id == str(id))
-        )
-        contact = await db_session.scalar(stmt)
+    async with transaction(db_session):
+        contact = await db_session.scalar(SELECT_CONTACT_BY_ID, {"id": str(id)})
         if contact is None:
             return contact
 
@@ -63,30 +383,58 @@ async def get_contact(id: uuid.UUID, db_session: AsyncSession) -> ContactInDb |
         )
 
 
+def scoped_filters(user_id: int, filter_params: ContactsFilterParams, role: str) -> dict:
+    """Filters that were set, anyone but an admin is restricted to their own contacts"""
+    if role != UserRoleEnum.admin.value:
+        filter_params.owner_id = user_id
+
+    return filter_params.dict(exclude_none=True)
+
+
+def contacts_query(
+    user_id: int,
+    filter_params: ContactsFilterParams,
+    order_by: str,
+    role: str = UserRoleEnum.user.value,
+    limit: int | None = None,
+    after: ContactsCursor | None = None,
+    response_columns: bool = False,
+) -> tuple[Select, dict]:
+    """
+    Statement and parameters listing contacts visible to the user.
+    `role` comes from the verified token, admins see every owner's contacts.
+    Contacts are ordered by (order_by, id), a page of `limit` starts right after `after`
+    """
+    filters = scoped_filters(user_id, filter_params, role)
+    stmt = select_contacts_stmt(
+        tuple(field for field in CONTACT_FILTER_FIELDS if field in filters),
+        order_by,
+        keyset=after is not None,
+        limited=limit is not None,
+        response_columns=response_columns,
+    )
+    params = dict(filters)
+    if limit is not None:
+        params["page_limit"] = limit
+    if after is not None:
+        params.update(cursor_value=after.value, cursor_id=str(after.id))
+
+    return stmt, params
+
+
 async def get_user_contacts_with_filters(
     user_id: int,
     filter_params: ContactsFilterParams,
     order_by: str,
     db_session: AsyncSession,
+    role: str = UserRoleEnum.user.value,
+    limit: int | None = None,
+    after: ContactsCursor | None = None,
 ) -> List[ContactInDb]:
-    user_in_db = await get_user(id=user_id, session=db_session)
-
-    async with db_session.begin():
-        if user_in_db.role == UserRoleEnum.user.value:
-            filter_params.owner_id = user_id
-            stmt = (
-                select(Contact).
-                filter_by(**filter_params.dict(exclude_none=True))
-            )
+    stmt, params = contacts_query(user_id, filter_params, order_by, role, limit, after)
 
-        if user_in_db.role == UserRoleEnum.admin.value:
-            stmt = (
-                select(Contact).
-                filter_by(**filter_params.dict(exclude_none=True))
-            )
-
-        stmt = stmt.order_by(order_by)
-        result: ChunkedIteratorResult = await db_session.execute(stmt)
+    async with transaction(db_session):
+        result: ChunkedIteratorResult = await db_session.execute(stmt, params)
 
         return [ContactInDb(
             id=contact.id,
@@ -101,9 +449,123 @@ async def get_user_contacts_with_filters(
         ) for contact in result.scalars().all()]
 
 
+async def search_user_contacts(
+    user_id: int,
+    query: str,
+    db_session: AsyncSession,
+    limit: int,
+    role: str = UserRoleEnum.user.value,
+    after: ContactsSearchCursor | None = None,
+) -> List[RowMapping]:
+    """
+    Matches of a tsquery among the contacts visible to the user, with their rank.
+    Admins search every owner's contacts
+    """
+    scoped = role != UserRoleEnum.admin.value
+    params = {"search_query": query, "page_limit": limit}
+    if scoped:
+        params["owner_id"] = user_id
+    if after is not None:
+        params.update(cursor_rank=after.rank, cursor_id=str(after.id))
+
+    async with transaction(db_session):
+        result = await db_session.execute(search_contacts_stmt(scoped, after is not None), params)
+
+        return result.mappings().all()
+
+
+async def get_owner_address_book(
+    owner_id: int,
+    max_contacts: int,
+    db_session: AsyncSession,
+) -> Tuple[int | None, List[tuple], List[List[int]]]:
+    """
+    The owner's version, up to `max_contacts` + 1 contacts as rows of CONTACT_RESPONSE_COLUMNS
+    and, per ORDER_FIELDS member, each row's 1-based position in that order
+    """
+    async with transaction(db_session):
+        result = await db_session.execute(
+            SELECT_OWNER_ADDRESS_BOOK,
+            {"owner_id": owner_id, "max_rows": max_contacts + 1},
+        )
+        records = result.all()
+
+    if not records:
+        return None, [], [[] for _ in ORDER_FIELDS]
+
+    width = len(CONTACT_RESPONSE_COLUMNS)
+    contacts = [record for record in records if record[1] is not None]
+    rows = [tuple(record[1:1 + width]) for record in contacts]
+    ranks = [[record[1 + width + order] for record in contacts] for order in range(len(ORDER_FIELDS))]
+    return records[0][0], rows, ranks
+
+
+async def get_owner_contact_rows(owner_id: int, db_session: AsyncSession) -> List[tuple]:
+    """Every contact of the owner as a row of CONTACT_RESPONSE_COLUMNS, what the prefix index is built from"""
+    async with transaction(db_session):
+        result = await db_session.execute(SELECT_OWNER_CONTACT_ROWS, {"owner_id": owner_id})
+
+        return [tuple(row) for row in result]
+
+
+async def suggest_owner_contacts(
+    owner_id: int,
+    prefix: str,
+    limit: int,
+    db_session: AsyncSession,
+) -> List[tuple]:
+    """
+    Up to `limit` contacts of the owner with a suggest column starting with the lowercase `prefix`,
+    as rows of CONTACT_RESPONSE_COLUMNS in the order of the matching value
+    """
+    pattern = prefix.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+    async with transaction(db_session):
+        result = await db_session.execute(
+            SELECT_SUGGESTIONS, {"owner_id": owner_id, "pattern": pattern, "limit": limit},
+        )
+
+        suggestions: dict[uuid.UUID, tuple] = {}
+        for row in result:
+            suggestions.setdefault(row[0], tuple(row))
+        return list(suggestions.values())[:limit]
+
+
+async def stream_user_contacts_with_filters(
+    user_id: int,
+    filter_params: ContactsFilterParams,
+    order_by: str,
+    db_session: AsyncSession,
+    fetch_size: int,
+    role: str = UserRoleEnum.user.value,
+    after: ContactsCursor | None = None,
+) -> AsyncIterator[List[RowMapping]]:
+    """
+    Same listing read through a server-side cursor, `fetch_size` rows at a time.
+    Only one batch is held in memory, the session must stay open until it's exhausted
+    """
+    stmt, params = contacts_query(
+        user_id, filter_params, order_by, role, after=after, response_columns=True,
+    )
+
+    async with transaction(db_session):
+        result = await db_session.stream(
+            stmt,
+            params,
+            execution_options={"yield_per": fetch_size},
+        )
+        async for batch in result.mappings().partitions():
+            yield batch
+
+
+def writable_by(owner_id: int | None) -> dict:
+    """Bind parameters restricting a write to `owner_id`'s contacts, None means any owner"""
+    return {"writer_id": owner_id, "any_owner": owner_id is None}
+
+
 async def update_contact(
     db_session: AsyncSession,
     id: uuid.UUID,
+    owner_id: int | None = None,
     last_name: str | None = None,
     first_name: str | None = None,
     middle_name: str | None = None,
@@ -111,36 +573,118 @@ async def update_contact(
     job_title: str | None = None,
     email: str | None = None,
     phone_number: str | None = None,
-) -> None:
-    async with db_session.begin():
-        old_contact = await db_session.scalar(select(Contact).where(Contact.id == str(id)))
-        stmt = (
-            update(Contact).
-            where(Contact.id == str(id)).
-            values(
-                last_name = last_name or old_contact.last_name,
-                first_name=first_name or old_contact.first_name,
-                middle_name=middle_name or old_contact.middle_name,
-                organisation=organisation or old_contact.organisation,
-                job_title=job_title or old_contact.job_title,
-                email=email or old_contact.email,
-                phone_number=phone_number or old_contact.phone_number,
-            ).returning(
-                Contact.id,
-                Contact.owner_id,
-                Contact.last_name,
-                Contact.first_name,
-                Contact.middle_name,
-                Contact.organisation,
-                Contact.job_title,
-                Contact.email,
-                Contact.phone_number,
-            )
+) -> ContactInDb | None:
+    new_values = {
+        "last_name": last_name,
+        "first_name": first_name,
+        "middle_name": middle_name,
+        "organisation": organisation,
+        "job_title": job_title,
+        "email": email,
+        "phone_number": phone_number,
+    }
+    async with transaction(db_session):
+        contact: Contact | None = await db_session.scalar(
+            UPDATE_CONTACT,
+            {
+                "contact_id": str(id),
+                **writable_by(owner_id),
+                # empty strings never overwrote a field, keep it that way
+                **{f"new_{field}": value or None for field, value in new_values.items()},
+            },
+        )
+        if contact is None:
+            return contact
+
+        updated = ContactInDb(
+            id=contact.id,
+            owner_id=contact.owner_id,
+            last_name=contact.last_name,
+            first_name=contact.first_name,
+            middle_name=contact.middle_name,
+            organisation=contact.organisation,
+            job_title=contact.job_title,
+            email=contact.email,
+            phone_number=contact.phone_number,
+        )
+        record_contact_change(db_session, UPSERT, updated)
+
+        return updated
+
+
+async def delete_contact(
+    db_session: AsyncSession,
+    id: uuid.UUID,
+    owner_id: int | None = None,
+) -> bool:
+    """Returns False if no contact matched"""
+    async with transaction(db_session):
+        deleted = (await db_session.execute(
+            DELETE_CONTACT,
+            {"contact_id": str(id), **writable_by(owner_id)},
+        )).first()
+        if deleted is None:
+            return False
+
+        record_contact_change(db_session, DELETE, deleted.owner_id, deleted.id)
+        return True
+
+
+async def update_contacts_by_filter(
+    user_id: int,
+    filter_params: ContactsFilterParams,
+    db_session: AsyncSession,
+    role: str = UserRoleEnum.user.value,
+    dry_run: bool = False,
+    **new_values: str | None,
+) -> int:
+    """
+    Sets `new_values` (fields left as None keep their value) on every contact
+    the filters match within the caller's scope. Returns how many matched
+    """
+    filters = scoped_filters(user_id, filter_params, role)
+    filter_fields = tuple(field for field in CONTACT_FILTER_FIELDS if field in filters)
+    params = {f"filter_{field}": value for field, value in filters.items()}
+
+    async with transaction(db_session):
+        if dry_run:
+            return await db_session.scalar(filtered_write_stmt(filter_fields, "count"), params)
+
+        result = await db_session.execute(
+            filtered_write_stmt(filter_fields, "update"),
+            {
+                **params,
+                **{
+                    f"new_{field}": new_values.get(field) or None
+                    for field in CONTACT_FILTERED_UPDATE_FIELDS
+                },
+            },
         )
-        await db_session.execute(stmt)
+        if result.rowcount:
+            # an admin's filter without an owner may have touched anyone's contacts
+            record_contact_change(db_session, INVALIDATE, filters.get("owner_id"))
+
+        return result.rowcount
+
+
+async def delete_contacts_by_filter(
+    user_id: int,
+    filter_params: ContactsFilterParams,
+    db_session: AsyncSession,
+    role: str = UserRoleEnum.user.value,
+    dry_run: bool = False,
+) -> int:
+    """Deletes every contact the filters match within the caller's scope, returns how many"""
+    filters = scoped_filters(user_id, filter_params, role)
+    filter_fields = tuple(field for field in CONTACT_FILTER_FIELDS if field in filters)
+    params = {f"filter_{field}": value for field, value in filters.items()}
+
+    async with transaction(db_session):
+        if dry_run:
+            return await db_session.scalar(filtered_write_stmt(filter_fields, "count"), params)
 
+        result = await db_session.execute(filtered_write_stmt(filter_fields, "delete"), params)
+        if result.rowcount:
+            record_contact_change(db_session, INVALIDATE, filters.get("owner_id"))
 
-async def delete_contact(db_session: AsyncSession, id: uuid.UUID) -> None:
-    async with db_session.begin():
-        stmt = delete(Contact).where(Contact.id == str(id))
-        await db_session.execute(stmt)
+        return result.rowcount
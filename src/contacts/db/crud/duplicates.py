@@ -0,0 +1,89 @@
+from typing import AsyncIterator, List
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import (
+    ARRAY,
+    Float,
+    Integer,
+    Uuid,
+    any_,
+    bindparam,
+    delete,
+    func,
+    insert,
+)
+from sqlalchemy.future import select
+
+from contacts.models.db.tables import Contact, ContactDuplicate
+from contacts.db.session import transaction
+from contacts.helpers.duplicates import ContactRow, DuplicateRow
+
+
+# Owners come one after another, so a batch can hold every contact of its owners
+SELECT_CONTACTS_FOR_DEDUPLICATION = (
+    select(
+        Contact.id,
+        Contact.owner_id,
+        Contact.last_name,
+        Contact.first_name,
+        Contact.middle_name,
+        Contact.email,
+        Contact.normalized_phone,
+    ).
+    order_by(Contact.owner_id)
+)
+DELETE_OWNER_DUPLICATES = (
+    delete(ContactDuplicate).
+    where(ContactDuplicate.owner_id == any_(bindparam("owner_ids", type_=ARRAY(Integer))))
+)
+DUPLICATE_MEMBERS = func.unnest(
+    bindparam("contact_ids", type_=ARRAY(Uuid)),
+    bindparam("cluster_ids", type_=ARRAY(Uuid)),
+    bindparam("scores", type_=ARRAY(Float)),
+).table_valued("contact_id", "cluster_id", "score").render_derived(name="members")
+# Joined with contacts, so a contact deleted since it was read is left out.
+# A Core insert, the ORM would take the parameters for rows to insert
+INSERT_DUPLICATES = insert(ContactDuplicate.__table__).from_select(
+    ["contact_id", "owner_id", "cluster_id", "score"],
+    select(
+        Contact.id,
+        Contact.owner_id,
+        DUPLICATE_MEMBERS.c.cluster_id,
+        DUPLICATE_MEMBERS.c.score,
+    ).
+    join(DUPLICATE_MEMBERS, Contact.id == DUPLICATE_MEMBERS.c.contact_id)
+)
+
+
+async def stream_contacts_for_deduplication(
+    db_session: AsyncSession,
+    fetch_size: int,
+) -> AsyncIterator[List[ContactRow]]:
+    """Every contact's matching fields ordered by owner, `fetch_size` rows at a time"""
+    async with transaction(db_session):
+        result = await db_session.stream(
+            SELECT_CONTACTS_FOR_DEDUPLICATION,
+            execution_options={"yield_per": fetch_size},
+        )
+        async for batch in result.tuples().partitions():
+            yield [tuple(row) for row in batch]
+
+
+async def replace_duplicates(
+    owner_ids: List[int],
+    duplicates: List[DuplicateRow],
+    db_session: AsyncSession,
+) -> None:
+    """Swaps the owners' previous results for `duplicates`"""
+    async with transaction(db_session):
+        await db_session.execute(DELETE_OWNER_DUPLICATES, {"owner_ids": owner_ids})
+        if duplicates:
+            contact_ids, _, cluster_ids, scores = zip(*duplicates)
+            await db_session.execute(
+                INSERT_DUPLICATES,
+                {
+                    "contact_ids": list(contact_ids),
+                    "cluster_ids": list(cluster_ids),
+                    "scores": list(scores),
+                },
+            )
@@ -0,0 +1,127 @@
+from datetime import datetime
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import insert, update
+from sqlalchemy.future import select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from contacts.models.db.tables import RefreshToken, RevokedToken, User
+from contacts.db.session import transaction
+
+
+async def create_refresh_token(
+    session: AsyncSession,
+    user_id: int,
+    token_hash: str,
+    expires_at: datetime,
+) -> None:
+    async with transaction(session):
+        stmt = (
+            insert(RefreshToken).
+            values(user_id=user_id, token_hash=token_hash, expires_at=expires_at)
+        )
+        await session.execute(stmt)
+
+
+async def rotate_refresh_token(
+    session: AsyncSession,
+    token_hash: str,
+    new_token_hash: str,
+    expires_at: datetime,
+) -> tuple[int, str] | None:
+    """
+    Revokes a live refresh token and stores its successor in one transaction.
+    Returns owner's id and role, or None if the token is unknown, expired or revoked
+    """
+    async with transaction(session):
+        stmt = (
+            update(RefreshToken).
+            where(
+                RefreshToken.token_hash == token_hash,
+                RefreshToken.revoked.is_(False),
+                RefreshToken.expires_at > datetime.utcnow(),
+                RefreshToken.user_id == User.id,
+            ).
+            values(revoked=True).
+            returning(RefreshToken.user_id, User.role)
+        )
+        row = (await session.execute(stmt)).first()
+        if row is None:
+            return None
+
+        user_id, role = row
+        stmt = (
+            insert(RefreshToken).
+            values(user_id=user_id, token_hash=new_token_hash, expires_at=expires_at)
+        )
+        await session.execute(stmt)
+
+        return user_id, role.value
+
+
+async def get_revoked_refresh_token_owner(session: AsyncSession, token_hash: str) -> int | None:
+    async with transaction(session):
+        stmt = (
+            select(RefreshToken.user_id).
+            where(RefreshToken.token_hash == token_hash, RefreshToken.revoked.is_(True))
+        )
+
+        return await session.scalar(stmt)
+
+
+async def revoke_refresh_token(session: AsyncSession, token_hash: str) -> int | None:
+    """Revokes a token and returns its owner's id, if the token exists"""
+    async with transaction(session):
+        stmt = (
+            update(RefreshToken).
+            where(RefreshToken.token_hash == token_hash).
+            values(revoked=True).
+            returning(RefreshToken.user_id)
+        )
+
+        return await session.scalar(stmt)
+
+
+async def revoke_user_refresh_tokens(session: AsyncSession, user_id: int) -> None:
+    async with transaction(session):
+        stmt = (
+            update(RefreshToken).
+            where(RefreshToken.user_id == user_id, RefreshToken.revoked.is_(False)).
+            values(revoked=True)
+        )
+        await session.execute(stmt)
+
+
+async def revoke_access_token(session: AsyncSession, jti: str, expires_at: datetime) -> None:
+    async with transaction(session):
+        stmt = (
+            pg_insert(RevokedToken).
+            values(jti=jti, expires_at=expires_at).
+            on_conflict_do_nothing()
+        )
+        await session.execute(stmt)
+
+
+async def access_token_is_revoked(session: AsyncSession, jti: str) -> bool:
+    async with transaction(session):
+        stmt = select(RevokedToken.jti).where(RevokedToken.jti == jti)
+
+        return await session.scalar(stmt) is not None
+
+
+async def get_revoked_access_tokens(
+    session: AsyncSession,
+    revoked_since: datetime | None = None,
+) -> list[tuple[str, datetime]]:
+    """Returns jti and revocation time of still unexpired revoked tokens"""
+    async with transaction(session):
+        stmt = (
+            select(RevokedToken.jti, RevokedToken.revoked_at).
+            where(RevokedToken.expires_at > datetime.utcnow())
+        )
+        if revoked_since is not None:
+            stmt = stmt.where(RevokedToken.revoked_at > revoked_since)
+
+        result = await session.execute(stmt)
+
+        return [tuple(row) for row in result.all()]
@@ -1,50 +1,82 @@
 from loguru import logger
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from sqlalchemy import insert
+from sqlalchemy import update, bindparam
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 
 from contacts.models.db.tables import User
 from contacts.models.db.entities import UserInDb
+from contacts.db.session import transaction
+from contacts.helpers.cache import UserCache
+
+
+# Built once: SQLAlchemy memoizes the cache key of a statement object,
+# so executing these skips construction and compilation entirely
+SELECT_USER_BY_ID = select(User).where(User.id == bindparam("id"))
+SELECT_USER_BY_USERNAME = select(User).where(User.username == bindparam("username"))
+SELECT_USER_VERSION = select(User.version).where(User.id == bindparam("id"))
+UPDATE_USER_PASSWORD = (
+    update(User).
+    where(User.id == bindparam("user_id"), User.hashed_password == bindparam("old_hashed_password")).
+    values(hashed_password=bindparam("new_hashed_password"))
+)
 
 
 async def get_user(
     session: AsyncSession,
     id: int | None = None,
     username: str | None = None,
+    cache: UserCache | None = None,
 ) -> UserInDb | None:
-    async with session.begin():
+    if cache is not None:
+        user_in_db = cache.get(id=id, username=username)
+        if user_in_db is not None:
+            return user_in_db
+
+    async with transaction(session):
         if id is not None:
-            stmt = select(User).where(User.id == id)
+            user: User = await session.scalar(SELECT_USER_BY_ID, {"id": id})
         elif username:
-            stmt = select(User).where(User.username == username)
+            user: User = await session.scalar(SELECT_USER_BY_USERNAME, {"username": username})
         else:
             return None
 
-        user: User = await session.scalar(stmt)
-
         if user is None:
             return user
 
-        return UserInDb(
+        user_in_db = UserInDb(
             id=user.id,
             username=user.username,
             hashed_password=user.hashed_password,
             role=user.role.value,
         )
+        if cache is not None:
+            cache.set(user_in_db)
+
+        return user_in_db
+
+
+async def get_user_version(session: AsyncSession, id: int) -> int | None:
+    """Bumped by every write to the user's contacts, None for an unknown user"""
+    async with transaction(session):
+        return await session.scalar(SELECT_USER_VERSION, {"id": id})
 
 
 async def create_user(
     session: AsyncSession,
     user: UserInDb,
-) -> UserInDb:
-    async with session.begin():
+) -> UserInDb | None:
+    """Returns None if the username or the id is already taken"""
+    async with transaction(session):
         stmt = (
-            insert(User).
-            values(**user.dict())
+            pg_insert(User).
+            values(**user.dict(exclude_none=True)).
+            on_conflict_do_nothing().
+            returning(User)
         )
-        await session.execute(stmt)
-        stmt = select(User).where(User.id==user.id)
-        user = await session.scalar(stmt)
+        user: User | None = await session.scalar(stmt)
+        if user is None:
+            return user
 
         return UserInDb(
             id=user.id,
@@ -52,3 +84,28 @@ async def create_user(
             hashed_password=user.hashed_password,
             role=user.role.value,
         )
+
+
+async def update_user_password(
+    session: AsyncSession,
+    id: int,
+    hashed_password: str,
+    old_hashed_password: str,
+    cache: UserCache | None = None,
+) -> bool:
+    """Replaces the hash only if nobody changed it since `old_hashed_password` was read"""
+    async with transaction(session):
+        result = await session.execute(
+            UPDATE_USER_PASSWORD,
+            {
+                "user_id": id,
+                "old_hashed_password": old_hashed_password,
+                "new_hashed_password": hashed_password,
+            },
+        )
+
+    # after the commit, so a concurrent read can't cache the old row again
+    if cache is not None:
+        cache.invalidate(id)
+
+    return result.rowcount == 1
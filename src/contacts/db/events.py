@@ -1,30 +1,63 @@
 from fastapi import FastAPI
-from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine, async_sessionmaker
 from loguru import logger
 
 from ..core.settings import Settings
+from .pool import MonitoredQueuePool, PoolMonitor
+from .routing import ReplicaRouter
+
+
+def create_engine(conn_str: str, settings: Settings) -> AsyncEngine:
+    engine = create_async_engine(
+        conn_str,
+        poolclass=MonitoredQueuePool,
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+        pool_recycle=settings.db_pool_recycle_s,
+        pool_pre_ping=settings.db_pool_pre_ping,
+        pool_timeout=settings.db_pool_timeout_s,
+        connect_args={
+            # SQLAlchemy keeps its own prepared statements cache on top of asyncpg
+            "prepared_statement_cache_size": settings.db_statement_cache_size,
+            "statement_cache_size": settings.db_statement_cache_size,
+        },
+    )
+    engine.sync_engine.pool.monitor = PoolMonitor(warn_ms=settings.db_pool_acquire_warn_ms)
+
+    return engine
 
 
 async def connect_to_db(app: FastAPI,settings: Settings) -> None:
     """
-    Creates and assings database engine to an application
+    Creates and assings database engines and session factory to an application
     """
 
     logger.info("Connecting to db")
 
-    engine = create_async_engine(settings.async_db_conn_str)
+    engine = create_engine(settings.async_db_conn_str, settings)
     app.state.engine = engine
+    app.state.session_factory = async_sessionmaker(engine, expire_on_commit=False)
+    app.state.replica_router = ReplicaRouter(
+        primary=engine,
+        replicas=[
+            create_engine(conn_str, settings)
+            for conn_str in settings.async_db_replica_conn_strs
+        ],
+        strategy=settings.db_replica_routing,
+        sticky_s=settings.db_replica_sticky_s,
+    )
 
-    logger.info("Connected to db")
+    logger.info(f"Connected to db with {len(app.state.replica_router.replicas)} replicas")
 
 
 async def disconnect_from_db(app: FastAPI) -> None:
     """
-    Disposes an application's database engine
+    Disposes an application's database engines
     """
 
     logger.info("Disconnecting from db")
 
-    await app.state.engine.dispose()
+    for engine in app.state.replica_router.engines:
+        await engine.dispose()
 
     logger.info("Connection has been closed")
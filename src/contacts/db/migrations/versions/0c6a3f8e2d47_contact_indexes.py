@@ -0,0 +1,50 @@
+"""Contact indexes
+
+Revision ID: 0c6a3f8e2d47
+Revises: e98411ac11b6
+Create Date: 2026-10-18 21:05:12.418330
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '0c6a3f8e2d47'
+down_revision = 'e98411ac11b6'
+branch_labels = None
+depends_on = None
+
+
+SORT_COLUMNS = (
+    'last_name',
+    'first_name',
+    'middle_name',
+    'job_title',
+    'organisation',
+    'email',
+    'phone_number',
+)
+
+
+def upgrade() -> None:
+    # CONCURRENTLY keeps the table writable while the indexes build,
+    # it cannot run inside a transaction
+    with op.get_context().autocommit_block():
+        for column in SORT_COLUMNS:
+            op.create_index(
+                f'ix_contacts_owner_id_{column}',
+                'contacts',
+                ['owner_id', column, 'id'],
+                unique=False,
+                postgresql_concurrently=True,
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for column in SORT_COLUMNS:
+            op.drop_index(
+                f'ix_contacts_owner_id_{column}',
+                table_name='contacts',
+                postgresql_concurrently=True,
+            )
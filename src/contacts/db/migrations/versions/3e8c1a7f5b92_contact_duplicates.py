@@ -0,0 +1,35 @@
+"""Contact duplicates
+
+Revision ID: 3e8c1a7f5b92
+Revises: 9b4f2c6e8a13
+Create Date: 2026-10-19 01:12:08.417530
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3e8c1a7f5b92'
+down_revision = '9b4f2c6e8a13'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('contact_duplicates',
+    sa.Column('contact_id', sa.Uuid(), nullable=False),
+    sa.Column('owner_id', sa.Integer(), nullable=False),
+    sa.Column('cluster_id', sa.Uuid(), nullable=False),
+    sa.Column('score', sa.Float(), nullable=False),
+    sa.Column('detected_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['contact_id'], ['contacts.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['owner_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('contact_id')
+    )
+    op.create_index('ix_contact_duplicates_owner_id_cluster_id', 'contact_duplicates', ['owner_id', 'cluster_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_contact_duplicates_owner_id_cluster_id', table_name='contact_duplicates')
+    op.drop_table('contact_duplicates')
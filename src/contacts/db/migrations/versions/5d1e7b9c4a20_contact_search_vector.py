@@ -0,0 +1,59 @@
+"""Contact search vector
+
+Revision ID: 5d1e7b9c4a20
+Revises: 0c6a3f8e2d47
+Create Date: 2026-10-18 23:40:37.102954
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '5d1e7b9c4a20'
+down_revision = '0c6a3f8e2d47'
+branch_labels = None
+depends_on = None
+
+
+# same expression as contacts.models.db.tables.CONTACT_SEARCH_VECTOR,
+# a migration must not change when the model does
+SEARCH_VECTOR = (
+    "setweight(to_tsvector('simple', "
+    "coalesce(last_name, '') || ' ' || coalesce(first_name, '') || ' ' || coalesce(middle_name, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(organisation, '') || ' ' || coalesce(job_title, '')), 'B') || "
+    "setweight(to_tsvector('simple', coalesce(email, '')), 'C')"
+)
+
+
+def upgrade() -> None:
+    # a stored generated column rewrites the table under an exclusive lock
+    op.add_column(
+        'contacts',
+        sa.Column(
+            'search_vector',
+            postgresql.TSVECTOR(),
+            sa.Computed(SEARCH_VECTOR, persisted=True),
+            nullable=True,
+        ),
+    )
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_contacts_search_vector',
+            'contacts',
+            ['search_vector'],
+            unique=False,
+            postgresql_using='gin',
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_contacts_search_vector',
+            table_name='contacts',
+            postgresql_concurrently=True,
+        )
+    op.drop_column('contacts', 'search_vector')
@@ -0,0 +1,67 @@
+"""User version
+
+Revision ID: 7a2d9e4c1f68
+Revises: 3e8c1a7f5b92
+Create Date: 2026-10-19 03:05:44.260913
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7a2d9e4c1f68'
+down_revision = '3e8c1a7f5b92'
+branch_labels = None
+depends_on = None
+
+
+# same as contacts.models.db.tables.CONTACTS_VERSION_FUNCTION and its triggers,
+# a migration must not change when the model does
+VERSION_FUNCTION = """
+CREATE OR REPLACE FUNCTION bump_contact_owners_version() RETURNS trigger AS $$
+DECLARE
+    owners integer[];
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        SELECT array_agg(DISTINCT owner_id) INTO owners FROM new_contacts;
+    ELSIF TG_OP = 'DELETE' THEN
+        SELECT array_agg(DISTINCT owner_id) INTO owners FROM old_contacts;
+    ELSE
+        SELECT array_agg(DISTINCT owner_id) INTO owners FROM (
+            SELECT owner_id FROM new_contacts UNION ALL SELECT owner_id FROM old_contacts
+        ) AS written;
+    END IF;
+
+    UPDATE users SET version = version + 1
+    WHERE id IN (
+        SELECT id FROM users WHERE id = ANY(owners) ORDER BY id FOR NO KEY UPDATE
+    );
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql
+"""
+VERSION_TRIGGERS = {
+    'INSERT': 'REFERENCING NEW TABLE AS new_contacts',
+    'UPDATE': 'REFERENCING OLD TABLE AS old_contacts NEW TABLE AS new_contacts',
+    'DELETE': 'REFERENCING OLD TABLE AS old_contacts',
+}
+
+
+def upgrade() -> None:
+    # a constant default doesn't rewrite the table
+    op.add_column('users', sa.Column('version', sa.BigInteger(), server_default='0', nullable=False))
+    op.execute(VERSION_FUNCTION)
+    for operation, transition_tables in VERSION_TRIGGERS.items():
+        op.execute(
+            f'CREATE TRIGGER contacts_version_{operation.lower()} AFTER {operation} ON contacts '
+            f'{transition_tables} '
+            'FOR EACH STATEMENT EXECUTE FUNCTION bump_contact_owners_version()'
+        )
+
+
+def downgrade() -> None:
+    for operation in VERSION_TRIGGERS:
+        op.execute(f'DROP TRIGGER contacts_version_{operation.lower()} ON contacts')
+    op.execute('DROP FUNCTION bump_contact_owners_version()')
+    op.drop_column('users', 'version')
@@ -0,0 +1,68 @@
+"""Contact normalized phone
+
+Revision ID: 9b4f2c6e8a13
+Revises: 5d1e7b9c4a20
+Create Date: 2026-10-19 10:12:48.530217
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9b4f2c6e8a13'
+down_revision = '5d1e7b9c4a20'
+branch_labels = None
+depends_on = None
+
+
+# same expression as contacts.models.db.tables.CONTACT_NORMALIZED_PHONE
+NORMALIZED_PHONE = "regexp_replace(phone_number, '[^0-9]', '', 'g')"
+
+COUNT_DUPLICATES = sa.text(f"""
+    SELECT count(*) FROM (
+        SELECT 1 FROM contacts
+        GROUP BY owner_id, {NORMALIZED_PHONE}
+        HAVING count(*) > 1
+    ) AS duplicates
+""")
+
+
+def upgrade() -> None:
+    # the check before each insert was racy, duplicates may exist already
+    # and would fail the unique index. Which contact to keep is the owner's call
+    duplicates = op.get_bind().scalar(COUNT_DUPLICATES)
+    if duplicates:
+        raise RuntimeError(
+            f"{duplicates} phone numbers repeat within an owner's contacts, "
+            "merge or delete those contacts before upgrading"
+        )
+
+    # a stored generated column computes every existing row, rewriting the table
+    op.add_column(
+        'contacts',
+        sa.Column(
+            'normalized_phone',
+            sa.String(length=100),
+            sa.Computed(NORMALIZED_PHONE, persisted=True),
+            nullable=True,
+        ),
+    )
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_contacts_owner_id_normalized_phone',
+            'contacts',
+            ['owner_id', 'normalized_phone'],
+            unique=True,
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_contacts_owner_id_normalized_phone',
+            table_name='contacts',
+            postgresql_concurrently=True,
+        )
+    op.drop_column('contacts', 'normalized_phone')
@@ -0,0 +1,42 @@
+"""Contact suggest indexes
+
+Revision ID: c4d8a2f61e35
+Revises: 7a2d9e4c1f68
+Create Date: 2026-10-19 14:27:03.118402
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c4d8a2f61e35'
+down_revision = '7a2d9e4c1f68'
+branch_labels = None
+depends_on = None
+
+
+# same as contacts.models.db.tables.CONTACT_SUGGEST_COLUMNS and contact_suggest_term
+SUGGEST_COLUMNS = ("last_name", "first_name", "organisation", "email")
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        for column in SUGGEST_COLUMNS:
+            op.create_index(
+                f'ix_contacts_owner_id_lower_{column}',
+                'contacts',
+                ['owner_id', sa.text(f'(lower({column}) COLLATE "C")')],
+                unique=False,
+                postgresql_concurrently=True,
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for column in SUGGEST_COLUMNS:
+            op.drop_index(
+                f'ix_contacts_owner_id_lower_{column}',
+                table_name='contacts',
+                postgresql_concurrently=True,
+            )
@@ -0,0 +1,98 @@
+import time
+from collections import deque
+
+from loguru import logger
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+
+# Set on a connection record by the checkout that opened it
+CONNECT_TIME_ATTR = "_monitor_connect_s"
+
+
+def percentiles(window: deque[float]) -> dict:
+    ordered = sorted(window)
+
+    def percentile(q: float) -> float:
+        return ordered[min(len(ordered) - 1, int(len(ordered) * q))] if ordered else 0.0
+
+    return {
+        "p50": percentile(0.50),
+        "p95": percentile(0.95),
+        "p99": percentile(0.99),
+        "max": ordered[-1] if ordered else 0.0,
+    }
+
+
+class PoolMonitor:
+    """
+    Keeps a window of recent checkouts: the time spent waiting for an idle
+    connection, and separately the time spent opening new ones
+    """
+
+    def __init__(self, warn_ms: float, window: int = 1024) -> None:
+        self.warn_ms = warn_ms
+        self.acquires = 0
+        self.slow_acquires = 0
+        self.connects = 0
+        self._waits_ms: deque[float] = deque(maxlen=window)
+        self._connects_ms: deque[float] = deque(maxlen=window)
+
+    def observe(self, wait_s: float, connect_s: float | None = None) -> None:
+        wait_ms = wait_s * 1000
+        self.acquires += 1
+        self._waits_ms.append(wait_ms)
+        if wait_ms > self.warn_ms:
+            self.slow_acquires += 1
+            logger.warning(f"Waited {wait_ms:.1f} ms for an idle database connection")
+        if connect_s is not None:
+            self.connects += 1
+            self._connects_ms.append(connect_s * 1000)
+
+    def stats(self, pool: "MonitoredQueuePool") -> dict:
+        return {
+            "size": pool.size(),
+            "checked_out": pool.checkedout(),
+            "idle": pool.checkedin(),
+            "overflow": max(pool.overflow(), 0),
+            "acquires": self.acquires,
+            "slow_acquires": self.slow_acquires,
+            # checkout time minus opening a connection: queueing for a free one
+            "idle_connection_wait_ms": percentiles(self._waits_ms),
+            "connects": self.connects,
+            # checkouts that found the pool cold or went into overflow
+            "new_connection_ms": percentiles(self._connects_ms),
+        }
+
+
+class MonitoredQueuePool(AsyncAdaptedQueuePool):
+    """Queue pool that reports how long each checkout waited and how long new connections took"""
+
+    monitor: PoolMonitor | None = None
+
+    def _do_get(self):
+        started_at = time.perf_counter()
+        try:
+            record = super()._do_get()
+        except exc.TimeoutError:
+            # the whole pool timeout went by without an idle connection
+            if self.monitor is not None:
+                self.monitor.observe(time.perf_counter() - started_at)
+            raise
+
+        if self.monitor is not None:
+            connect_s = record.__dict__.pop(CONNECT_TIME_ATTR, None)
+            self.monitor.observe(time.perf_counter() - started_at - (connect_s or 0.0), connect_s)
+        return record
+
+    def _create_connection(self):
+        started_at = time.perf_counter()
+        record = super()._create_connection()
+        setattr(record, CONNECT_TIME_ATTR, time.perf_counter() - started_at)
+        return record
+
+    def recreate(self) -> "MonitoredQueuePool":
+        # engine.dispose() swaps the pool for a fresh copy
+        pool = super().recreate()
+        pool.monitor = self.monitor
+        return pool
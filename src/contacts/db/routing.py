@@ -0,0 +1,70 @@
+import itertools
+import time
+from collections import OrderedDict
+from typing import Hashable
+
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker
+
+
+ROUND_ROBIN = "round_robin"
+LEAST_CONNECTIONS = "least_connections"
+
+
+class ReplicaRouter:
+    """
+    Picks the engine for read-only work.
+    Reads go to replicas unless the caller wrote within `sticky_s` seconds,
+    then they stay on the primary so the caller sees its own writes
+    """
+
+    def __init__(
+        self,
+        primary: AsyncEngine,
+        replicas: list[AsyncEngine],
+        strategy: str = ROUND_ROBIN,
+        sticky_s: float = 5.0,
+    ) -> None:
+        if strategy not in (ROUND_ROBIN, LEAST_CONNECTIONS):
+            raise ValueError(f"Unknown replica routing strategy: {strategy}")
+
+        self.primary = primary
+        self.replicas = replicas
+        self.strategy = strategy
+        self.sticky_s = sticky_s
+        self._round_robin = itertools.cycle(replicas)
+        self._last_writes: OrderedDict[Hashable, float] = OrderedDict()
+        self._session_factories = {
+            engine: async_sessionmaker(engine, expire_on_commit=False)
+            for engine in [primary, *replicas]
+        }
+
+    def mark_write(self, key: Hashable) -> None:
+        now = time.monotonic()
+        self._last_writes[key] = now
+        self._last_writes.move_to_end(key)
+        # entries are ordered by write time, expired ones are all at the front
+        while self._last_writes:
+            oldest_key, written_at = next(iter(self._last_writes.items()))
+            if now - written_at < self.sticky_s:
+                break
+            del self._last_writes[oldest_key]
+
+    def is_sticky(self, key: Hashable | None) -> bool:
+        written_at = self._last_writes.get(key)
+        return written_at is not None and time.monotonic() - written_at < self.sticky_s
+
+    def reader(self, key: Hashable | None = None) -> AsyncEngine:
+        if not self.replicas or self.is_sticky(key):
+            return self.primary
+
+        if self.strategy == LEAST_CONNECTIONS:
+            return min(self.replicas, key=lambda engine: engine.sync_engine.pool.checkedout())
+
+        return next(self._round_robin)
+
+    def read_session_factory(self, key: Hashable | None = None) -> async_sessionmaker:
+        return self._session_factories[self.reader(key)]
+
+    @property
+    def engines(self) -> list[AsyncEngine]:
+        return [self.primary, *self.replicas]
@@ -0,0 +1,29 @@
+import contextlib
+from typing import AsyncIterator
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+@contextlib.asynccontextmanager
+async def transaction(session: AsyncSession) -> AsyncIterator[AsyncSession]:
+    """
+    Joins the transaction the session is already in (the request's unit of work),
+    otherwise runs the block in its own transaction
+    """
+    if session.in_transaction():
+        yield session
+        return
+
+    async with session.begin():
+        yield session
+
+
+CONTACT_CHANGES = "contact_changes"
+
+
+def record_contact_change(session: AsyncSession, *change) -> None:
+    """
+    Queues a contact write on the session, the unit of work hands the queue
+    to the in-process contact indexes once it committed
+    """
+    session.info.setdefault(CONTACT_CHANGES, []).append(change)
@@ -0,0 +1,152 @@
+import sys
+import time
+from array import array
+from typing import Callable, Sequence
+
+from .cache import OwnerCache
+from .prefix_index import CONTACT_FIELDS
+from contacts.models.schemas.meta import ContactsCursor, OrderContactsByEnum
+
+
+ORDER_FIELDS = tuple(OrderContactsByEnum._member_names_)
+# Contact fields an equality filter can be looked up by, the owner is the book itself
+FILTER_FIELDS = CONTACT_FIELDS[1:]
+COLUMNS = {field: position for position, field in enumerate(CONTACT_FIELDS)}
+# array slots, a dict entry and a list slot per contact and index
+INDEX_ENTRY_BYTES = 120
+
+
+class OwnerAddressBook:
+    """
+    One owner's contacts as rows of CONTACT_FIELDS, every sort order
+    of OrderContactsByEnum as an array of row numbers and a hash index per
+    filterable field. Positions come from the database, so the order and the
+    collation are exactly those of the list query.
+    Immutable: a write drops the book, the next read builds it again
+    """
+
+    def __init__(
+        self,
+        version: int | None,
+        rows: Sequence[tuple],
+        ranks: Sequence[Sequence[int]],
+        expires_at: float,
+    ) -> None:
+        self.version = version
+        self.expires_at = expires_at
+        # ids as text, the driver's UUID type isn't serializable
+        self._rows = [(str(row[0]), *row[1:]) for row in rows]
+        self._by_id = {row[0]: number for number, row in enumerate(self._rows)}
+        # row number -> position in the order, and the order itself
+        self._positions: dict[str, array] = {}
+        self._orders: dict[str, array] = {}
+        for field, field_ranks in zip(ORDER_FIELDS, ranks):
+            positions = array("I", (rank - 1 for rank in field_ranks))
+            order = array("I", bytes(positions.itemsize * len(positions)))
+            for number, position in enumerate(positions):
+                order[position] = number
+            self._positions[field] = positions
+            self._orders[field] = order
+
+        self._indexes: dict[str, dict[str | None, list[int]]] = {field: {} for field in FILTER_FIELDS}
+        for number, row in enumerate(self._rows):
+            for field in FILTER_FIELDS:
+                self._indexes[field].setdefault(row[COLUMNS[field]], []).append(number)
+
+        strings = sum(sys.getsizeof(value) for row in self._rows for value in row)
+        self.size = (
+            sys.getsizeof(self._rows)
+            + sum(sys.getsizeof(row) for row in self._rows)
+            + strings
+            + len(self._rows) * (len(ORDER_FIELDS) * 2 + len(FILTER_FIELDS)) * INDEX_ENTRY_BYTES // 8
+        )
+
+    def page(
+        self,
+        filters: dict,
+        order_by: str,
+        limit: int,
+        after: ContactsCursor | None = None,
+    ) -> list[tuple] | None:
+        """
+        Same rows as the list query: `filters` match by equality, ordered by (order_by, id),
+        at most `limit` of them after the cursor's row. None if the cursor's row is gone
+        or changed, only the database can place it
+        """
+        column = COLUMNS[order_by]
+        positions = self._positions[order_by]
+        start = 0
+        if after is not None:
+            number = self._by_id.get(str(after.id))
+            if number is None or self._rows[number][column] != after.value:
+                return None
+            start = positions[number] + 1
+
+        if filters:
+            candidates = min((self._indexes[field].get(value, ()) for field, value in filters.items()), key=len)
+            numbers = sorted(
+                (
+                    number for number in candidates
+                    if positions[number] >= start
+                    and all(self._rows[number][COLUMNS[field]] == value for field, value in filters.items())
+                ),
+                key=positions.__getitem__,
+            )
+        else:
+            numbers = self._orders[order_by][start:start + limit]
+
+        page = []
+        for number in numbers:
+            row = self._rows[number]
+            # past a cursor, (NULL, id) > (value, id) isn't true and NULLs sort last
+            if after is not None and row[column] is None:
+                break
+            page.append(row)
+            if len(page) == limit:
+                break
+        return page
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+
+class AddressBooks(OwnerCache[OwnerAddressBook]):
+    """
+    Owners' address books for listing without the database, each holding
+    at most `max_contacts`. Bigger owners are remembered for `ttl_s`
+    and keep being listed by the database.
+    Committed writes drop the owner's book
+    """
+
+    def __init__(
+        self,
+        budget_bytes: int,
+        ttl_s: float,
+        max_contacts: int,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        super().__init__(budget_bytes=budget_bytes, ttl_s=ttl_s, clock=clock)
+        self.max_contacts = max_contacts
+
+    def build(
+        self,
+        owner_id: int,
+        generation: int,
+        version: int | None,
+        rows: Sequence[tuple],
+        ranks: Sequence[Sequence[int]],
+    ) -> OwnerAddressBook | None:
+        """
+        Materializes contacts read after `begin_build` returned `generation`, None if
+        the owner has too many. The book is only kept if no write for the owner arrived since
+        """
+        if len(rows) > self.max_contacts:
+            self._mark_oversized(owner_id)
+            return None
+
+        book = OwnerAddressBook(version, rows, ranks, expires_at=self._clock() + self.ttl_s)
+        return self._keep(owner_id, generation, book)
+
+    @property
+    def stats(self) -> dict:
+        return {**super().stats, "max_contacts": self.max_contacts}
@@ -1,21 +1,53 @@
+from loguru import logger
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from contacts.models.db.entities import UserInDb
-from contacts.db.crud.users import get_user
+from contacts.db.crud.users import get_user, update_user_password
 from .security import passwords_match
+from .hashing import PasswordHasher
+from .cache import UserCache
 
 
 async def authenticate_user(
     username: str,
     password: str, 
     session: AsyncSession,
+    hasher: PasswordHasher | None = None,
+    cache: UserCache | None = None,
 ) -> UserInDb | None:
-    user = await get_user(username=username, session=session)
+    user = await get_user(username=username, session=session, cache=cache)
 
     if user is None:
         return None
 
-    if not passwords_match(plain_pw=password, hashed_pw=user.hashed_password):
+    if hasher is None:
+        pw_match = passwords_match(plain_pw=password, hashed_pw=user.hashed_password)
+    else:
+        pw_match = await hasher.verify(plain_pw=password, hashed_pw=user.hashed_password)
+
+    if not pw_match:
         return None
 
     return user
+
+
+async def rehash_password(
+    user: UserInDb,
+    password: str,
+    session: AsyncSession,
+    hasher: PasswordHasher,
+    cache: UserCache | None = None,
+) -> None:
+    """Stores the password hashed with the hasher's current cost"""
+    hashed_password = await hasher.hash(password)
+    async with session:
+        updated = await update_user_password(
+            session=session,
+            id=user.id,
+            hashed_password=hashed_password,
+            old_hashed_password=user.hashed_password,
+            cache=cache,
+        )
+
+    if updated:
+        logger.info(f"Rehashed password of user {user.id} with cost {hasher.rounds}")
@@ -0,0 +1,46 @@
+import hashlib
+import math
+
+
+class BloomFilter:
+    """
+    Set membership with no false negatives and a bounded false-positive rate.
+    Positions come from double hashing of a single blake2b digest
+    """
+
+    def __init__(self, capacity: int, fp_rate: float) -> None:
+        capacity = max(capacity, 1)
+        self.capacity = capacity
+        self.fp_rate = fp_rate
+        self.size = max(8, math.ceil(-capacity * math.log(fp_rate) / math.log(2) ** 2))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.count = 0
+        self._bits = bytearray((self.size + 7) // 8)
+
+    @staticmethod
+    def _hashes(item: str) -> tuple[int, int]:
+        digest = hashlib.blake2b(item.encode("utf-8"), digest_size=16).digest()
+        return int.from_bytes(digest[:8], "little"), int.from_bytes(digest[8:], "little") | 1
+
+    def add(self, item: str) -> None:
+        h1, h2 = self._hashes(item)
+        for i in range(self.hash_count):
+            position = (h1 + i * h2) % self.size
+            self._bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, item: str) -> bool:
+        # most probes are for items that were never added,
+        # they stop at the first unset bit
+        h1, h2 = self._hashes(item)
+        bits, size = self._bits, self.size
+        for i in range(self.hash_count):
+            position = (h1 + i * h2) % size
+            if not bits[position >> 3] & (1 << (position & 7)):
+                return False
+        return True
+
+    @property
+    def expected_fp_rate(self) -> float:
+        """False-positive rate for the number of items added so far"""
+        return (1 - math.exp(-self.hash_count * self.count / self.size)) ** self.hash_count
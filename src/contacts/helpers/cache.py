@@ -0,0 +1,258 @@
+import time
+from collections import OrderedDict
+from typing import Callable, Generic, Hashable, Iterable, TypeVar
+
+from contacts.models.db.entities import ContactInDb, UserInDb
+
+
+V = TypeVar("V")
+
+# Committed contact writes, as queued by record_contact_change
+UPSERT = "upsert"
+DELETE = "delete"
+INVALIDATE = "invalidate"
+# owners whose write generation OwnerCache remembers for builds in flight
+MAX_TRACKED_BUILDS = 10_000
+# owners OwnerCache remembers as too big to keep
+MAX_OVERSIZED_OWNERS = 10_000
+
+
+class LRUCache(Generic[V]):
+    """
+    Bounded least-recently-used mapping whose entries expire
+    at an absolute unix timestamp
+    """
+
+    def __init__(
+        self,
+        max_size: int,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._clock = clock
+        self._entries: OrderedDict[Hashable, tuple[float, V]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> V | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        expires_at, value = entry
+        if expires_at <= self._clock():
+            del self._entries[key]
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: V, expires_at: float) -> None:
+        if self.max_size <= 0 or expires_at <= self._clock():
+            return
+
+        self._entries[key] = (expires_at, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, key: Hashable) -> V | None:
+        entry = self._entries.pop(key, None)
+        return entry and entry[1]
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    @property
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+class UserCache:
+    """
+    User records reachable by id and by username.
+    Entries live at most `ttl_s` seconds, which bounds how stale
+    another process's copy can get after a write
+    """
+
+    def __init__(
+        self,
+        max_size: int,
+        ttl_s: float,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.ttl_s = ttl_s
+        self._clock = clock
+        # every user takes two entries, one per key
+        self._users: LRUCache[UserInDb] = LRUCache(max_size=max_size * 2, clock=clock)
+
+    def get(self, id: int | None = None, username: str | None = None) -> UserInDb | None:
+        if id is not None:
+            return self._users.get(("id", id))
+        if username:
+            return self._users.get(("username", username))
+        return None
+
+    def set(self, user: UserInDb) -> None:
+        expires_at = self._clock() + self.ttl_s
+        self._users.set(("id", user.id), user, expires_at)
+        self._users.set(("username", user.username), user, expires_at)
+
+    def invalidate(self, id: int) -> None:
+        user = self._users.invalidate(("id", id))
+        if user is not None:
+            self._users.invalidate(("username", user.username))
+
+    def clear(self) -> None:
+        self._users.clear()
+
+    @property
+    def stats(self) -> dict:
+        return {**self._users.stats, "ttl_s": self.ttl_s}
+
+
+class OwnerCache(Generic[V]):
+    """
+    Per-owner structures built from the database on first use and
+    evicted least recently used once they take more than `budget_bytes`,
+    every entry reports its own `size` and `expires_at`.
+    Committed writes reach them through `apply`, an entry also lives
+    at most `ttl_s` seconds, which bounds how stale another process's copy can get
+    """
+
+    def __init__(
+        self,
+        budget_bytes: int,
+        ttl_s: float,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.budget_bytes = budget_bytes
+        self.ttl_s = ttl_s
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._clock = clock
+        self._owners: OrderedDict[int, V] = OrderedDict()
+        # write generation of the owners built lately, an owner that fell out
+        # of it starts again from the global count so no build can match an old value
+        self._writes = 0
+        self._generations: OrderedDict[int, int] = OrderedDict()
+        self._oversized: LRUCache[bool] = LRUCache(max_size=MAX_OVERSIZED_OWNERS, clock=clock)
+
+    @property
+    def size(self) -> int:
+        return sum(entry.size for entry in self._owners.values())
+
+    def get(self, owner_id: int) -> V | None:
+        entry = self._owners.get(owner_id)
+        if entry is None or entry.expires_at <= self._clock():
+            self._owners.pop(owner_id, None)
+            self.misses += 1
+            return None
+
+        self._owners.move_to_end(owner_id)
+        self.hits += 1
+        return entry
+
+    def oversized(self, owner_id: int) -> bool:
+        """Whether the owner's entry didn't fit lately, callers should use the database instead of building it again"""
+        return self._oversized.get(owner_id) is not None
+
+    def _mark_oversized(self, owner_id: int) -> None:
+        self._oversized.set(owner_id, True, expires_at=self._clock() + self.ttl_s)
+
+    def begin_build(self, owner_id: int) -> int:
+        """
+        Call before reading the owner's contacts the entry is built from,
+        returns the owner's write generation to build the entry with
+        """
+        generation = self._generations.setdefault(owner_id, self._writes)
+        self._generations.move_to_end(owner_id)
+        while len(self._generations) > MAX_TRACKED_BUILDS:
+            self._generations.popitem(last=False)
+        return generation
+
+    def _keep(self, owner_id: int, generation: int, entry: V) -> V:
+        """
+        Caches an entry built from contacts read after `begin_build` returned `generation`,
+        unless a write for the owner arrived since: the entry may have missed it.
+        An entry bigger than the whole budget marks the owner oversized for `ttl_s`
+        """
+        if self._generations.get(owner_id) != generation:
+            return entry
+        if entry.size > self.budget_bytes:
+            self._mark_oversized(owner_id)
+            return entry
+
+        self._owners[owner_id] = entry
+        self._owners.move_to_end(owner_id)
+        self._evict()
+        return entry
+
+    def _evict(self) -> None:
+        size = self.size
+        while size > self.budget_bytes:
+            _, evicted = self._owners.popitem(last=False)
+            size -= evicted.size
+            self.evictions += 1
+
+    def apply(self, changes: Iterable[tuple]) -> None:
+        """
+        Committed contact writes:
+        (UPSERT, ContactInDb), (DELETE, owner_id, contact_id) or (INVALIDATE, owner_id | None)
+        """
+        for change in changes:
+            self._writes += 1
+            if change[0] == UPSERT:
+                contact: ContactInDb = change[1]
+                owner_id = contact.owner_id
+            else:
+                owner_id = change[1]
+
+            if owner_id is None:
+                self.clear()
+                self._generations.clear()
+                continue
+            if owner_id in self._generations:
+                self._generations[owner_id] = self._writes
+
+            entry = self._owners.get(owner_id)
+            if entry is not None:
+                self._patch(owner_id, entry, change)
+
+        self._evict()
+
+    def _patch(self, owner_id: int, entry: V, change: tuple) -> None:
+        """Brings an owner's entry up to date with a committed write, dropping it unless overridden"""
+        del self._owners[owner_id]
+
+    def clear(self) -> None:
+        self._owners.clear()
+
+    @property
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "owners": len(self._owners),
+            "size_bytes": self.size,
+            "budget_bytes": self.budget_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "ttl_s": self.ttl_s,
+            "oversized_owners": len(self._oversized),
+        }
@@ -1,10 +1,40 @@
+import re
 import uuid
+from typing import Iterable
 
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from sqlalchemy import and_
+from sqlalchemy import bindparam, any_, String
+from sqlalchemy.dialects.postgresql import ARRAY
 
 from contacts.models.db.tables import Contact
+from contacts.db.session import transaction
+
+
+SELECT_CONTACT_OWNER = select(Contact.owner_id).where(Contact.id == bindparam("id"))
+# Probes of the unique (owner_id, normalized_phone) index
+SELECT_CONTACT_WITH_NUMBER = (
+    select(Contact.id).
+    where(
+        Contact.owner_id == bindparam("owner_id"),
+        Contact.normalized_phone == bindparam("phone_number"),
+    ).
+    limit(1)
+)
+SELECT_NUMBERS_IN_USE = (
+    select(Contact.normalized_phone).
+    where(
+        Contact.owner_id == bindparam("owner_id"),
+        Contact.normalized_phone == any_(bindparam("phone_numbers", type_=ARRAY(String))),
+    )
+)
+
+PHONE_NUMBER_NOISE = re.compile(r"[^0-9]")
+
+
+def normalize_phone_number(phone_number: str) -> str:
+    """What contacts.normalized_phone holds for the number"""
+    return PHONE_NUMBER_NOISE.sub("", phone_number)
 
 
 def email_is_valid(email: str) -> bool:
@@ -16,26 +46,32 @@ async def contact_is_owned_by_user(
     user_id: int, 
     session: AsyncSession
 ) -> bool:
-    async with session.begin():
-        stmt = (
-            select(Contact).
-            where(Contact.id == str(contact_id))
-        )
-        contact: Contact = await session.scalar(stmt)
+    async with transaction(session):
+        owner_id = await session.scalar(SELECT_CONTACT_OWNER, {"id": str(contact_id)})
 
-        return contact.owner_id == user_id
+        return owner_id == user_id
 
 
 async def user_has_contact_with_such_number(
     user_id: int, phone_number: str, session: AsyncSession
 ) -> bool:
-    async with session.begin():
-        stmt = select(Contact).where(
-            and_(
-                Contact.phone_number == phone_number,
-                Contact.owner_id == user_id,
-            )
+    async with transaction(session):
+        contact_id = await session.scalar(
+            SELECT_CONTACT_WITH_NUMBER,
+            {"owner_id": user_id, "phone_number": normalize_phone_number(phone_number)},
+        )
+
+        return contact_id is not None
+
+
+async def numbers_in_use(
+    user_id: int, phone_numbers: Iterable[str], session: AsyncSession
+) -> set[str]:
+    """Which of the numbers the user already has contacts with, in one query, normalized"""
+    async with transaction(session):
+        result = await session.scalars(
+            SELECT_NUMBERS_IN_USE,
+            {"owner_id": user_id, "phone_numbers": [normalize_phone_number(number) for number in phone_numbers]},
         )
-        contact = await session.scalar(stmt)
 
-        return True if contact else False
+        return set(result)
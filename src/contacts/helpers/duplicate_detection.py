@@ -0,0 +1,156 @@
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import AsyncIterator, Callable, List
+
+from loguru import logger
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .duplicates import ContactRow, find_duplicates, owner_ids
+from contacts.db.crud.duplicates import replace_duplicates, stream_contacts_for_deduplication
+
+
+COUNTERS = ("contacts", "pairs_scored", "blocks_skipped", "clusters", "duplicates")
+
+
+async def owner_batches(
+    chunks: AsyncIterator[List[ContactRow]],
+    batch_size: int,
+) -> AsyncIterator[List[ContactRow]]:
+    """
+    Regroups rows ordered by owner into batches of at least `batch_size` rows
+    that never split an owner, an owner bigger than that makes a batch of its own
+    """
+    batch: List[ContactRow] = []
+    for_owner: List[ContactRow] = []
+    async for chunk in chunks:
+        for row in chunk:
+            if for_owner and row[1] != for_owner[0][1]:
+                batch.extend(for_owner)
+                for_owner = []
+                if len(batch) >= batch_size:
+                    yield batch
+                    batch = []
+            for_owner.append(row)
+    batch.extend(for_owner)
+    if batch:
+        yield batch
+
+
+class DuplicateDetection:
+    """
+    Batch job clustering likely duplicate contacts of every owner into the
+    contact_duplicates table. Contacts are streamed by owner, batches of owners
+    are scored in a process pool while the next ones are read. At most
+    `2 * workers` batches are in flight, which bounds the memory used
+    """
+
+    def __init__(
+        self,
+        workers: int,
+        batch_size: int,
+        fetch_size: int,
+        threshold: float,
+        max_block: int,
+    ) -> None:
+        self.workers = workers
+        self.batch_size = batch_size
+        self.fetch_size = fetch_size
+        self.threshold = threshold
+        self.max_block = max_block
+        self.started_at: datetime | None = None
+        self.finished_at: datetime | None = None
+        self.error: str | None = None
+        self.counters = dict.fromkeys(COUNTERS, 0)
+        self._task: asyncio.Task | None = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self, session_factory: Callable[[], AsyncSession]) -> bool:
+        """Runs the job in the background, False if it's already running"""
+        if self.running:
+            return False
+        self._task = asyncio.create_task(self.run(session_factory))
+        return True
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def run(self, session_factory: Callable[[], AsyncSession]) -> dict:
+        self.started_at, self.finished_at, self.error = datetime.utcnow(), None, None
+        self.counters = dict.fromkeys(COUNTERS, 0)
+        logger.info(f"Detecting duplicate contacts with {self.workers} workers")
+
+        executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+        loop = asyncio.get_running_loop()
+        in_flight: set[asyncio.Future] = set()
+
+        async def store(done: set[asyncio.Future]) -> None:
+            for future in done:
+                owners, (duplicates, counters) = future.result()
+                async with session_factory() as session:
+                    await replace_duplicates(owners, duplicates, session)
+                for name, value in counters.items():
+                    self.counters[name] += value
+
+        try:
+            # a read session of its own, its cursor stays open for the whole run
+            async with session_factory() as session:
+                batches = owner_batches(
+                    stream_contacts_for_deduplication(session, self.fetch_size),
+                    self.batch_size,
+                )
+                async for batch in batches:
+                    if len(in_flight) >= 2 * self.workers:
+                        done, in_flight = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+                        await store(done)
+                    in_flight.add(asyncio.ensure_future(self._score(loop, executor, batch)))
+
+            while in_flight:
+                done, in_flight = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+                await store(done)
+        except Exception as error:
+            self.error = repr(error)
+            logger.exception("Duplicate detection failed")
+            raise
+        finally:
+            for future in in_flight:
+                future.cancel()
+            executor.shutdown(wait=True, cancel_futures=True)
+            self.finished_at = datetime.utcnow()
+
+        logger.info(
+            f"Found {self.counters['duplicates']} duplicates in {self.counters['clusters']} clusters "
+            f"among {self.counters['contacts']} contacts"
+        )
+        return self.stats
+
+    async def _score(self, loop, executor: ProcessPoolExecutor, batch: List[ContactRow]) -> tuple:
+        result = await loop.run_in_executor(
+            executor, find_duplicates, batch, self.threshold, self.max_block,
+        )
+        return owner_ids(batch), result
+
+    @property
+    def stats(self) -> dict:
+        finished_at = self.finished_at or datetime.utcnow()
+        return {
+            "running": self.running,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "elapsed_s": (finished_at - self.started_at).total_seconds() if self.started_at else 0.0,
+            "error": self.error,
+            **self.counters,
+        }
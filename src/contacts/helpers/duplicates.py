@@ -0,0 +1,144 @@
+"""
+Duplicate contact detection, the part that runs in worker processes.
+
+Only contacts sharing a blocking key are compared, so the work grows with
+the block sizes rather than with the square of an address book
+"""
+from difflib import SequenceMatcher
+from typing import Iterable, List, Sequence, Tuple
+from uuid import UUID
+
+
+# (id, owner_id, last_name, first_name, middle_name, email, normalized_phone)
+ContactRow = Tuple[UUID, int, str | None, str, str | None, str | None, str]
+# (contact_id, owner_id, cluster_id, score)
+DuplicateRow = Tuple[UUID, int, UUID, float]
+
+# Field weights of a pair's score, fields empty on either side don't count
+NAME_WEIGHT = 0.5
+EMAIL_WEIGHT = 0.25
+PHONE_WEIGHT = 0.25
+# The national part of a number, so 8 and +7 trunk prefixes land in one block
+PHONE_KEY_DIGITS = 10
+PHONE_KEY_MIN_DIGITS = 7
+NAME_KEY_LAST_NAME_CHARS = 3
+
+
+def full_name(row: ContactRow) -> str:
+    return " ".join(part.strip().lower() for part in (row[2], row[3], row[4]) if part)
+
+
+def email_local_part(email: str | None) -> str:
+    """Lowercased, without a +tag and dots, so aliases of one mailbox compare equal"""
+    if not email:
+        return ""
+    local = email.rsplit("@", 1)[0].lower()
+    return local.split("+", 1)[0].replace(".", "")
+
+
+def blocking_keys(row: ContactRow) -> List[str]:
+    """Candidates for a match share at least one of these with the contact"""
+    keys = []
+    phone = row[6] or ""
+    if len(phone) >= PHONE_KEY_MIN_DIGITS:
+        keys.append("p:" + phone[-PHONE_KEY_DIGITS:])
+    local = email_local_part(row[5])
+    if local:
+        keys.append("e:" + local)
+    # initials alone make blocks too big to compare, the last name's start narrows them
+    first_name, last_name = (row[3] or "").strip().lower(), (row[2] or "").strip().lower()
+    if first_name and last_name:
+        keys.append(f"n:{first_name[0]}:{last_name[:NAME_KEY_LAST_NAME_CHARS]}")
+    return keys
+
+
+def similarity(a: str, b: str) -> float:
+    if a == b:
+        return 1.0
+    matcher = SequenceMatcher(None, a, b, autojunk=False)
+    return matcher.ratio()
+
+
+def pair_score(a: ContactRow, b: ContactRow) -> float:
+    """Weighted similarity of names, email local parts and numbers, from 0 to 1"""
+    total = weights = 0.0
+    for weight, left, right in (
+        (NAME_WEIGHT, full_name(a), full_name(b)),
+        (EMAIL_WEIGHT, email_local_part(a[5]), email_local_part(b[5])),
+        (PHONE_WEIGHT, (a[6] or "")[-PHONE_KEY_DIGITS:], (b[6] or "")[-PHONE_KEY_DIGITS:]),
+    ):
+        if left and right:
+            total += weight * similarity(left, right)
+            weights += weight
+    return total / weights if weights else 0.0
+
+
+def find_duplicates(
+    rows: Sequence[ContactRow],
+    threshold: float,
+    max_block: int,
+) -> Tuple[List[DuplicateRow], dict]:
+    """
+    Clusters the rows of some owners: pairs scoring at least `threshold` are
+    linked, clusters are the connected groups. Blocks larger than `max_block`
+    are skipped as too unspecific to compare. Returns the members of every
+    cluster and counters of the work done
+    """
+    blocks: dict[Tuple[int, str], List[int]] = {}
+    for index, row in enumerate(rows):
+        for key in blocking_keys(row):
+            blocks.setdefault((row[1], key), []).append(index)
+
+    parents = list(range(len(rows)))
+
+    def root(index: int) -> int:
+        while parents[index] != index:
+            parents[index] = parents[parents[index]]
+            index = parents[index]
+        return index
+
+    best: dict[int, float] = {}
+    compared: set[Tuple[int, int]] = set()
+    skipped = 0
+    for members in blocks.values():
+        if len(members) < 2:
+            continue
+        if len(members) > max_block:
+            skipped += 1
+            continue
+        for position, left in enumerate(members):
+            for right in members[position + 1:]:
+                if (left, right) in compared:
+                    continue
+                compared.add((left, right))
+                score = pair_score(rows[left], rows[right])
+                if score < threshold:
+                    continue
+                parents[root(left)] = root(right)
+                best[left] = max(best.get(left, 0.0), score)
+                best[right] = max(best.get(right, 0.0), score)
+
+    clusters: dict[int, List[int]] = {}
+    for index in best:
+        clusters.setdefault(root(index), []).append(index)
+
+    duplicates = []
+    for members in clusters.values():
+        cluster_id = min(rows[index][0] for index in members)
+        duplicates.extend(
+            (rows[index][0], rows[index][1], cluster_id, best[index])
+            for index in members
+        )
+
+    counters = {
+        "contacts": len(rows),
+        "pairs_scored": len(compared),
+        "blocks_skipped": skipped,
+        "clusters": len(clusters),
+        "duplicates": len(duplicates),
+    }
+    return duplicates, counters
+
+
+def owner_ids(rows: Iterable[ContactRow]) -> List[int]:
+    return sorted({row[1] for row in rows})
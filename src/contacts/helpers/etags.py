@@ -0,0 +1,67 @@
+import hashlib
+from dataclasses import dataclass
+
+import orjson
+from fastapi import Request, Response
+
+
+@dataclass
+class ConditionalGetCounters:
+    tagged: int = 0
+    conditional: int = 0
+    not_modified: int = 0
+
+    def as_dict(self) -> dict:
+        return {
+            "tagged": self.tagged,
+            "conditional": self.conditional,
+            "not_modified": self.not_modified,
+            "not_modified_ratio": self.not_modified / self.tagged if self.tagged else 0.0,
+            "revalidated_ratio": self.not_modified / self.conditional if self.conditional else 0.0,
+        }
+
+
+class ConditionalGetStats:
+    """How many tagged responses per route were asked for conditionally and answered with 304"""
+
+    def __init__(self) -> None:
+        self._routes: dict[str, ConditionalGetCounters] = {}
+
+    def observe(self, route: str, conditional: bool, not_modified: bool) -> None:
+        counters = self._routes.setdefault(route, ConditionalGetCounters())
+        counters.tagged += 1
+        counters.conditional += conditional
+        counters.not_modified += not_modified
+
+    @property
+    def stats(self) -> dict:
+        return {route: counters.as_dict() for route, counters in self._routes.items()}
+
+
+def strong_etag(*parts) -> str:
+    """Same parts, same tag: they must cover everything the representation depends on"""
+    return '"' + hashlib.blake2b(orjson.dumps(parts), digest_size=16).hexdigest() + '"'
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """If-None-Match compares weakly, a W/ prefix doesn't stop a match"""
+    if if_none_match.strip() == "*":
+        return True
+    return any(
+        tag.strip().removeprefix("W/") == etag
+        for tag in if_none_match.split(",")
+    )
+
+
+def not_modified_response(request: Request, etag: str) -> Response | None:
+    """304 if the client already holds the representation tagged `etag`, None otherwise"""
+    if_none_match = request.headers.get("if-none-match")
+    not_modified = if_none_match is not None and etag_matches(if_none_match, etag)
+    request.app.state.conditional_gets.observe(
+        request.scope["route"].path,
+        conditional=if_none_match is not None,
+        not_modified=not_modified,
+    )
+    if not_modified:
+        return Response(status_code=304, headers={"ETag": etag})
+    return None
@@ -0,0 +1,76 @@
+import csv
+import io
+from typing import AsyncIterator, Iterable, List
+
+from sqlalchemy.engine import RowMapping
+
+
+# the import's header plus the id, so an export can be imported back
+CSV_COLUMNS = (
+    "id",
+    "last_name",
+    "first_name",
+    "middle_name",
+    "organisation",
+    "job_title",
+    "email",
+    "phone_number",
+)
+
+
+def escape_vcard_value(value: str | None) -> str:
+    if not value:
+        return ""
+    return (
+        value.replace("\\", "\\\\").
+        replace(",", "\\,").
+        replace(";", "\\;").
+        replace("\r\n", "\\n").
+        replace("\n", "\\n")
+    )
+
+
+def vcard(row: RowMapping) -> str:
+    return (
+        "BEGIN:VCARD\r\n"
+        "VERSION:3.0\r\n"
+        f"UID:{row['id']}\r\n"
+        f"N:{escape_vcard_value(row['last_name'])};{escape_vcard_value(row['first_name'])};"
+        f"{escape_vcard_value(row['middle_name'])};;\r\n"
+        f"FN:{escape_vcard_value(' '.join(filter(None, (row['first_name'], row['last_name']))))}\r\n"
+        f"ORG:{escape_vcard_value(row['organisation'])}\r\n"
+        f"TITLE:{escape_vcard_value(row['job_title'])}\r\n"
+        f"EMAIL:{row['email'] or ''}\r\n"
+        f"TEL:{row['phone_number']}\r\n"
+        "END:VCARD\r\n"
+    )
+
+
+async def csv_chunks(
+    first_batch: List[RowMapping],
+    batches: AsyncIterator[List[RowMapping]],
+) -> AsyncIterator[bytes]:
+    """A header, then one CSV chunk per fetched batch"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    def encode(rows: Iterable[tuple]) -> bytes:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows(rows)
+        return buffer.getvalue().encode("utf-8")
+
+    yield encode([CSV_COLUMNS])
+    yield encode(tuple(row[column] for column in CSV_COLUMNS) for row in first_batch)
+    async for batch in batches:
+        yield encode(tuple(row[column] for column in CSV_COLUMNS) for row in batch)
+
+
+async def vcard_chunks(
+    first_batch: List[RowMapping],
+    batches: AsyncIterator[List[RowMapping]],
+) -> AsyncIterator[bytes]:
+    """One vCard 3.0 per contact, written a fetched batch at a time"""
+    yield "".join(map(vcard, first_batch)).encode("utf-8")
+    async for batch in batches:
+        yield "".join(map(vcard, batch)).encode("utf-8")
@@ -0,0 +1,117 @@
+import asyncio
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable
+
+from loguru import logger
+
+from .security import BCRYPT_DEFAULT_ROUNDS, hash_password, passwords_match
+from contacts.resources.errors.auth import PASSWORD_HASHER_BUSY_EXCEPTION
+
+
+@dataclass
+class HasherStats:
+    calls: int = 0
+    rejected: int = 0
+    queue_wait_total_s: float = 0.0
+    queue_wait_max_s: float = 0.0
+    hash_total_s: float = 0.0
+    hash_max_s: float = 0.0
+
+    def observe(self, queue_wait_s: float, hash_s: float) -> None:
+        self.calls += 1
+        self.queue_wait_total_s += queue_wait_s
+        self.queue_wait_max_s = max(self.queue_wait_max_s, queue_wait_s)
+        self.hash_total_s += hash_s
+        self.hash_max_s = max(self.hash_max_s, hash_s)
+
+    def as_dict(self) -> dict:
+        return {
+            "calls": self.calls,
+            "rejected": self.rejected,
+            "queue_wait_avg_ms": self.queue_wait_total_s / self.calls * 1000 if self.calls else 0.0,
+            "queue_wait_max_ms": self.queue_wait_max_s * 1000,
+            "hash_avg_ms": self.hash_total_s / self.calls * 1000 if self.calls else 0.0,
+            "hash_max_ms": self.hash_max_s * 1000,
+        }
+
+
+class PasswordHasher:
+    """
+    Runs bcrypt in a bounded process pool so it never blocks the event loop.
+    Calls beyond `workers + queue_size` in flight, or waiting for a worker
+    longer than `timeout_s`, are rejected with 503
+    """
+
+    def __init__(
+        self,
+        workers: int,
+        queue_size: int,
+        timeout_s: float,
+        rounds: int = BCRYPT_DEFAULT_ROUNDS,
+    ) -> None:
+        self.rounds = rounds
+        self.workers = workers
+        self.queue_size = queue_size
+        self.timeout_s = timeout_s
+        self.stats = HasherStats()
+        self._executor: ProcessPoolExecutor | None = None
+        self._slots: asyncio.Semaphore | None = None
+        self._in_flight = 0
+
+    def start(self) -> None:
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+        self._slots = asyncio.Semaphore(self.workers)
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+    async def hash(self, pw: str) -> str:
+        return await self._run(hash_password, pw, self.rounds)
+
+    async def verify(self, plain_pw: str, hashed_pw: str) -> bool:
+        return await self._run(passwords_match, plain_pw, hashed_pw)
+
+    async def _run(self, fn: Callable, *args: Any) -> Any:
+        if self._in_flight >= self.workers + self.queue_size:
+            self.stats.rejected += 1
+            logger.warning("Password hasher queue is full, rejecting request")
+            raise PASSWORD_HASHER_BUSY_EXCEPTION
+
+        self._in_flight += 1
+        try:
+            queued_at = time.perf_counter()
+            try:
+                await asyncio.wait_for(self._slots.acquire(), timeout=self.timeout_s)
+            except asyncio.TimeoutError:
+                self.stats.rejected += 1
+                logger.warning("Password hasher queue wait timed out, rejecting request")
+                raise PASSWORD_HASHER_BUSY_EXCEPTION
+
+            try:
+                started_at = time.perf_counter()
+                result = await asyncio.get_running_loop().run_in_executor(
+                    self._executor, fn, *args
+                )
+                finished_at = time.perf_counter()
+            finally:
+                self._slots.release()
+        finally:
+            self._in_flight -= 1
+
+        queue_wait_s = started_at - queued_at
+        hash_s = finished_at - started_at
+        self.stats.observe(queue_wait_s, hash_s)
+        logger.debug(
+            f"{fn.__name__}: queue wait {queue_wait_s * 1000:.1f} ms, "
+            f"hash {hash_s * 1000:.1f} ms"
+        )
+
+        return result
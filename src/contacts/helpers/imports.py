@@ -0,0 +1,127 @@
+import codecs
+import csv
+import re
+from typing import AsyncIterator
+
+
+CSV_MEDIA_TYPE = "text/csv"
+VCARD_MEDIA_TYPES = ("text/vcard", "text/x-vcard")
+
+VCARD_PHONE_SEPARATORS = re.compile(r"[\s()+\-.]")
+
+# Longest record a quoted field may stretch over lines for
+CSV_MAX_RECORD_CHARS = 64 * 1024
+# What a strict csv.reader raises when the lines end inside a quoted field
+CSV_UNTERMINATED_FIELD = "unexpected end of data"
+
+
+async def decoded_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """Lines of a utf-8 byte stream, with line endings stripped"""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")(errors="replace")
+    tail = ""
+    async for chunk in chunks:
+        text = tail + decoder.decode(chunk)
+        *lines, tail = text.split("\n")
+        for line in lines:
+            yield line.rstrip("\r")
+
+    tail += decoder.decode(b"", final=True)
+    if tail:
+        yield tail.rstrip("\r")
+
+
+def parse_csv_record(lines: list[str]) -> list[str] | None:
+    """The record `lines` make up, None while a quoted field is still open at their end"""
+    text = [line + "\n" for line in lines]
+    try:
+        return next(csv.reader(text, strict=True), [])
+    except csv.Error as exc:
+        if str(exc) == CSV_UNTERMINATED_FIELD:
+            return None
+    # malformed quoting, parsed as leniently as before
+    return next(csv.reader(text), [])
+
+
+async def csv_records(chunks: AsyncIterator[bytes]) -> AsyncIterator[dict]:
+    """
+    Rows of a CSV file with a header line, keyed by the header's column names.
+    A quoted field may span lines, a record still open after CSV_MAX_RECORD_CHARS
+    is handed over as is so it gets rejected, and parsing resumes on the next line
+    """
+    header = None
+    pending: list[str] = []
+    pending_chars = 0
+    async for line in decoded_lines(chunks):
+        pending.append(line)
+        pending_chars += len(line)
+        row = parse_csv_record(pending)
+        if row is None:
+            if pending_chars > CSV_MAX_RECORD_CHARS:
+                yield {"": "\n".join(pending)}
+                pending, pending_chars = [], 0
+            continue
+
+        pending, pending_chars = [], 0
+        if not any(row):
+            continue
+        if header is None:
+            header = [column.strip().lower() for column in row]
+            continue
+        yield dict(zip(header, row))
+
+    if pending:
+        # an unterminated quote, handed over as is so it gets rejected
+        yield {"": "\n".join(pending)}
+
+
+def unfold_vcard_value(value: str) -> str:
+    return value.replace("\\,", ",").replace("\\;", ";").replace("\\n", " ").strip()
+
+
+async def vcard_records(chunks: AsyncIterator[bytes]) -> AsyncIterator[dict]:
+    """
+    One record per BEGIN:VCARD ... END:VCARD block, mapped onto contact fields.
+    Only the first TEL and EMAIL are kept, visual separators are dropped from the number
+    """
+    card: dict | None = None
+    previous: str | None = None
+
+    def apply(line: str) -> None:
+        name, _, value = line.partition(":")
+        name = name.split(";")[0].upper()
+        if name == "N":
+            last, first, middle, *_ = value.split(";") + ["", "", ""]
+            card.update(
+                last_name=unfold_vcard_value(last),
+                first_name=unfold_vcard_value(first),
+                middle_name=unfold_vcard_value(middle),
+            )
+        elif name == "ORG":
+            card["organisation"] = unfold_vcard_value(value.split(";")[0])
+        elif name == "TITLE":
+            card["job_title"] = unfold_vcard_value(value)
+        elif name == "EMAIL":
+            card.setdefault("email", value.strip())
+        elif name == "TEL":
+            card.setdefault("phone_number", VCARD_PHONE_SEPARATORS.sub("", value.removeprefix("tel:")))
+
+    async for line in decoded_lines(chunks):
+        if line[:1] in (" ", "\t") and previous is not None:
+            # folded line, continues the previous one
+            previous += line[1:]
+            continue
+
+        if previous is not None:
+            upper = previous.upper()
+            if upper == "BEGIN:VCARD":
+                # properties a card may lack are left empty rather than rejecting it
+                card = {"middle_name": "", "organisation": "", "job_title": ""}
+            elif upper == "END:VCARD" and card is not None:
+                yield card
+                card = None
+            elif card is not None:
+                apply(previous)
+        previous = line
+
+    if previous is not None and previous.upper() == "END:VCARD" and card is not None:
+        yield card
@@ -0,0 +1,54 @@
+import base64
+import binascii
+import json
+
+from pydantic import ValidationError
+
+from contacts.models.schemas.meta import ContactsCursor, ContactsSearchCursor
+from contacts.resources.errors.contacts import INVALID_CURSOR_EXCEPTION
+
+
+def _pack(values: list) -> str:
+    data = json.dumps(values, separators=(",", ":"))
+    return base64.urlsafe_b64encode(data.encode("utf-8")).rstrip(b"=").decode("ascii")
+
+
+def _unpack(cursor: str) -> list:
+    data = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+    return json.loads(data)
+
+
+def encode_cursor(cursor: ContactsCursor) -> str:
+    return _pack([cursor.order_by, cursor.value, cursor.id.hex])
+
+
+def decode_cursor(cursor: str, order_by: str) -> ContactsCursor:
+    """Cursors only continue the ordering they were issued for"""
+    try:
+        cursor_order_by, value, id = _unpack(cursor)
+        decoded = ContactsCursor(order_by=cursor_order_by, value=value, id=id)
+    except (binascii.Error, ValueError, TypeError, ValidationError):
+        raise INVALID_CURSOR_EXCEPTION
+
+    if decoded.order_by != order_by:
+        raise INVALID_CURSOR_EXCEPTION
+
+    return decoded
+
+
+def encode_search_cursor(cursor: ContactsSearchCursor) -> str:
+    return _pack([cursor.query, cursor.rank, cursor.id.hex])
+
+
+def decode_search_cursor(cursor: str, query: str) -> ContactsSearchCursor:
+    """Search cursors only continue the search they were issued for"""
+    try:
+        cursor_query, rank, id = _unpack(cursor)
+        decoded = ContactsSearchCursor(query=cursor_query, rank=rank, id=id)
+    except (binascii.Error, ValueError, TypeError, ValidationError):
+        raise INVALID_CURSOR_EXCEPTION
+
+    if decoded.query != query:
+        raise INVALID_CURSOR_EXCEPTION
+
+    return decoded
@@ -0,0 +1,118 @@
+import bisect
+import sys
+from typing import Iterable, Sequence
+
+from .cache import OwnerCache, UPSERT, DELETE
+from contacts.models.db.entities import ContactInDb
+from contacts.models.db.tables import CONTACT_SUGGEST_COLUMNS
+
+
+# Fields a suggestion matches on, from the start of the value
+SUGGEST_FIELDS = CONTACT_SUGGEST_COLUMNS
+# What a suggestion carries, in order
+CONTACT_FIELDS = (
+    "id",
+    "last_name",
+    "first_name",
+    "middle_name",
+    "organisation",
+    "job_title",
+    "email",
+    "phone_number",
+)
+
+def normalize(value: str | None) -> str:
+    return " ".join((value or "").casefold().split())
+
+
+def entry_size(contact: tuple) -> int:
+    """Rough bytes a contact takes in an owner's index, its row plus its terms"""
+    strings = sum(sys.getsizeof(value) for value in contact[1:])
+    return sys.getsizeof(contact) + strings * 2 + len(SUGGEST_FIELDS) * 120
+
+
+class OwnerPrefixIndex:
+    """
+    One owner's contacts and a sorted array of (term, contact id),
+    a prefix is a contiguous run of it found by bisection
+    """
+
+    def __init__(self, contacts: Iterable[tuple], expires_at: float) -> None:
+        self.expires_at = expires_at
+        self.size = 0
+        self._contacts: dict = {}
+        self._terms: list[tuple[str, str]] = []
+        for contact in contacts:
+            self._add(contact)
+        self._terms.sort()
+
+    @staticmethod
+    def _contact_terms(contact: tuple) -> list[tuple[str, str]]:
+        key = str(contact[0])
+        terms = (normalize(contact[CONTACT_FIELDS.index(field)]) for field in SUGGEST_FIELDS)
+        return [(term, key) for term in set(terms) if term]
+
+    def _add(self, contact: tuple, keep_sorted: bool = False) -> None:
+        self._contacts[str(contact[0])] = contact
+        self.size += entry_size(contact)
+        for term in self._contact_terms(contact):
+            if keep_sorted:
+                bisect.insort(self._terms, term)
+            else:
+                self._terms.append(term)
+
+    def remove(self, contact_id: str) -> None:
+        contact = self._contacts.pop(contact_id, None)
+        if contact is None:
+            return
+        self.size -= entry_size(contact)
+        for term in self._contact_terms(contact):
+            position = bisect.bisect_left(self._terms, term)
+            if position < len(self._terms) and self._terms[position] == term:
+                del self._terms[position]
+
+    def upsert(self, contact: tuple) -> None:
+        self.remove(str(contact[0]))
+        self._add(contact, keep_sorted=True)
+
+    def suggest(self, prefix: str, limit: int) -> list[tuple]:
+        """Contacts with a field starting with `prefix`, in the order of the matching value"""
+        found: dict[str, tuple] = {}
+        terms = self._terms
+        position = bisect.bisect_left(terms, (prefix, ""))
+        while position < len(terms) and len(found) < limit:
+            term, contact_id = terms[position]
+            if not term.startswith(prefix):
+                break
+            found.setdefault(contact_id, self._contacts[contact_id])
+            position += 1
+        return list(found.values())
+
+    def __len__(self) -> int:
+        return len(self._contacts)
+
+
+class ContactPrefixIndex(OwnerCache[OwnerPrefixIndex]):
+    """
+    Per-owner prefix indexes for typeahead, built on first use and
+    evicted least recently used once they take more than `budget_bytes`.
+    Committed writes patch them, an index also lives at most `ttl_s` seconds,
+    which bounds how stale another process's copy can get
+    """
+
+    def build(self, owner_id: int, generation: int, contacts: Sequence[tuple]) -> OwnerPrefixIndex:
+        """
+        Indexes contacts read after `begin_build` returned `generation`. The index
+        is only kept if no write for the owner arrived since, it may have missed it
+        """
+        return self._keep(owner_id, generation, OwnerPrefixIndex(contacts, expires_at=self._clock() + self.ttl_s))
+
+    def _patch(self, owner_id: int, index: OwnerPrefixIndex, change: tuple) -> None:
+        action = change[0]
+        if action == UPSERT:
+            contact: ContactInDb = change[1]
+            index.upsert(tuple(getattr(contact, field) for field in CONTACT_FIELDS))
+        elif action == DELETE:
+            index.remove(str(change[2]))
+        else:
+            del self._owners[owner_id]
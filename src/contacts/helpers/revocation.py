@@ -0,0 +1,118 @@
+import asyncio
+from datetime import datetime, timedelta
+from typing import Callable
+
+from loguru import logger
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .bloom import BloomFilter
+from contacts.db.crud.tokens import (
+    access_token_is_revoked,
+    get_revoked_access_tokens,
+    revoke_access_token,
+)
+
+
+# Rows committed slightly out of revoked_at order must not be skipped by the next sync
+SYNC_OVERLAP = timedelta(seconds=5)
+
+
+class RevocationList:
+    """
+    In-process view of the revoked_tokens table.
+    A Bloom filter answers the common "not revoked" case with one probe,
+    only possible matches are confirmed against the database
+    """
+
+    def __init__(self, capacity: int, fp_rate: float, sync_interval_s: float) -> None:
+        self.capacity = capacity
+        self.fp_rate = fp_rate
+        self.sync_interval_s = sync_interval_s
+        self.probes = 0
+        self.positives = 0
+        self.false_positives = 0
+        self._bloom = BloomFilter(capacity, fp_rate)
+        self._synced_until: datetime | None = None
+        self._session_factory: Callable[[], AsyncSession] | None = None
+        self._sync_task: asyncio.Task | None = None
+
+    async def start(self, session_factory: Callable[[], AsyncSession]) -> None:
+        self._session_factory = session_factory
+        await self.load()
+        self._sync_task = asyncio.create_task(self._sync_periodically())
+
+    async def stop(self) -> None:
+        if self._sync_task is not None:
+            self._sync_task.cancel()
+            try:
+                await self._sync_task
+            except asyncio.CancelledError:
+                pass
+            self._sync_task = None
+
+    async def load(self) -> None:
+        """Rebuilds the filter from every unexpired revocation"""
+        async with self._session_factory() as session:
+            revoked = await get_revoked_access_tokens(session)
+
+        bloom = BloomFilter(max(self.capacity, 2 * len(revoked)), self.fp_rate)
+        for jti, _ in revoked:
+            bloom.add(jti)
+        self._bloom = bloom
+        self._synced_until = max((revoked_at for _, revoked_at in revoked), default=None)
+
+        logger.info(f"Loaded {len(revoked)} revoked tokens")
+
+    async def sync(self) -> None:
+        """Adds revocations made by other workers since the last sync"""
+        if self._bloom.count > self._bloom.capacity:
+            await self.load()
+            return
+
+        since = self._synced_until - SYNC_OVERLAP if self._synced_until else None
+        async with self._session_factory() as session:
+            revoked = await get_revoked_access_tokens(session, revoked_since=since)
+
+        for jti, revoked_at in revoked:
+            self._bloom.add(jti)
+            if self._synced_until is None or revoked_at > self._synced_until:
+                self._synced_until = revoked_at
+
+    async def _sync_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(self.sync_interval_s)
+            try:
+                await self.sync()
+            except Exception:
+                logger.exception("Failed to sync revoked tokens")
+
+    async def revoke(self, jti: str, expires_at: datetime, session: AsyncSession) -> None:
+        await revoke_access_token(session=session, jti=jti, expires_at=expires_at)
+        self._bloom.add(jti)
+
+    async def is_revoked(self, jti: str, session: AsyncSession) -> bool:
+        self.probes += 1
+        if jti not in self._bloom:
+            return False
+
+        self.positives += 1
+        if await access_token_is_revoked(session=session, jti=jti):
+            return True
+
+        self.false_positives += 1
+        return False
+
+    @property
+    def stats(self) -> dict:
+        negatives = self.probes - (self.positives - self.false_positives)
+        return {
+            "entries": self._bloom.count,
+            "bits": self._bloom.size,
+            "hash_count": self._bloom.hash_count,
+            "probes": self.probes,
+            "positives": self.positives,
+            "false_positives": self.false_positives,
+            "configured_fp_rate": self.fp_rate,
+            "expected_fp_rate": self._bloom.expected_fp_rate,
+            "measured_fp_rate": self.false_positives / negatives if negatives else 0.0,
+        }
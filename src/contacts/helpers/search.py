@@ -0,0 +1,16 @@
+import re
+
+
+SEARCH_TERM = re.compile(r"[\w@.+\-]+")
+
+
+def prefix_tsquery(q: str) -> str | None:
+    """
+    Every word of `q` as a prefix, all of them must match: "ivan acm" finds Ivanov at Acme.
+    Only word characters and the ones emails carry are kept, so the result is always valid
+    tsquery syntax. None if nothing is left to search for
+    """
+    terms = [term for term in SEARCH_TERM.findall(q.lower()) if re.search(r"\w", term)]
+    if not terms:
+        return None
+    return " & ".join(f"{term}:*" for term in terms)
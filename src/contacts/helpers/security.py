@@ -1,8 +1,13 @@
+import hashlib
+import secrets
+import time
+import uuid
 from datetime import datetime, timedelta
 import jwt
 import bcrypt
 
 from contacts.models.schemas.auth import PayloadData
+from .cache import LRUCache
 from contacts.resources.errors.auth import (
     EXPIRED_TOKEN_SIGNATURE_EXCEPTION,
     MALFORMED_TOKEN_EXCEPTION,
@@ -11,6 +16,9 @@ from contacts.resources.errors.auth import (
 
 JWT_EXP_DELTA_MIN = 60 * 24
 ALGORITHM = "HS256"
+BCRYPT_DEFAULT_ROUNDS = 12
+BCRYPT_MIN_ROUNDS = 4
+BCRYPT_MAX_ROUNDS = 31
 
 
 def generate_jwt(
@@ -19,6 +27,7 @@ def generate_jwt(
     secret: str,
 ) -> str:
     payload.exp = datetime.utcnow() + timedelta(minutes=lifespan_min)
+    payload.jti = uuid.uuid4().hex
 
     return jwt.encode(
         payload.dict(),
@@ -27,26 +36,109 @@ def generate_jwt(
     )
 
 
-def validate_jwt(token: str, secret: str) -> None:
+def decode_jwt(token: str, secret: str) -> PayloadData:
     try:
-        jwt.decode(token, secret, algorithms=[ALGORITHM])
+        payload = jwt.decode(token, secret, algorithms=[ALGORITHM])
     except jwt.exceptions.ExpiredSignatureError:
         raise EXPIRED_TOKEN_SIGNATURE_EXCEPTION
     except jwt.exceptions.InvalidTokenError:
         raise MALFORMED_TOKEN_EXCEPTION
 
+    return PayloadData(**payload)
 
-def hash_password(pw: str) -> str:
+
+def token_digest(token: str) -> bytes:
+    return hashlib.sha256(token.encode("utf-8")).digest()
+
+
+def verify_jwt(
+    token: str,
+    secret: str,
+    cache: LRUCache[PayloadData] | None = None,
+) -> PayloadData:
+    """
+    Validates token and returns its claims.
+    Claims of already verified tokens are served from cache until `exp`
+    """
+    if cache is None:
+        return decode_jwt(token, secret)
+
+    key = token_digest(token)
+    payload = cache.get(key)
+    if payload is not None:
+        return payload
+
+    payload = decode_jwt(token, secret)
+    if payload.exp is not None:
+        cache.set(key, payload, expires_at=payload.exp.timestamp())
+
+    return payload
+
+
+def generate_refresh_token() -> str:
+    return secrets.token_urlsafe(32)
+
+
+def hash_refresh_token(token: str) -> str:
+    """
+    Refresh tokens are random 256-bit strings, a plain digest is enough
+    to keep them unusable if the table leaks
+    """
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+def hash_password(pw: str, rounds: int = BCRYPT_DEFAULT_ROUNDS) -> str:
     hashed_pw = bcrypt.hashpw(
         pw.encode("utf-8"),
-        salt=bcrypt.gensalt(),
+        salt=bcrypt.gensalt(rounds=rounds),
     )
 
     return hashed_pw.decode("utf-8")
 
 
+def get_hash_rounds(hashed_pw: str) -> int:
+    """Reads the cost factor from a `$2b$<rounds>$<salt+hash>` bcrypt hash"""
+    return int(hashed_pw.split("$")[2])
+
+
+def needs_rehash(hashed_pw: str, rounds: int) -> bool:
+    return get_hash_rounds(hashed_pw) != rounds
+
+
 def passwords_match(plain_pw: str, hashed_pw: str) -> bool:
     return bcrypt.checkpw(
         plain_pw.encode("utf-8"),
         hashed_pw.encode("utf-8"),
     )
+
+
+def calibrate_bcrypt_rounds(
+    target_ms: float,
+    min_rounds: int = BCRYPT_MIN_ROUNDS,
+    max_rounds: int = BCRYPT_MAX_ROUNDS,
+    samples: int = 3,
+) -> tuple[int, dict[int, float]]:
+    """
+    Measures bcrypt on this host and returns the highest cost whose hash time
+    fits into `target_ms` (or `min_rounds` if none does) with the timings in ms
+    """
+    timings: dict[int, float] = {}
+    chosen = min_rounds
+
+    for rounds in range(min_rounds, max_rounds + 1):
+        best = float("inf")
+        for _ in range(samples):
+            started_at = time.perf_counter()
+            hash_password("calibration", rounds=rounds)
+            best = min(best, (time.perf_counter() - started_at) * 1000)
+        timings[rounds] = best
+
+        if best > target_ms:
+            break
+        chosen = rounds
+        # every extra round doubles the work, no need to run a hash
+        # that is known to blow the budget
+        if best * 2 > target_ms:
+            break
+
+    return chosen, timings
@@ -3,6 +3,11 @@ from fastapi import FastAPI
 from contacts.core.settings import get_settings
 from contacts.core.logger import configure_logging
 from contacts.core.events import get_startup_handler, get_shutdown_handler
+from contacts.helpers.cache import LRUCache, UserCache
+from contacts.helpers.prefix_index import ContactPrefixIndex
+from contacts.helpers.address_book import AddressBooks
+from contacts.helpers.duplicate_detection import DuplicateDetection
+from contacts.helpers.etags import ConditionalGetStats
 from contacts.api.router import router
 
 
@@ -12,7 +17,30 @@ def get_app() -> FastAPI:
     configure_logging(settings)
 
     app = FastAPI()
+    app.state.settings = settings
     app.state.secret = settings.secret
+    app.state.token_cache = LRUCache(max_size=settings.token_cache_size)
+    app.state.user_cache = UserCache(
+        max_size=settings.user_cache_size,
+        ttl_s=settings.user_cache_ttl_s,
+    )
+    app.state.contact_index = ContactPrefixIndex(
+        budget_bytes=settings.contacts_suggest_budget_bytes,
+        ttl_s=settings.contacts_suggest_ttl_s,
+    )
+    app.state.address_books = AddressBooks(
+        budget_bytes=settings.contacts_address_book_budget_bytes,
+        ttl_s=settings.contacts_address_book_ttl_s,
+        max_contacts=settings.contacts_address_book_max_contacts,
+    ) if settings.contacts_address_book_enabled else None
+    app.state.conditional_gets = ConditionalGetStats()
+    app.state.duplicate_detection = DuplicateDetection(
+        workers=settings.contacts_duplicates_workers,
+        batch_size=settings.contacts_duplicates_batch_size,
+        fetch_size=settings.contacts_duplicates_fetch_size,
+        threshold=settings.contacts_duplicates_threshold,
+        max_block=settings.contacts_duplicates_max_block,
+    )
     app.add_event_handler(
         "startup", 
         get_startup_handler(app, settings),
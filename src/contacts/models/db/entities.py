@@ -3,7 +3,7 @@ from pydantic import BaseModel, Field
 
 
 class UserInDb(BaseModel):
-    id: int
+    id: int | None = None
     username: str
     hashed_password: str
     role: str
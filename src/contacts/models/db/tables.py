@@ -8,11 +8,21 @@ from sqlalchemy.orm import (
     relationship,
     declared_attr,
 )
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from sqlalchemy import (
+    DDL,
+    BigInteger,
     Column,
+    Computed,
     String,
     ForeignKey,
     Enum,
+    DateTime,
+    Boolean,
+    Index,
+    Float,
+    event,
+    func,
 )
 
 from .metaclasses import RoleEnum
@@ -33,6 +43,23 @@ class User(Base):
     username = Column(String(100), unique=True, nullable=False)
     hashed_password = Column(String(100), nullable=False)
     role = Column(Enum(RoleEnum), nullable=False)
+    # bumped by every write to the user's contacts, ETags are derived from it
+    version = Column(BigInteger, nullable=False, server_default="0")
+
+
+# Names weigh most in the rank, then the workplace, then the email.
+# 'simple' keeps words as they are, names don't stem
+CONTACT_SEARCH_VECTOR = (
+    "setweight(to_tsvector('simple', "
+    "coalesce(last_name, '') || ' ' || coalesce(first_name, '') || ' ' || coalesce(middle_name, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(organisation, '') || ' ' || coalesce(job_title, '')), 'B') || "
+    "setweight(to_tsvector('simple', coalesce(email, '')), 'C')"
+)
+
+
+# Digits only, so formatting doesn't tell two numbers apart.
+# Trunk prefixes are left alone, an 8 isn't always a local 7
+CONTACT_NORMALIZED_PHONE = "regexp_replace(phone_number, '[^0-9]', '', 'g')"
 
 
 class Contact(Base):
@@ -46,3 +73,131 @@ class Contact(Base):
     job_title = Column(String(100))
     email = Column(String(100))
     phone_number = Column(String(100), nullable=False)
+    # maintained by Postgres on every write, unique per owner
+    normalized_phone: Mapped[str] = mapped_column(
+        String(100),
+        Computed(CONTACT_NORMALIZED_PHONE, persisted=True),
+        deferred=True,
+    )
+    # maintained by Postgres on every write, only search reads it
+    search_vector: Mapped[str] = mapped_column(
+        TSVECTOR,
+        Computed(CONTACT_SEARCH_VECTOR, persisted=True),
+        deferred=True,
+    )
+
+    # One index per sortable column: a user's list is `WHERE owner_id = ? ORDER BY <col>`,
+    # so it becomes an index range scan with no sort, `id` breaks ties.
+    # (owner_id, phone_number, ...) also serves the duplicate-number check,
+    # and any of them serves lookups by owner_id alone
+    __table_args__ = tuple(
+        Index(f"ix_contacts_owner_id_{column}", "owner_id", column, "id")
+        for column in (
+            "last_name",
+            "first_name",
+            "middle_name",
+            "job_title",
+            "organisation",
+            "email",
+            "phone_number",
+        )
+    ) + (
+        Index("ix_contacts_search_vector", "search_vector", postgresql_using="gin"),
+        # inserts rely on it instead of checking for the number first
+        Index("ix_contacts_owner_id_normalized_phone", "owner_id", "normalized_phone", unique=True),
+    )
+
+
+# Typeahead falls back to these for owners too big for the in-process prefix index.
+# Under "C" `LIKE 'prefix%'` is a range scan whatever the database collation,
+# and the same index returns the matches already in order
+CONTACT_SUGGEST_COLUMNS = ("last_name", "first_name", "organisation", "email")
+
+
+def contact_suggest_term(column: str):
+    return func.lower(getattr(Contact, column)).collate("C")
+
+
+for column in CONTACT_SUGGEST_COLUMNS:
+    Index(f"ix_contacts_owner_id_lower_{column}", Contact.owner_id, contact_suggest_term(column))
+
+
+# Statement-level, so a bulk insert, an import or a filtered update bumps each
+# owner once, whichever code path wrote. Owners are locked in id order,
+# two statements touching the same owners can't deadlock on them
+CONTACTS_VERSION_FUNCTION = """
+CREATE OR REPLACE FUNCTION bump_contact_owners_version() RETURNS trigger AS $$
+DECLARE
+    owners integer[];
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        SELECT array_agg(DISTINCT owner_id) INTO owners FROM new_contacts;
+    ELSIF TG_OP = 'DELETE' THEN
+        SELECT array_agg(DISTINCT owner_id) INTO owners FROM old_contacts;
+    ELSE
+        SELECT array_agg(DISTINCT owner_id) INTO owners FROM (
+            SELECT owner_id FROM new_contacts UNION ALL SELECT owner_id FROM old_contacts
+        ) AS written;
+    END IF;
+
+    UPDATE users SET version = version + 1
+    WHERE id IN (
+        SELECT id FROM users WHERE id = ANY(owners) ORDER BY id FOR NO KEY UPDATE
+    );
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql
+"""
+CONTACTS_VERSION_TRIGGERS = {
+    "INSERT": "REFERENCING NEW TABLE AS new_contacts",
+    "UPDATE": "REFERENCING OLD TABLE AS old_contacts NEW TABLE AS new_contacts",
+    "DELETE": "REFERENCING OLD TABLE AS old_contacts",
+}
+
+
+def contacts_version_trigger(operation: str) -> str:
+    return (
+        f"CREATE TRIGGER contacts_version_{operation.lower()} AFTER {operation} ON contacts "
+        f"{CONTACTS_VERSION_TRIGGERS[operation]} "
+        "FOR EACH STATEMENT EXECUTE FUNCTION bump_contact_owners_version()"
+    )
+
+
+event.listen(Contact.__table__, "after_create", DDL(CONTACTS_VERSION_FUNCTION))
+for operation in CONTACTS_VERSION_TRIGGERS:
+    event.listen(Contact.__table__, "after_create", DDL(contacts_version_trigger(operation)))
+
+
+class ContactDuplicate(Base):
+    """A contact the duplicate detection job put into a cluster, one row per member"""
+    __tablename__ = "contact_duplicates"
+
+    contact_id: Mapped[UUID] = mapped_column(ForeignKey("contacts.id", ondelete="CASCADE"), primary_key=True)
+    owner_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"))
+    # smallest contact id of the cluster
+    cluster_id: Mapped[UUID] = mapped_column()
+    # best similarity to another member
+    score = Column(Float, nullable=False)
+    detected_at = Column(DateTime, nullable=False, server_default=func.now())
+
+    __table_args__ = (
+        Index("ix_contact_duplicates_owner_id_cluster_id", "owner_id", "cluster_id"),
+    )
+
+
+class RefreshToken(Base):
+    __tablename__ = "refresh_tokens"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), index=True)
+    token_hash = Column(String(64), unique=True, nullable=False)
+    expires_at = Column(DateTime, nullable=False)
+    revoked = Column(Boolean, nullable=False, default=False)
+
+
+class RevokedToken(Base):
+    __tablename__ = "revoked_tokens"
+
+    jti: Mapped[str] = mapped_column(String(32), primary_key=True)
+    expires_at = Column(DateTime, nullable=False)
+    revoked_at = Column(DateTime, nullable=False, server_default=func.now(), index=True)
@@ -6,9 +6,15 @@ from pydantic import BaseModel
 class Token(BaseModel):
     access_token: str
     token_type: str
+    refresh_token: str | None = None
+
+
+class RefreshTokenIn(BaseModel):
+    refresh_token: str
 
 
 class PayloadData(BaseModel):
     sub: int
     role: str
     exp: datetime.datetime | None = None
+    jti: str | None = None
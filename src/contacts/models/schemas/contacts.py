@@ -1,5 +1,5 @@
 import uuid
-from typing import Optional, List
+from typing import Any, Dict, Optional, List
 
 from pydantic import BaseModel, EmailStr
 
@@ -44,3 +44,40 @@ class ContactInResponse(BaseModel):
 
 class ContactsInResponse(BaseModel):
     contacts: List[ContactWithId]
+    next_cursor: Optional[str] = None
+
+
+class ContactsInBulkCreate(BaseModel):
+    # items are validated one by one, so one bad contact doesn't reject the batch
+    contacts: List[Dict[str, Any]]
+
+
+class BulkItemResult(BaseModel):
+    index: int
+    status_code: int
+    id: Optional[uuid.UUID]
+    detail: Optional[str]
+
+
+class ContactsInBulkResponse(BaseModel):
+    created: int
+    results: List[BulkItemResult]
+
+
+class ContactsAffected(BaseModel):
+    affected: int
+    dry_run: bool
+
+
+class ImportRowError(BaseModel):
+    record: int
+    status_code: int
+    detail: str
+
+
+class ContactsImportReport(BaseModel):
+    accepted: int = 0
+    rejected: int = 0
+    duplicated: int = 0
+    # the first few rejections only, an import may reject millions of rows
+    errors: List[ImportRowError] = []
@@ -1,3 +1,4 @@
+import uuid
 from enum import Enum
 from typing import Optional
 
@@ -19,6 +20,11 @@ class OrderContactsByEnum(str, Enum):
     phone_number = 'phone_number'
 
 
+class ExportFormatEnum(str, Enum):
+    csv = 'csv'
+    vcf = 'vcf'
+
+
 class ContactsFilterParams(BaseModel):
     owner_id: Optional[int]
     last_name: Optional[str]
@@ -28,3 +34,20 @@ class ContactsFilterParams(BaseModel):
     organisation: Optional[str]
     email: Optional[EmailStr]
     phone_number: Optional[str]
+
+
+class ContactsCursor(BaseModel):
+    """Last row of a page, the next page starts right after it"""
+    order_by: OrderContactsByEnum
+    value: str
+    id: uuid.UUID
+
+    class Config:
+        use_enum_values = True
+
+
+class ContactsSearchCursor(BaseModel):
+    """Last match of a search page, the next page starts right after it"""
+    query: str
+    rank: float
+    id: uuid.UUID
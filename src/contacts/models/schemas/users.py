@@ -1,3 +1,5 @@
+from typing import Optional
+
 from pydantic import BaseModel
 
 from .meta import UserRoleEnum
@@ -16,6 +18,7 @@ class UserInResponse(BaseModel):
 
 
 class UserInCreate(BaseUser):
+    id: Optional[int]
     username: str
     password: str
 
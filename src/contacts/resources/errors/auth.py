@@ -17,7 +17,20 @@ MALFORMED_TOKEN_EXCEPTION = HTTPException(
     status_code=401,
     detail="Malformed token",
 )
+REVOKED_TOKEN_EXCEPTION = HTTPException(
+    status_code=401,
+    detail="Token has been revoked",
+)
 INCORRECT_CREDENTIALS_EXCEPTION = HTTPException(
     status_code=401,
     detail="Incorrect username or password",
 )
+INVALID_REFRESH_TOKEN_EXCEPTION = HTTPException(
+    status_code=401,
+    detail="Invalid refresh token",
+)
+PASSWORD_HASHER_BUSY_EXCEPTION = HTTPException(
+    status_code=503,
+    detail="Too many authentication requests, try again later",
+    headers={"Retry-After": "1"},
+)
@@ -21,3 +21,47 @@ ORDER_PARAMS_EXCEPTION = HTTPException(
     status_code=400,
     detail="Incorrect order parameters",
 )
+PAGE_SIZE_EXCEPTION = HTTPException(
+    status_code=400,
+    detail="Incorrect page size",
+)
+INVALID_CURSOR_EXCEPTION = HTTPException(
+    status_code=400,
+    detail="Invalid cursor",
+)
+BULK_SIZE_EXCEPTION = HTTPException(
+    status_code=400,
+    detail="Too many contacts in one request",
+)
+INVALID_CONTACT_EXCEPTION = HTTPException(
+    status_code=422,
+    detail="Invalid contact",
+)
+DUPLICATE_PHONE_NUM_EXCEPTION = HTTPException(
+    status_code=409,
+    detail="Phone number repeats within the request",
+)
+UNSUPPORTED_IMPORT_FORMAT_EXCEPTION = HTTPException(
+    status_code=415,
+    detail="Import accepts text/csv or text/vcard",
+)
+EXPORT_FORMAT_EXCEPTION = HTTPException(
+    status_code=400,
+    detail="Incorrect export format",
+)
+FILTER_REQUIRED_EXCEPTION = HTTPException(
+    status_code=400,
+    detail="At least one filter is required",
+)
+FILTERED_PHONE_NUM_UPDATE_EXCEPTION = HTTPException(
+    status_code=400,
+    detail="Phone number can't be set on every contact matching a filter",
+)
+SEARCH_QUERY_EXCEPTION = HTTPException(
+    status_code=400,
+    detail="Nothing to search for",
+)
+DUPLICATE_DETECTION_RUNNING_EXCEPTION = HTTPException(
+    status_code=409,
+    detail="Duplicate detection is already running",
+)
@@ -14,3 +14,7 @@ USER_CONTACT_OWNERSHIP_EXCEPTION = HTTPException(
     detail="User doesn't own this contact",
 )
 
+ADMIN_RIGHTS_EXCEPTION = HTTPException(
+    status_code=403,
+    detail="Admin rights required",
+)
@@ -1,4 +1,6 @@
 import asyncio
+import contextlib
+from typing import Iterator
 from uuid import UUID
 
 import pytest
@@ -10,7 +12,7 @@ from sqlalchemy.ext.asyncio import (
     AsyncSession,
 )
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy import insert
+from sqlalchemy import insert, event
 from sqlalchemy.future import select
 from sqlalchemy.engine import ScalarResult
 from httpx import AsyncClient
@@ -20,7 +22,7 @@ from src.contacts.core.settings import get_settings
 from src.contacts.main import get_app
 from src.contacts.models.db.tables import Base
 from src.contacts.helpers.security import hash_password
-from src.contacts.models.db.tables import User, Contact
+from src.contacts.models.db.tables import User, Contact, ContactDuplicate
 from . import model_generator
 
 # APP
@@ -154,6 +156,17 @@ async def create_contact(
         return contact
 
 
+async def get_contact_duplicates(owner_id: int) -> list[tuple[UUID, UUID]]:
+    """(contact_id, cluster_id) of the owner's detected duplicates"""
+    async with ASYNC_SESSION() as session, session.begin():
+        result = await session.execute(
+            select(ContactDuplicate.contact_id, ContactDuplicate.cluster_id).
+            where(ContactDuplicate.owner_id == owner_id)
+        )
+
+    return [tuple(row) for row in result]
+
+
 async def get_access_token(username: str, password: str) -> str:
     async with AsyncClient(app=APP, base_url=API_URL) as client:
         data = {
@@ -169,3 +182,35 @@ def get_headers(token: str) -> dict:
     return {
         "Authorization": "Bearer " + token,
     }
+
+
+@contextlib.contextmanager
+def count_checkouts() -> Iterator[dict]:
+    """Counts connections the application checks out of its pool"""
+    pool = APP.state.engine.sync_engine.pool
+    counter = {"checkouts": 0}
+
+    def on_checkout(*args) -> None:
+        counter["checkouts"] += 1
+
+    event.listen(pool, "checkout", on_checkout)
+    try:
+        yield counter
+    finally:
+        event.remove(pool, "checkout", on_checkout)
+
+
+@contextlib.contextmanager
+def count_statements() -> Iterator[dict]:
+    """Counts statements the application sends to the database"""
+    engine = APP.state.engine.sync_engine
+    counter = {"statements": 0}
+
+    def on_execute(*args) -> None:
+        counter["statements"] += 1
+
+    event.listen(engine, "before_cursor_execute", on_execute)
+    try:
+        yield counter
+    finally:
+        event.remove(engine, "before_cursor_execute", on_execute)
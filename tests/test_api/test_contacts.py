@@ -1,10 +1,31 @@
+import asyncio
+import csv
+import io
+import json
+import os
+import uuid
 from dataclasses import asdict
 
 import pytest
 from httpx import AsyncClient
-
-from ..conftest import create_user, create_contact, get_access_token, get_headers
+from sqlalchemy import text
+
+from ..conftest import (
+    create_user,
+    create_contact,
+    get_access_token,
+    get_headers,
+    get_contact,
+    count_checkouts,
+    count_statements,
+    ASYNC_SESSION,
+    APP,
+)
 from .. import model_generator
+# the module the app's routes run from, src.contacts.api.contacts is a copy
+from contacts.api import contacts as contacts_api
+from src.contacts.helpers.address_book import AddressBooks
+from src.contacts.helpers.prefix_index import ContactPrefixIndex
 from src.contacts.models.schemas.meta import UserRoleEnum
 from src.contacts.resources.errors.contacts import (
     PHONE_NUM_LEN_EXCEPTION,
@@ -12,6 +33,16 @@ from src.contacts.resources.errors.contacts import (
     USER_HAS_PHONE_NUM_EXCEPTION,
     ORDER_PARAMS_EXCEPTION,
     CONTACT_DOES_NOT_EXIST_EXCEPTION,
+    PAGE_SIZE_EXCEPTION,
+    INVALID_CURSOR_EXCEPTION,
+    BULK_SIZE_EXCEPTION,
+    INVALID_CONTACT_EXCEPTION,
+    DUPLICATE_PHONE_NUM_EXCEPTION,
+    UNSUPPORTED_IMPORT_FORMAT_EXCEPTION,
+    EXPORT_FORMAT_EXCEPTION,
+    FILTER_REQUIRED_EXCEPTION,
+    FILTERED_PHONE_NUM_UPDATE_EXCEPTION,
+    SEARCH_QUERY_EXCEPTION,
 )
 from src.contacts.resources.errors.users import (
     USER_CONTACT_OWNERSHIP_EXCEPTION,
@@ -67,11 +98,13 @@ class TestCreate:
         contact.id = str(contact.id)
         contact.phone_number = contact_in_db.phone_number
 
-        response = await client.post(
-            url="/contacts", json=asdict(contact), headers=get_headers(token)
-        )
+        with count_statements() as counter:
+            response = await client.post(
+                url="/contacts", json=asdict(contact), headers=get_headers(token)
+            )
         assert response.status_code == 409
         assert response.json()["detail"] == USER_HAS_PHONE_NUM_EXCEPTION.detail
+        assert counter["statements"] == 1
 
     @pytest.mark.asyncio
     async def test_201(self, client: AsyncClient):
@@ -91,6 +124,136 @@ class TestCreate:
         assert response.status_code == 201
 
 
+@pytest.mark.usefixtures("create_tables")
+class TestBulkCreate:
+    @pytest.mark.asyncio
+    async def test_per_item_results(self, client: AsyncClient):
+        user = await create_user()
+        existing = await create_contact(owner_id=user.id)
+        token = await get_access_token(username=user.username, password=user.password)
+        contacts = [asdict(model_generator.Contact(owner_id=user.id)) for _ in range(6)]
+        for contact in contacts:
+            contact["id"] = str(contact["id"])
+        contacts[1]["phone_number"] = "123"
+        contacts[2]["email"] = "not-an-email"
+        contacts[3]["phone_number"] = existing.phone_number
+        contacts[4]["phone_number"] = contacts[0]["phone_number"]
+
+        with count_statements() as counter:
+            response = await client.post(url="/contacts/bulk", json={"contacts": contacts}, headers=get_headers(token))
+        assert response.status_code == 200
+        body = response.json()
+        assert body["created"] == 2
+        assert [(item["index"], item["status_code"], item["detail"]) for item in body["results"]] == [
+            (0, 201, None),
+            (1, 422, PHONE_NUM_LEN_EXCEPTION.detail),
+            (2, 422, INVALID_CONTACT_EXCEPTION.detail),
+            (3, 409, USER_HAS_PHONE_NUM_EXCEPTION.detail),
+            (4, 409, DUPLICATE_PHONE_NUM_EXCEPTION.detail),
+            (5, 201, None),
+        ]
+        # one duplicate lookup and one insert for the whole batch
+        assert counter["statements"] == 2
+
+        created = await get_contact(body["results"][5]["id"])
+        assert created.owner_id == user.id
+        assert created.phone_number == contacts[5]["phone_number"]
+
+    @pytest.mark.asyncio
+    async def test_400_too_many(self, client: AsyncClient):
+        user = await create_user()
+        token = await get_access_token(username=user.username, password=user.password)
+        contact = asdict(model_generator.Contact(owner_id=user.id))
+        contact["id"] = str(contact["id"])
+        contacts = [contact] * (APP.state.settings.contacts_bulk_max_size + 1)
+
+        response = await client.post(url="/contacts/bulk", json={"contacts": contacts}, headers=get_headers(token))
+        assert response.status_code == 400
+        assert response.json()["detail"] == BULK_SIZE_EXCEPTION.detail
+
+
+IMPORT_COLUMNS = ("last_name", "first_name", "middle_name", "organisation", "job_title", "email", "phone_number")
+
+
+def csv_line(contact: dict) -> str:
+    return ",".join(contact[column] for column in IMPORT_COLUMNS) + "\n"
+
+
+@pytest.mark.usefixtures("create_tables")
+class TestImport:
+    @pytest.mark.asyncio
+    async def test_csv(self, client: AsyncClient):
+        user = await create_user()
+        existing = await create_contact(owner_id=user.id)
+        token = await get_access_token(username=user.username, password=user.password)
+        contacts = [asdict(model_generator.Contact(owner_id=user.id)) for _ in range(5)]
+        contacts[1]["phone_number"] = "123"
+        contacts[2]["phone_number"] = existing.phone_number
+        contacts[3]["phone_number"] = contacts[0]["phone_number"]
+        body = (",".join(IMPORT_COLUMNS) + "\n" + "".join(map(csv_line, contacts))).encode()
+
+        async def chunks():
+            for start in range(0, len(body), 7):
+                yield body[start:start + 7]
+
+        response = await client.post(
+            url="/contacts/import",
+            content=chunks(),
+            headers={**get_headers(token), "Content-Type": "text/csv; charset=utf-8"},
+        )
+        assert response.status_code == 200
+        assert response.json() == {
+            "accepted": 2,
+            "rejected": 1,
+            "duplicated": 2,
+            "errors": [{"record": 2, "status_code": 422, "detail": PHONE_NUM_LEN_EXCEPTION.detail}],
+        }
+
+        async with ASYNC_SESSION() as session:
+            imported = await session.execute(
+                text("SELECT phone_number, last_name FROM contacts WHERE owner_id = :owner_id"),
+                {"owner_id": user.id},
+            )
+        assert sorted(imported) == sorted([
+            (existing.phone_number, existing.last_name),
+            (contacts[0]["phone_number"], contacts[0]["last_name"]),
+            (contacts[4]["phone_number"], contacts[4]["last_name"]),
+        ])
+
+    @pytest.mark.asyncio
+    async def test_vcard(self, client: AsyncClient):
+        user = await create_user()
+        token = await get_access_token(username=user.username, password=user.password)
+        body = (
+            "BEGIN:VCARD\nVERSION:3.0\nN:Ivanov;Ivan;Ivanovich\nTEL:+7 (999) 123-45-67\n"
+            "EMAIL:ivan@example.com\nEND:VCARD\n"
+            "BEGIN:VCARD\nVERSION:3.0\nN:Petrov;Petr\nEMAIL:petr@example.com\nEND:VCARD\n"
+        )
+
+        response = await client.post(
+            url="/contacts/import",
+            content=body,
+            headers={**get_headers(token), "Content-Type": "text/vcard"},
+        )
+        assert response.status_code == 200
+        report = response.json()
+        assert (report["accepted"], report["rejected"], report["duplicated"]) == (1, 1, 0)
+        assert report["errors"][0]["record"] == 2
+
+    @pytest.mark.asyncio
+    async def test_415(self, client: AsyncClient):
+        user = await create_user()
+        token = await get_access_token(username=user.username, password=user.password)
+
+        response = await client.post(
+            url="/contacts/import",
+            content=b"{}",
+            headers={**get_headers(token), "Content-Type": "application/json"},
+        )
+        assert response.status_code == 415
+        assert response.json()["detail"] == UNSUPPORTED_IMPORT_FORMAT_EXCEPTION.detail
+
+
 @pytest.mark.usefixtures("create_tables")
 class TestRead:
     @pytest.mark.asyncio
@@ -158,8 +321,438 @@ class TestRead:
         contact = await create_contact(owner_id=user.id)
         token = await get_access_token(username=user.username, password=user.password)
 
-        response = await client.get(url="/contacts", headers=get_headers(token))
+        with count_statements() as counter:
+            response = await client.get(url="/contacts", headers=get_headers(token))
         assert response.json()["contacts"][0]["id"] == str(contact.id)
+        # the owner's version, then the page
+        assert counter["statements"] == 2
+
+    @pytest.mark.asyncio
+    async def test_address_book_answers_like_the_database(self, client: AsyncClient):
+        user = await create_user()
+        for organisation in ("Acme", "Initech", "Acme", "Globex", "Acme"):
+            await create_contact(owner_id=user.id, organisation=organisation)
+        token = await get_access_token(username=user.username, password=user.password)
+
+        async def pages(params: dict) -> list:
+            responses, cursor = [], None
+            while True:
+                response = await client.get(
+                    url="/contacts",
+                    params={**params, "limit": 2, **({"cursor": cursor} if cursor else {})},
+                    headers=get_headers(token),
+                )
+                responses.append((response.status_code, response.json(), response.headers.get("ETag")))
+                cursor = response.status_code == 200 and response.json()["next_cursor"]
+                if not cursor:
+                    return responses
+
+        shapes = [
+            {"order_by": order_by, **filters}
+            for order_by in ("last_name", "organisation", "phone_number")
+            for filters in ({}, {"organisation": "Acme"}, {"organisation": "Umbrella"})
+        ]
+        expected = [await pages(params) for params in shapes]
+
+        APP.state.address_books = AddressBooks(budget_bytes=2 ** 20, ttl_s=60, max_contacts=100)
+        try:
+            assert [await pages(params) for params in shapes] == expected
+
+            with count_statements() as counter:
+                response = await client.get(url="/contacts", headers=get_headers(token))
+            assert response.status_code == 200
+            assert counter["statements"] == 0
+
+            contact = model_generator.Contact(owner_id=user.id)
+            contact.id = str(contact.id)
+            await client.post(url="/contacts", json=asdict(contact), headers=get_headers(token))
+            response = await client.get(url="/contacts", params={"limit": 10}, headers=get_headers(token))
+            assert len(response.json()["contacts"]) == 6
+        finally:
+            APP.state.address_books = None
+
+    @pytest.mark.asyncio
+    async def test_address_book_built_before_a_write_is_not_kept(self, client: AsyncClient, monkeypatch):
+        user = await create_user()
+        for _ in range(2):
+            await create_contact(owner_id=user.id)
+        token = await get_access_token(username=user.username, password=user.password)
+        get_owner_address_book = contacts_api.get_owner_address_book
+
+        async def write_while_building(*args, **kwargs):
+            book = await get_owner_address_book(*args, **kwargs)
+            monkeypatch.setattr(contacts_api, "get_owner_address_book", get_owner_address_book)
+            # a write, then another cache miss, land before this build is kept
+            contact = model_generator.Contact(owner_id=user.id)
+            contact.id = str(contact.id)
+            await client.post(url="/contacts", json=asdict(contact), headers=get_headers(token))
+            await client.get(url="/contacts", headers=get_headers(token))
+            return book
+
+        monkeypatch.setattr(contacts_api, "get_owner_address_book", write_while_building)
+        APP.state.address_books = AddressBooks(budget_bytes=2 ** 20, ttl_s=60, max_contacts=100)
+        try:
+            stale = await client.get(url="/contacts", headers=get_headers(token))
+            assert len(stale.json()["contacts"]) == 2
+
+            response = await client.get(url="/contacts", headers=get_headers(token))
+            assert len(response.json()["contacts"]) == 3
+            assert response.headers["ETag"] != stale.headers["ETag"]
+
+            response = await client.get(
+                url="/contacts", headers={**get_headers(token), "If-None-Match": stale.headers["ETag"]},
+            )
+            assert response.status_code == 200
+        finally:
+            APP.state.address_books = None
+
+    @pytest.mark.asyncio
+    async def test_not_modified_until_a_write(self, client: AsyncClient):
+        user = await create_user()
+        await create_contact(owner_id=user.id)
+        token = await get_access_token(username=user.username, password=user.password)
+
+        response = await client.get(url="/contacts", headers=get_headers(token))
+        assert response.status_code == 200
+        etag = response.headers["ETag"]
+        conditional = {**get_headers(token), "If-None-Match": f'"other", {etag}'}
+
+        with count_statements() as counter:
+            response = await client.get(url="/contacts", headers=conditional)
+        assert response.status_code == 304
+        assert response.headers["ETag"] == etag
+        assert counter["statements"] == 1
+
+        response = await client.get(url="/contacts", params={"order_by": "phone_number"}, headers=conditional)
+        assert response.status_code == 200
+        assert response.headers["ETag"] != etag
+
+        await create_contact(owner_id=user.id)
+        response = await client.get(url="/contacts", headers=conditional)
+        assert response.status_code == 200
+        assert len(response.json()["contacts"]) == 2
+        assert response.headers["ETag"] != etag
+
+    @pytest.mark.asyncio
+    async def test_pages_follow_cursor(self, client: AsyncClient):
+        user = await create_user()
+        contacts = [await create_contact(owner_id=user.id) for _ in range(5)]
+        token = await get_access_token(username=user.username, password=user.password)
+
+        pages, params = [], {"order_by": "last_name", "limit": 2}
+        while True:
+            response = await client.get(url="/contacts", params=params, headers=get_headers(token))
+            assert response.status_code == 200
+            pages.append(response.json())
+            if pages[-1]["next_cursor"] is None:
+                break
+            params["cursor"] = pages[-1]["next_cursor"]
+
+        response = await client.get(url="/contacts", params={"order_by": "last_name"}, headers=get_headers(token))
+        desired = [contact["id"] for contact in response.json()["contacts"]]
+        got = [contact["id"] for page in pages for contact in page["contacts"]]
+        assert [len(page["contacts"]) for page in pages] == [2, 2, 1]
+        assert got == desired
+        assert set(got) == {str(contact.id) for contact in contacts}
+
+    @pytest.mark.asyncio
+    async def test_400_page_size(self, client: AsyncClient):
+        user = await create_user()
+        token = await get_access_token(username=user.username, password=user.password)
+
+        for limit in (0, 1_000_000):
+            response = await client.get(url="/contacts", params={"limit": limit}, headers=get_headers(token))
+            assert response.status_code == 400
+            assert response.json()["detail"] == PAGE_SIZE_EXCEPTION.detail
+
+    @pytest.mark.asyncio
+    async def test_400_invalid_cursor(self, client: AsyncClient):
+        user = await create_user()
+        for _ in range(2):
+            await create_contact(owner_id=user.id)
+        token = await get_access_token(username=user.username, password=user.password)
+        response = await client.get(url="/contacts", params={"limit": 1}, headers=get_headers(token))
+        cursor = response.json()["next_cursor"]
+
+        for params in (
+            {"cursor": "not-a-cursor"},
+            {"cursor": cursor, "order_by": "email"},
+        ):
+            response = await client.get(url="/contacts", params=params, headers=get_headers(token))
+            assert response.status_code == 400
+            assert response.json()["detail"] == INVALID_CURSOR_EXCEPTION.detail
+
+
+def current_rss() -> int:
+    with open("/proc/self/statm") as statm:
+        return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+
+async def stream_from_app(path: str, headers: dict, on_chunk) -> int:
+    """
+    Drives the app over ASGI and hands each body chunk to `on_chunk`,
+    unlike the test client that buffers the whole body
+    """
+    scope = {
+        "type": "http",
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": f"{APP.state.settings.api_prefix}{path}",
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(key.lower().encode(), value.encode()) for key, value in headers.items()],
+        "client": ("127.0.0.1", 1),
+        "server": ("127.0.0.1", 8000),
+    }
+    status = {}
+    requested = asyncio.Event()
+
+    async def receive() -> dict:
+        if requested.is_set():
+            # the client stays connected, the app stops listening when it's done
+            await asyncio.Event().wait()
+        requested.set()
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message: dict) -> None:
+        if message["type"] == "http.response.start":
+            status["code"] = message["status"]
+        elif message.get("body"):
+            on_chunk(message["body"])
+
+    await APP(scope, receive, send)
+    return status["code"]
+
+
+@pytest.mark.usefixtures("create_tables")
+class TestStream:
+    @pytest.mark.asyncio
+    async def test_ndjson(self, client: AsyncClient):
+        user = await create_user()
+        contacts = [await create_contact(owner_id=user.id) for _ in range(3)]
+        token = await get_access_token(username=user.username, password=user.password)
+        headers = {**get_headers(token), "Accept": "application/x-ndjson"}
+
+        response = await client.get(url="/contacts", params={"order_by": "email"}, headers=headers)
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/x-ndjson"
+        rows = [json.loads(line) for line in response.text.splitlines()]
+        page = await client.get(url="/contacts", params={"order_by": "email"}, headers=get_headers(token))
+        assert [row["id"] for row in rows] == [contact["id"] for contact in page.json()["contacts"]]
+        assert {row["id"] for row in rows} == {str(contact.id) for contact in contacts}
+        assert set(rows[0]) == {
+            "id", "last_name", "first_name", "middle_name",
+            "organisation", "job_title", "email", "phone_number",
+        }
+
+    @pytest.mark.asyncio
+    async def test_404(self, client: AsyncClient):
+        user = await create_user()
+        token = await get_access_token(username=user.username, password=user.password)
+        headers = {**get_headers(token), "Accept": "application/x-ndjson"}
+
+        response = await client.get(url="/contacts", headers=headers)
+        assert response.status_code == 404
+
+    @pytest.mark.asyncio
+    async def test_memory_stays_flat(self):
+        rows = 500_000
+        user = await create_user()
+        token = await get_access_token(username=user.username, password=user.password)
+        async with ASYNC_SESSION() as session, session.begin():
+            await session.execute(
+                text("""
+                    INSERT INTO contacts (
+                        id, owner_id, last_name, first_name, middle_name,
+                        organisation, job_title, email, phone_number
+                    )
+                    SELECT
+                        gen_random_uuid(), :owner_id, md5(n::text), md5(n::text), md5(n::text),
+                        'org', 'job', md5(n::text) || '@example.com', '7' || lpad(n::text, 10, '0')
+                    FROM generate_series(1, :rows) AS n
+                """),
+                {"owner_id": user.id, "rows": rows},
+            )
+
+        baseline = current_rss()
+        streamed = {"lines": 0, "peak_rss": baseline}
+
+        def on_chunk(chunk: bytes) -> None:
+            streamed["lines"] += chunk.count(b"\n")
+            streamed["peak_rss"] = max(streamed["peak_rss"], current_rss())
+
+        try:
+            status = await stream_from_app(
+                "/contacts",
+                {**get_headers(token), "Accept": "application/x-ndjson"},
+                on_chunk,
+            )
+        finally:
+            async with ASYNC_SESSION() as session, session.begin():
+                await session.execute(text("DELETE FROM contacts WHERE owner_id = :owner_id"), {"owner_id": user.id})
+
+        assert status == 200
+        assert streamed["lines"] == rows
+        # the body alone is ~120 MB, buffering any copy of it would show
+        assert streamed["peak_rss"] - baseline < 32 * 1024 * 1024
+
+
+@pytest.mark.usefixtures("create_tables")
+class TestSearch:
+    @pytest.mark.asyncio
+    async def test_ranked_pages(self, client: AsyncClient):
+        word = f"zq{uuid.uuid4().hex[:8]}"
+        user = await create_user()
+        by_email = await create_contact(owner_id=user.id, email=f"{word}@example.com")
+        by_name = await create_contact(owner_id=user.id, last_name=f"{word}ov")
+        by_organisation = await create_contact(owner_id=user.id, organisation=f"{word} Inc")
+        await create_contact(owner_id=user.id)
+        someones = await create_contact(owner_id=(await create_user()).id, last_name=word)
+        token = await get_access_token(username=user.username, password=user.password)
+
+        pages, params = [], {"q": word.upper(), "limit": 2}
+        while True:
+            response = await client.get(url="/contacts/search", params=params, headers=get_headers(token))
+            assert response.status_code == 200
+            pages.append(response.json())
+            if pages[-1]["next_cursor"] is None:
+                break
+            params["cursor"] = pages[-1]["next_cursor"]
+
+        # names outrank the workplace, which outranks the email
+        assert [contact["id"] for page in pages for contact in page["contacts"]] == [
+            str(by_name.id), str(by_organisation.id), str(by_email.id),
+        ]
+
+        admin = await create_user(role=UserRoleEnum.admin.value)
+        token = await get_access_token(username=admin.username, password=admin.password)
+        response = await client.get(url="/contacts/search", params={"q": f"{word} inc"}, headers=get_headers(token))
+        assert [contact["id"] for contact in response.json()["contacts"]] == [str(by_organisation.id)]
+        response = await client.get(url="/contacts/search", params={"q": word}, headers=get_headers(token))
+        assert str(someones.id) in [contact["id"] for contact in response.json()["contacts"]]
+
+    @pytest.mark.asyncio
+    async def test_400(self, client: AsyncClient):
+        user = await create_user()
+        token = await get_access_token(username=user.username, password=user.password)
+
+        response = await client.get(url="/contacts/search", params={"q": "&|!"}, headers=get_headers(token))
+        assert response.status_code == 400
+        assert response.json()["detail"] == SEARCH_QUERY_EXCEPTION.detail
+
+
+@pytest.mark.usefixtures("create_tables")
+class TestSuggest:
+    @pytest.mark.asyncio
+    async def test_served_in_process_and_kept_current(self, client: AsyncClient):
+        user = await create_user()
+        ivanov = await create_contact(owner_id=user.id, last_name="Ivanov")
+        await create_contact(owner_id=user.id, last_name="Petrov", first_name="Petr")
+        token = await get_access_token(username=user.username, password=user.password)
+
+        response = await client.get(url="/contacts/suggest", params={"prefix": "IVA"}, headers=get_headers(token))
+        assert [contact["id"] for contact in response.json()["contacts"]] == [str(ivanov.id)]
+
+        contact = asdict(model_generator.Contact(owner_id=user.id, last_name="Ivanenko"))
+        contact["id"] = str(contact["id"])
+        created = (await client.post(url="/contacts", json=contact, headers=get_headers(token))).json()["contact"]
+        await client.delete(url=f"/contacts/{ivanov.id}", headers=get_headers(token))
+
+        with count_statements() as counter:
+            response = await client.get(url="/contacts/suggest", params={"prefix": "iva"}, headers=get_headers(token))
+        assert [contact["id"] for contact in response.json()["contacts"]] == [created["id"]]
+        assert counter["statements"] == 0
+
+        response = await client.get(url="/contacts/suggest", params={"prefix": "zzz"}, headers=get_headers(token))
+        assert response.status_code == 404
+
+    @pytest.mark.asyncio
+    async def test_owner_over_the_budget_is_looked_up_in_the_database(self, client: AsyncClient):
+        user = await create_user()
+        ivanova = await create_contact(owner_id=user.id, last_name="Ivanova", first_name="Anna")
+        ivanov = await create_contact(owner_id=user.id, last_name="Ivanov", first_name="Ivan")
+        await create_contact(owner_id=user.id, last_name="Petrov", first_name="Petr", organisation="100%_Acme")
+        token = await get_access_token(username=user.username, password=user.password)
+
+        contact_index = APP.state.contact_index
+        APP.state.contact_index = ContactPrefixIndex(budget_bytes=1, ttl_s=60)
+        try:
+            for _ in range(3):
+                with count_statements() as counter:
+                    response = await client.get(
+                        url="/contacts/suggest", params={"prefix": "IVAN"}, headers=get_headers(token),
+                    )
+                # ivanov matches on both names, it's suggested once
+                assert [contact["id"] for contact in response.json()["contacts"]] == [str(ivanov.id), str(ivanova.id)]
+                assert counter["statements"] == 1
+            # built once, then the owner is known not to fit
+            assert APP.state.contact_index.stats["misses"] == 1
+            assert APP.state.contact_index.stats["oversized_owners"] == 1
+
+            response = await client.get(
+                url="/contacts/suggest", params={"prefix": "iv", "limit": 1}, headers=get_headers(token),
+            )
+            assert [contact["id"] for contact in response.json()["contacts"]] == [str(ivanov.id)]
+            # wildcards match only themselves
+            response = await client.get(url="/contacts/suggest", params={"prefix": "100%_a"}, headers=get_headers(token))
+            assert len(response.json()["contacts"]) == 1
+            response = await client.get(url="/contacts/suggest", params={"prefix": "1%a"}, headers=get_headers(token))
+            assert response.status_code == 404
+        finally:
+            APP.state.contact_index = contact_index
+
+
+@pytest.mark.usefixtures("create_tables")
+class TestExport:
+    @pytest.mark.asyncio
+    async def test_csv_imports_back(self, client: AsyncClient):
+        user = await create_user()
+        contacts = [await create_contact(owner_id=user.id) for _ in range(3)]
+        token = await get_access_token(username=user.username, password=user.password)
+
+        response = await client.get(
+            url="/contacts/export", params={"format": "csv", "order_by": "email"}, headers=get_headers(token)
+        )
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/csv")
+        rows = list(csv.DictReader(io.StringIO(response.text)))
+        assert [row["id"] for row in rows] == [
+            str(contact.id) for contact in sorted(contacts, key=lambda contact: (contact.email, str(contact.id)))
+        ]
+
+        other = await create_user()
+        token = await get_access_token(username=other.username, password=other.password)
+        response = await client.post(
+            url="/contacts/import",
+            content=response.content,
+            headers={**get_headers(token), "Content-Type": "text/csv"},
+        )
+        assert response.json()["accepted"] == 3
+
+    @pytest.mark.asyncio
+    async def test_vcf(self, client: AsyncClient):
+        user = await create_user()
+        contact = await create_contact(owner_id=user.id)
+        token = await get_access_token(username=user.username, password=user.password)
+
+        response = await client.get(url="/contacts/export", params={"format": "vcf"}, headers=get_headers(token))
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/vcard")
+        assert response.text.count("BEGIN:VCARD") == 1
+        assert f"UID:{contact.id}\r\n" in response.text
+        assert f"TEL:{contact.phone_number}\r\n" in response.text
+
+    @pytest.mark.asyncio
+    async def test_400_format(self, client: AsyncClient):
+        user = await create_user()
+        await create_contact(owner_id=user.id)
+        token = await get_access_token(username=user.username, password=user.password)
+
+        response = await client.get(url="/contacts/export", params={"format": "xml"}, headers=get_headers(token))
+        assert response.status_code == 400
+        assert response.json()["detail"] == EXPORT_FORMAT_EXCEPTION.detail
 
 
 @pytest.mark.usefixtures("create_tables")
@@ -185,9 +778,11 @@ class TestUpdate:
         user2 = await create_user()
         user2_contact = await create_contact(owner_id=user2.id)
 
-        response = await client.put(url=f"/contacts/{user2_contact.id}", headers=get_headers(token), json=asdict(contact_update))
+        with count_statements() as counter:
+            response = await client.put(url=f"/contacts/{user2_contact.id}", headers=get_headers(token), json=asdict(contact_update))
         assert response.status_code == 403
         assert response.json()["detail"] == USER_CONTACT_OWNERSHIP_EXCEPTION.detail
+        assert counter["statements"] == 2
 
     @pytest.mark.asyncio
     async def test_user_update_own_contact(self, client: AsyncClient):
@@ -197,8 +792,40 @@ class TestUpdate:
         contact_update = model_generator.Contact(owner_id=user.id)
         contact_update.id = str(contact_update.id)
 
+        with count_statements() as counter:
+            response = await client.put(url=f"/contacts/{contact.id}", headers=get_headers(token), json=asdict(contact_update))
+        assert response.status_code == 204
+        assert counter["statements"] == 1
+
+    @pytest.mark.asyncio
+    async def test_409_number_in_use(self, client: AsyncClient):
+        user = await create_user()
+        token = await get_access_token(user.username, user.password)
+        contact = await create_contact(owner_id=user.id)
+        other = await create_contact(owner_id=user.id)
+        contact_update = model_generator.Contact(owner_id=user.id, phone_number=other.phone_number)
+        contact_update.id = str(contact_update.id)
+
         response = await client.put(url=f"/contacts/{contact.id}", headers=get_headers(token), json=asdict(contact_update))
+        assert response.status_code == 409
+        assert response.json()["detail"] == USER_HAS_PHONE_NUM_EXCEPTION.detail
+        assert (await get_contact(contact.id)).phone_number == contact.phone_number
+
+    @pytest.mark.asyncio
+    async def test_single_connection_per_request(self, client: AsyncClient):
+        user = await create_user()
+        token = await get_access_token(user.username, user.password)
+        contact = await create_contact(owner_id=user.id)
+        contact_update = model_generator.Contact(owner_id=user.id)
+        contact_update.id = str(contact_update.id)
+
+        with count_checkouts() as counter:
+            response = await client.put(url=f"/contacts/{contact.id}", headers=get_headers(token), json=asdict(contact_update))
         assert response.status_code == 204
+        assert counter["checkouts"] == 1
+
+        updated = await get_contact(contact.id)
+        assert updated.phone_number == contact_update.phone_number
 
     @pytest.mark.asyncio
     async def test_404(self, client: AsyncClient):
@@ -207,9 +834,88 @@ class TestUpdate:
         non_existing_contact = model_generator.Contact(owner_id=user.id)
         non_existing_contact.id = str(non_existing_contact.id)
 
-        response = await client.put(url=f"/contacts/{non_existing_contact.id}", headers=get_headers(token), json=asdict(non_existing_contact))
+        with count_statements() as counter:
+            response = await client.put(url=f"/contacts/{non_existing_contact.id}", headers=get_headers(token), json=asdict(non_existing_contact))
         assert response.status_code == 404
         assert response.json()["detail"] == CONTACT_DOES_NOT_EXIST_EXCEPTION.detail
+        assert counter["statements"] == 2
+
+
+@pytest.mark.usefixtures("create_tables")
+class TestWriteByFilter:
+    @pytest.mark.asyncio
+    async def test_update_is_scoped_to_owner(self, client: AsyncClient):
+        organisation = model_generator.rand_str()
+        user = await create_user()
+        own = [await create_contact(owner_id=user.id, organisation=organisation) for _ in range(3)]
+        other = await create_contact(owner_id=(await create_user()).id, organisation=organisation)
+        untouched = await create_contact(owner_id=user.id)
+        token = await get_access_token(username=user.username, password=user.password)
+
+        response = await client.patch(
+            url="/contacts",
+            params={"organisation": organisation, "dry_run": True},
+            json={"organisation": "Renamed"},
+            headers=get_headers(token),
+        )
+        assert response.json() == {"affected": 3, "dry_run": True}
+        assert (await get_contact(own[0].id)).organisation == organisation
+
+        with count_statements() as counter:
+            response = await client.patch(
+                url="/contacts",
+                params={"organisation": organisation},
+                json={"organisation": "Renamed"},
+                headers=get_headers(token),
+            )
+        assert response.status_code == 200
+        assert response.json() == {"affected": 3, "dry_run": False}
+        assert counter["statements"] == 1
+        for contact in own:
+            updated = await get_contact(contact.id)
+            assert (updated.organisation, updated.last_name) == ("Renamed", contact.last_name)
+        assert (await get_contact(other.id)).organisation == organisation
+        assert (await get_contact(untouched.id)).organisation == untouched.organisation
+
+    @pytest.mark.asyncio
+    async def test_update_400(self, client: AsyncClient):
+        user = await create_user()
+        contact = await create_contact(owner_id=user.id)
+        token = await get_access_token(username=user.username, password=user.password)
+
+        response = await client.patch(url="/contacts", json={"job_title": "x"}, headers=get_headers(token))
+        assert response.status_code == 400
+        assert response.json()["detail"] == FILTER_REQUIRED_EXCEPTION.detail
+
+        response = await client.patch(
+            url="/contacts",
+            params={"job_title": contact.job_title},
+            json={"phone_number": "89999999999"},
+            headers=get_headers(token),
+        )
+        assert response.status_code == 400
+        assert response.json()["detail"] == FILTERED_PHONE_NUM_UPDATE_EXCEPTION.detail
+
+    @pytest.mark.asyncio
+    async def test_delete(self, client: AsyncClient):
+        job_title = model_generator.rand_str()
+        user = await create_user()
+        own = [await create_contact(owner_id=user.id, job_title=job_title) for _ in range(2)]
+        other = await create_contact(owner_id=(await create_user()).id, job_title=job_title)
+        token = await get_access_token(username=user.username, password=user.password)
+
+        response = await client.delete(url="/contacts", params={"job_title": job_title, "dry_run": True}, headers=get_headers(token))
+        assert response.json() == {"affected": 2, "dry_run": True}
+        assert await get_contact(own[0].id) is not None
+
+        response = await client.delete(url="/contacts", params={"job_title": job_title}, headers=get_headers(token))
+        assert response.json() == {"affected": 2, "dry_run": False}
+        assert [await get_contact(contact.id) for contact in own] == [None, None]
+        assert await get_contact(other.id) is not None
+
+        response = await client.delete(url="/contacts", headers=get_headers(token))
+        assert response.status_code == 400
+        assert response.json()["detail"] == FILTER_REQUIRED_EXCEPTION.detail
 
 
 @pytest.mark.usefixtures("create_tables")
@@ -223,8 +929,10 @@ class TestDelete:
         token = await get_access_token(username=admin.username, password=admin.password)
         contact.id = str(contact.id)
 
-        response = await client.delete(url=f"/contacts/{contact.id}", headers=get_headers(token))
+        with count_statements() as counter:
+            response = await client.delete(url=f"/contacts/{contact.id}", headers=get_headers(token))
         assert response.status_code == 204
+        assert counter["statements"] == 1
 
     @pytest.mark.asyncio
     async def test_user_delete_someones_contact(self, client: AsyncClient):
@@ -235,8 +943,10 @@ class TestDelete:
         user2 = await create_user()
         user2_contact = await create_contact(owner_id=user2.id)
 
-        response = await client.delete(url=f"/contacts/{user2_contact.id}", headers=get_headers(token))
+        with count_statements() as counter:
+            response = await client.delete(url=f"/contacts/{user2_contact.id}", headers=get_headers(token))
         assert response.status_code == 403
+        assert counter["statements"] == 2
         assert response.json()["detail"] == USER_CONTACT_OWNERSHIP_EXCEPTION.detail
 
     @pytest.mark.asyncio
@@ -247,8 +957,10 @@ class TestDelete:
         contact_update = model_generator.Contact(owner_id=user.id)
         contact_update.id = str(contact_update.id)
 
-        response = await client.delete(url=f"/contacts/{contact.id}", headers=get_headers(token))
+        with count_statements() as counter:
+            response = await client.delete(url=f"/contacts/{contact.id}", headers=get_headers(token))
         assert response.status_code == 204
+        assert counter["statements"] == 1
 
     @pytest.mark.asyncio
     async def test_404(self, client: AsyncClient):
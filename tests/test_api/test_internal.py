@@ -0,0 +1,127 @@
+import asyncio
+
+import pytest
+from httpx import AsyncClient
+
+from ..conftest import create_user, get_access_token, get_headers, SETTINGS
+from src.contacts.models.schemas.meta import UserRoleEnum
+from src.contacts.resources.errors.users import ADMIN_RIGHTS_EXCEPTION
+from src.contacts.resources.errors.contacts import DUPLICATE_DETECTION_RUNNING_EXCEPTION
+
+
+@pytest.mark.usefixtures("create_tables")
+class TestDbPool:
+    @pytest.mark.asyncio
+    async def test_admin_gets_stats(self, client: AsyncClient):
+        admin = await create_user(role=UserRoleEnum.admin.value)
+        token = await get_access_token(username=admin.username, password=admin.password)
+
+        response = await client.get(url="/internal/db-pool", headers=get_headers(token))
+        assert response.status_code == 200
+        stats = response.json()
+        assert {"size", "checked_out", "idle", "overflow"} <= set(stats)
+        assert stats["acquires"] >= 1
+        assert set(stats["idle_connection_wait_ms"]) == {"p50", "p95", "p99", "max"}
+        assert set(stats["new_connection_ms"]) == {"p50", "p95", "p99", "max"}
+        # the app's pool starts cold, opening connections isn't counted as waiting
+        assert stats["connects"] >= 1
+        assert stats["new_connection_ms"]["max"] > 0
+
+    @pytest.mark.asyncio
+    async def test_user_is_forbidden(self, client: AsyncClient):
+        user = await create_user()
+        token = await get_access_token(username=user.username, password=user.password)
+
+        response = await client.get(url="/internal/db-pool", headers=get_headers(token))
+        assert response.status_code == 403
+        assert response.json()["detail"] == ADMIN_RIGHTS_EXCEPTION.detail
+
+
+@pytest.mark.usefixtures("create_tables")
+class TestCaches:
+    @pytest.mark.asyncio
+    async def test_admin_gets_stats(self, client: AsyncClient):
+        admin = await create_user(role=UserRoleEnum.admin.value)
+        token = await get_access_token(username=admin.username, password=admin.password)
+
+        response = await client.get(url="/internal/caches", headers=get_headers(token))
+        assert response.status_code == 200
+        stats = response.json()
+        assert set(stats) == {"tokens", "users", "contact_prefixes", "address_books"}
+        assert {"size", "max_size", "hits", "misses", "hit_rate"} <= set(stats["users"])
+
+
+@pytest.mark.usefixtures("create_tables")
+class TestRevokedTokens:
+    @pytest.mark.asyncio
+    async def test_admin_gets_measured_fp_rate(self, client: AsyncClient):
+        user = await create_user()
+        token = await get_access_token(username=user.username, password=user.password)
+        await client.post("/auth/logout", headers=get_headers(token))
+        await client.get("/users/me", headers=get_headers(token))
+        admin = await create_user(role=UserRoleEnum.admin.value)
+        admin_token = await get_access_token(username=admin.username, password=admin.password)
+
+        response = await client.get(url="/internal/revoked-tokens", headers=get_headers(admin_token))
+        assert response.status_code == 200
+        stats = response.json()
+        assert stats["entries"] >= 1
+        assert stats["probes"] >= 2
+        assert stats["positives"] - stats["false_positives"] >= 1
+        assert stats["configured_fp_rate"] == SETTINGS.revocation_bloom_fp_rate
+        assert 0 <= stats["measured_fp_rate"] <= 1
+
+
+@pytest.mark.usefixtures("create_tables")
+class TestPasswordHasher:
+    @pytest.mark.asyncio
+    async def test_admin_gets_stats(self, client: AsyncClient):
+        admin = await create_user(role=UserRoleEnum.admin.value)
+        # logging in verifies the password in the pool
+        token = await get_access_token(username=admin.username, password=admin.password)
+
+        response = await client.get(url="/internal/password-hasher", headers=get_headers(token))
+        assert response.status_code == 200
+        stats = response.json()
+        assert stats["calls"] >= 1
+        assert stats["hash_max_ms"] > 0
+        assert 0 <= stats["queue_wait_avg_ms"] <= stats["queue_wait_max_ms"]
+        assert {"rejected", "hash_avg_ms"} <= set(stats)
+
+
+@pytest.mark.usefixtures("create_tables")
+class TestConditionalGets:
+    @pytest.mark.asyncio
+    async def test_admin_gets_not_modified_ratio(self, client: AsyncClient):
+        admin = await create_user(role=UserRoleEnum.admin.value)
+        token = await get_access_token(username=admin.username, password=admin.password)
+        etag = (await client.get(url="/users/me", headers=get_headers(token))).headers["ETag"]
+        await client.get(url="/users/me", headers={**get_headers(token), "If-None-Match": etag})
+
+        response = await client.get(url="/internal/conditional-gets", headers=get_headers(token))
+        assert response.status_code == 200
+        stats = response.json()[f"{SETTINGS.api_prefix}/users/me"]
+        assert stats["tagged"] >= 2
+        assert stats["not_modified"] >= 1
+        assert 0 < stats["not_modified_ratio"] <= stats["revalidated_ratio"] <= 1
+
+
+@pytest.mark.usefixtures("create_tables")
+class TestDuplicates:
+    @pytest.mark.asyncio
+    async def test_admin_runs_detection(self, client: AsyncClient):
+        admin = await create_user(role=UserRoleEnum.admin.value)
+        token = await get_access_token(username=admin.username, password=admin.password)
+
+        response = await client.post(url="/internal/duplicates", headers=get_headers(token))
+        assert response.status_code == 202
+        assert response.json()["running"]
+
+        response = await client.post(url="/internal/duplicates", headers=get_headers(token))
+        assert response.status_code == 409
+        assert response.json()["detail"] == DUPLICATE_DETECTION_RUNNING_EXCEPTION.detail
+
+        while (stats := (await client.get(url="/internal/duplicates", headers=get_headers(token))).json())["running"]:
+            await asyncio.sleep(0.1)
+        assert stats["error"] is None
+        assert stats["finished_at"] is not None
@@ -1,7 +1,8 @@
 import pytest
 from httpx import AsyncClient
+from sqlalchemy import update
 
-from ..conftest import create_user, get_access_token, get_headers
+from ..conftest import create_user, get_access_token, get_headers, count_statements, ASYNC_SESSION, SETTINGS
 from .. import model_generator
 from src.contacts.resources.errors.auth import (
     INCORRECT_CREDENTIALS_EXCEPTION,
@@ -10,7 +11,14 @@ from src.contacts.resources.errors.users import (
     USER_ID_EXIST_EXCEPTION,
     USERNAME_EXIST_EXCEPTION,
 )
-from src.contacts.resources.errors.auth import MALFORMED_TOKEN_EXCEPTION
+from src.contacts.resources.errors.auth import (
+    MALFORMED_TOKEN_EXCEPTION,
+    INVALID_REFRESH_TOKEN_EXCEPTION,
+    REVOKED_TOKEN_EXCEPTION,
+)
+from src.contacts.helpers.security import hash_password, get_hash_rounds
+from src.contacts.db.crud.users import get_user
+from src.contacts.models.db.tables import User
 
 
 @pytest.mark.usefixtures("create_tables")
@@ -56,6 +64,100 @@ class TestAuth:
         assert response.status_code == 401
         assert response.json()["detail"] == MALFORMED_TOKEN_EXCEPTION.detail
 
+    @pytest.mark.asyncio
+    async def test_logout_revokes_token(self, client: AsyncClient):
+        user = await create_user()
+        token = await get_access_token(username=user.username, password=user.password)
+        another_token = await get_access_token(username=user.username, password=user.password)
+
+        response = await client.get("/users/me", headers=get_headers(token))
+        assert response.status_code == 200
+
+        response = await client.post("/auth/logout", headers=get_headers(token))
+        assert response.status_code == 204
+
+        response = await client.get("/users/me", headers=get_headers(token))
+        assert response.status_code == 401
+        assert response.json()["detail"] == REVOKED_TOKEN_EXCEPTION.detail
+
+        response = await client.get("/users/me", headers=get_headers(another_token))
+        assert response.status_code == 200
+
+    @pytest.mark.asyncio
+    async def test_rehash_on_login(self, client: AsyncClient):
+        user = await create_user()
+        outdated_rounds = 4 if SETTINGS.bcrypt_rounds != 4 else 5
+        async with ASYNC_SESSION() as session, session.begin():
+            await session.execute(
+                update(User).
+                where(User.id == user.id).
+                values(hashed_password=hash_password(user.password, rounds=outdated_rounds))
+            )
+        data = {
+            'username': user.username,
+            'password': user.password,
+        }
+
+        response = await client.post(url="/auth/token", data=data)
+        assert response.status_code == 200
+
+        user_in_db = await get_user(session=ASYNC_SESSION(), id=user.id)
+        assert get_hash_rounds(user_in_db.hashed_password) == SETTINGS.bcrypt_rounds
+
+
+@pytest.mark.usefixtures("create_tables")
+class TestRefresh:
+    async def login(self, client: AsyncClient) -> dict:
+        user = await create_user()
+        data = {
+            'username': user.username,
+            'password': user.password,
+        }
+        response = await client.post(url="/auth/token", data=data)
+        assert response.status_code == 200
+
+        return response.json()
+
+    @pytest.mark.asyncio
+    async def test_refresh(self, client: AsyncClient):
+        tokens = await self.login(client)
+
+        response = await client.post(url="/auth/refresh", json={"refresh_token": tokens["refresh_token"]})
+        assert response.status_code == 200
+        refreshed = response.json()
+        assert refreshed["refresh_token"] != tokens["refresh_token"]
+
+        response = await client.get(url="/users/me", headers=get_headers(refreshed["access_token"]))
+        assert response.status_code == 200
+
+    @pytest.mark.asyncio
+    async def test_reused_token_revokes_all_sessions(self, client: AsyncClient):
+        tokens = await self.login(client)
+        response = await client.post(url="/auth/refresh", json={"refresh_token": tokens["refresh_token"]})
+        rotated = response.json()["refresh_token"]
+
+        response = await client.post(url="/auth/refresh", json={"refresh_token": tokens["refresh_token"]})
+        assert response.status_code == 401
+        assert response.json()["detail"] == INVALID_REFRESH_TOKEN_EXCEPTION.detail
+
+        response = await client.post(url="/auth/refresh", json={"refresh_token": rotated})
+        assert response.status_code == 401
+
+    @pytest.mark.asyncio
+    async def test_revoke(self, client: AsyncClient):
+        tokens = await self.login(client)
+
+        response = await client.post(url="/auth/revoke", json={"refresh_token": tokens["refresh_token"]})
+        assert response.status_code == 204
+
+        response = await client.post(url="/auth/refresh", json={"refresh_token": tokens["refresh_token"]})
+        assert response.status_code == 401
+
+    @pytest.mark.asyncio
+    async def test_unknown_token(self, client: AsyncClient):
+        response = await client.post(url="/auth/refresh", json={"refresh_token": "unknown"})
+        assert response.status_code == 401
+
 
 @pytest.mark.usefixtures("create_tables")
 class TestRegister:
@@ -114,3 +216,30 @@ class TestGet:
 
         response = await client.get(url="/users/me", headers=get_headers(token))
         assert response.status_code == 200
+
+    @pytest.mark.asyncio
+    async def test_get_me_is_cached(self, client: AsyncClient):
+        user = await create_user()
+        token = await get_access_token(username=user.username, password=user.password)
+
+        # the login already cached the user
+        with count_statements() as counter:
+            response = await client.get(url="/users/me", headers=get_headers(token))
+        assert response.status_code == 200
+        assert response.json()["user"]["username"] == user.username
+        assert counter["statements"] == 0
+
+    @pytest.mark.asyncio
+    async def test_get_me_not_modified(self, client: AsyncClient):
+        user = await create_user()
+        token = await get_access_token(username=user.username, password=user.password)
+
+        response = await client.get(url="/users/me", headers=get_headers(token))
+        etag = response.headers["ETag"]
+
+        with count_statements() as counter:
+            response = await client.get(url="/users/me", headers={**get_headers(token), "If-None-Match": etag})
+        assert response.status_code == 304
+        assert response.headers["ETag"] == etag
+        assert response.content == b""
+        assert counter["statements"] == 0
@@ -18,6 +18,7 @@ from src.contacts.db.crud.contacts import (
     get_user_contacts_with_filters,
     update_contact,
     delete_contact,
+    select_contacts_stmt,
 )
 
 
@@ -34,6 +35,19 @@ class TestCreate:
 
         assert created_contact == contact
 
+    @pytest.mark.asyncio
+    async def test_formatted_number_conflicts(self):
+        user = await create_user_()
+        stored = await create_contact_(owner_id=user.id, phone_number="79991234567")
+        contact = ContactInDb(**asdict(Contact(owner_id=user.id, phone_number="+7 (999) 123-45-67")))
+        created_contact = await create_contact(
+            db_session=ASYNC_SESSION(), contact=contact
+        )
+
+        assert created_contact is None
+        assert await get_contact_(contact.id) is None
+        assert await get_contact_(stored.id) is not None
+
 
 @pytest.mark.usefixtures("create_tables")
 class TestRead:
@@ -89,6 +103,25 @@ class TestRead:
         assert len(got_contacts) == 3
 
 
+    @pytest.mark.asyncio
+    async def test_filter_shape_reuses_statement(self):
+        user = await create_user_(**asdict(User()))
+        contact_model = Contact(owner_id=user.id)
+        await create_contact_(**asdict(contact_model))
+        select_contacts_stmt.cache_clear()
+
+        for last_name in (contact_model.last_name, "Unknown"):
+            await get_user_contacts_with_filters(
+                user_id=user.id,
+                filter_params=ContactsFilterParams(last_name=last_name),
+                order_by="last_name",
+                db_session=ASYNC_SESSION(),
+            )
+
+        cache_info = select_contacts_stmt.cache_info()
+        assert (cache_info.misses, cache_info.hits) == (1, 1)
+
+
 @pytest.mark.usefixtures("create_tables")
 class TestUpdate:
     @pytest.mark.asyncio
@@ -130,6 +163,31 @@ class TestUpdate:
 
         assert updated == desired
 
+    @pytest.mark.asyncio
+    async def test_update_returns_contact(self):
+        user = await create_user_(**asdict(User()))
+        contact = await create_contact_(owner_id=user.id)
+        updated = await update_contact(
+            db_session=ASYNC_SESSION(),
+            id=contact.id,
+            last_name="updated",
+            email="",
+        )
+
+        assert updated.last_name == "updated"
+        assert updated.email == contact.email
+        assert updated.phone_number == contact.phone_number
+
+    @pytest.mark.asyncio
+    async def test_update_non_existing_contact(self):
+        updated = await update_contact(
+            db_session=ASYNC_SESSION(),
+            id=uuid.uuid4(),
+            last_name="updated",
+        )
+
+        assert updated is None
+
 
 @pytest.mark.usefixtures("create_tables")
 class TestDelete:
@@ -2,7 +2,7 @@ from dataclasses import asdict
 
 import pytest
 
-from src.contacts.db.crud.users import get_user, create_user
+from src.contacts.db.crud.users import get_user, create_user, update_user_password
 from src.contacts.helpers.security import hash_password, passwords_match
 from src.contacts.models.db.entities import UserInDb
 from ..conftest import create_tables, ASYNC_SESSION, create_user as fixture_create_user
@@ -21,6 +21,30 @@ class TestCreate:
 
         assert created_user == init_user
 
+    @pytest.mark.asyncio
+    async def test_create_user_without_id(self):
+        user_model = User()
+        init_user = UserInDb(
+            username=user_model.username,
+            hashed_password=hash_password('123'),
+            role=user_model.role,
+        )
+        created_user = await create_user(session=ASYNC_SESSION(), user=init_user)
+
+        assert created_user.id is not None
+        assert created_user.username == init_user.username
+
+    @pytest.mark.asyncio
+    async def test_create_taken_username(self):
+        existing_user = await fixture_create_user(**asdict(User()))
+        user = UserInDb(
+            hashed_password=hash_password('123'),
+            **{**asdict(User()), "username": existing_user.username},
+        )
+        created_user = await create_user(session=ASYNC_SESSION(), user=user)
+
+        assert created_user is None
+
 
 @pytest.mark.usefixtures("create_tables")
 class TestGet:
@@ -73,3 +97,35 @@ class TestGet:
         got_user = await get_user(session=ASYNC_SESSION(), username='404')
 
         assert got_user is None
+
+
+@pytest.mark.usefixtures("create_tables")
+class TestUpdate:
+    @pytest.mark.asyncio
+    async def test_update_password(self):
+        user = await fixture_create_user()
+        new_hash = hash_password("new", rounds=4)
+        updated = await update_user_password(
+            session=ASYNC_SESSION(),
+            id=user.id,
+            hashed_password=new_hash,
+            old_hashed_password=user.hashed_password,
+        )
+        got_user = await get_user(session=ASYNC_SESSION(), id=user.id)
+
+        assert updated
+        assert got_user.hashed_password == new_hash
+
+    @pytest.mark.asyncio
+    async def test_update_password_with_stale_hash(self):
+        user = await fixture_create_user()
+        updated = await update_user_password(
+            session=ASYNC_SESSION(),
+            id=user.id,
+            hashed_password=hash_password("new", rounds=4),
+            old_hashed_password="stale",
+        )
+        got_user = await get_user(session=ASYNC_SESSION(), id=user.id)
+
+        assert not updated
+        assert got_user.hashed_password == user.hashed_password
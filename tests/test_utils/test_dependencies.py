@@ -1 +1,88 @@
+from dataclasses import asdict
 
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from src.contacts.db.routing import ReplicaRouter, LEAST_CONNECTIONS
+from ..conftest import (
+    APP,
+    ASYNC_ENGINE,
+    NON_CACHED_ASYNC_DB_CONN_STR,
+    create_user,
+    create_contact,
+    get_access_token,
+    get_headers,
+)
+from .. import model_generator
+
+
+def make_engine():
+    return create_async_engine(NON_CACHED_ASYNC_DB_CONN_STR)
+
+
+class TestReplicaRouter:
+    def test_without_replicas_reads_go_to_primary(self):
+        primary = make_engine()
+        router = ReplicaRouter(primary=primary, replicas=[])
+
+        assert router.reader(1) is primary
+
+    def test_round_robin(self):
+        primary, replica1, replica2 = make_engine(), make_engine(), make_engine()
+        router = ReplicaRouter(primary=primary, replicas=[replica1, replica2])
+
+        assert [router.reader(1) for _ in range(4)] == [replica1, replica2, replica1, replica2]
+
+    def test_least_connections(self):
+        primary, replica1, replica2 = make_engine(), make_engine(), make_engine()
+        router = ReplicaRouter(primary=primary, replicas=[replica1, replica2], strategy=LEAST_CONNECTIONS)
+
+        assert router.reader(1) is replica1
+
+    def test_writer_sticks_to_primary(self):
+        primary, replica = make_engine(), make_engine()
+        router = ReplicaRouter(primary=primary, replicas=[replica], sticky_s=60)
+        router.mark_write(1)
+
+        assert router.reader(1) is primary
+        assert router.reader(2) is replica
+
+    def test_stickiness_expires(self):
+        primary, replica = make_engine(), make_engine()
+        router = ReplicaRouter(primary=primary, replicas=[replica], sticky_s=0)
+        router.mark_write(1)
+
+        assert router.reader(1) is replica
+
+
+@pytest.mark.usefixtures("create_tables")
+class TestReadSession:
+    @pytest.mark.asyncio
+    async def test_primary_as_its_own_replica(self, client: AsyncClient):
+        user = await create_user()
+        token = await get_access_token(user.username, user.password)
+        contact = await create_contact(owner_id=user.id)
+        contact_update = model_generator.Contact(owner_id=user.id)
+        contact_update.id = str(contact_update.id)
+
+        replica_checkouts = []
+        on_checkout = lambda *args: replica_checkouts.append(1)
+        event.listen(ASYNC_ENGINE.sync_engine.pool, "checkout", on_checkout)
+        router = APP.state.replica_router
+        APP.state.replica_router = ReplicaRouter(primary=APP.state.engine, replicas=[ASYNC_ENGINE], sticky_s=60)
+        try:
+            response = await client.get(url="/contacts", headers=get_headers(token))
+            assert response.status_code == 200
+            assert len(replica_checkouts) == 1
+
+            response = await client.put(url=f"/contacts/{contact.id}", headers=get_headers(token), json=asdict(contact_update))
+            assert response.status_code == 204
+
+            response = await client.get(url="/contacts", headers=get_headers(token))
+            assert response.json()["contacts"][0]["phone_number"] == contact_update.phone_number
+            assert len(replica_checkouts) == 1
+        finally:
+            APP.state.replica_router = router
+            event.remove(ASYNC_ENGINE.sync_engine.pool, "checkout", on_checkout)
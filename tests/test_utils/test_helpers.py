@@ -1,9 +1,36 @@
+import asyncio
+import uuid
+
 import pytest
+from fastapi import HTTPException
 
 from src.contacts.helpers.auth import authenticate_user
+from src.contacts.helpers.bloom import BloomFilter
+from src.contacts.helpers import imports
+from src.contacts.helpers.imports import csv_records, vcard_records
+from src.contacts.helpers.duplicates import find_duplicates
+from src.contacts.helpers.duplicate_detection import DuplicateDetection
+from src.contacts.db.crud.contacts import delete_contact
+from src.contacts.helpers.prefix_index import ContactPrefixIndex, CONTACT_FIELDS
+from src.contacts.helpers.address_book import AddressBooks, ORDER_FIELDS
+from src.contacts.models.schemas.meta import ContactsCursor
+from src.contacts.helpers.cache import LRUCache, UserCache, UPSERT, DELETE, INVALIDATE
+from src.contacts.models.db.entities import ContactInDb
+from src.contacts.helpers.hashing import PasswordHasher
+from src.contacts.helpers.security import (
+    generate_jwt,
+    verify_jwt,
+    hash_password,
+    get_hash_rounds,
+    needs_rehash,
+    calibrate_bcrypt_rounds,
+)
+from src.contacts.models.schemas.auth import PayloadData
+from src.contacts.models.db.entities import UserInDb
+from src.contacts.resources.errors.auth import PASSWORD_HASHER_BUSY_EXCEPTION
 from src.contacts.helpers.contacts import contact_is_owned_by_user, user_has_contact_with_such_number
 from src.contacts.main import get_app
-from ..conftest import ASYNC_SESSION, create_user, create_contact
+from ..conftest import ASYNC_SESSION, create_user, create_contact, get_contact_duplicates
 from ..model_generator import User, Contact
 
 
@@ -34,6 +61,25 @@ class TestAuth:
         )
         assert user is None
 
+    @pytest.mark.asyncio
+    async def test_success_with_hasher(self):
+        user_pass = User().password
+        user = await create_user(password=user_pass)
+        hasher = PasswordHasher(workers=1, queue_size=1, timeout_s=10)
+        hasher.start()
+        try:
+            user = await authenticate_user(
+                username=user.username,
+                password=user_pass,
+                session=ASYNC_SESSION(),
+                hasher=hasher,
+            )
+        finally:
+            hasher.shutdown()
+
+        assert user is not None
+        assert hasher.stats.calls == 1
+
 
 @pytest.mark.usefixtures("create_tables")
 class TestContacts:
@@ -80,3 +126,483 @@ class TestContacts:
             session=ASYNC_SESSION(),
         )
 
+
+
+class TestTokenCache:
+    def test_verified_token_is_cached(self):
+        cache = LRUCache(max_size=10)
+        token = generate_jwt(PayloadData(sub=1, role="user"), lifespan_min=5, secret="secret")
+
+        first = verify_jwt(token, "secret", cache=cache)
+        second = verify_jwt(token, "secret", cache=cache)
+
+        assert first == second
+        assert (cache.hits, cache.misses) == (1, 1)
+
+    def test_invalid_token_is_not_cached(self):
+        cache = LRUCache(max_size=10)
+        token = generate_jwt(PayloadData(sub=1, role="user"), lifespan_min=5, secret="secret")
+
+        for _ in range(2):
+            with pytest.raises(HTTPException):
+                verify_jwt(token, "another_secret", cache=cache)
+
+        assert len(cache) == 0
+
+    def test_entry_expires(self):
+        now = [100.0]
+        cache = LRUCache(max_size=10, clock=lambda: now[0])
+        cache.set("key", "value", expires_at=110.0)
+        assert cache.get("key") == "value"
+
+        now[0] = 110.0
+        assert cache.get("key") is None
+        assert len(cache) == 0
+
+    def test_least_recently_used_is_evicted(self):
+        cache = LRUCache(max_size=2)
+        expires_at = float("inf")
+        cache.set("a", 1, expires_at)
+        cache.set("b", 2, expires_at)
+        cache.get("a")
+        cache.set("c", 3, expires_at)
+
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+        assert cache.get("c") == 3
+
+
+class TestUserCache:
+    def test_user_is_found_by_both_keys(self):
+        cache = UserCache(max_size=10, ttl_s=60)
+        user = UserInDb(id=1, username="user", hashed_password="hash", role="user")
+        cache.set(user)
+
+        assert cache.get(id=1) == user
+        assert cache.get(username="user") == user
+        assert cache.stats["hit_rate"] == 1.0
+
+    def test_invalidate_drops_both_keys(self):
+        cache = UserCache(max_size=10, ttl_s=60)
+        cache.set(UserInDb(id=1, username="user", hashed_password="hash", role="user"))
+        cache.invalidate(1)
+
+        assert cache.get(id=1) is None
+        assert cache.get(username="user") is None
+
+    def test_entry_expires_after_ttl(self):
+        now = [100.0]
+        cache = UserCache(max_size=10, ttl_s=60, clock=lambda: now[0])
+        cache.set(UserInDb(id=1, username="user", hashed_password="hash", role="user"))
+
+        now[0] = 160.0
+        assert cache.get(id=1) is None
+
+
+class TestPasswordHasher:
+    @pytest.mark.asyncio
+    async def test_hash_and_verify(self):
+        hasher = PasswordHasher(workers=1, queue_size=1, timeout_s=10)
+        hasher.start()
+        try:
+            hashed = await hasher.hash("password")
+            assert await hasher.verify("password", hashed)
+            assert not await hasher.verify("invalid", hashed)
+        finally:
+            hasher.shutdown()
+
+        assert hasher.stats.calls == 3
+
+    @pytest.mark.asyncio
+    async def test_rejects_when_queue_is_full(self):
+        hasher = PasswordHasher(workers=1, queue_size=0, timeout_s=10)
+        hasher.start()
+        try:
+            running = asyncio.create_task(hasher.hash("password"))
+            await asyncio.sleep(0)
+
+            with pytest.raises(HTTPException) as exc_info:
+                await hasher.hash("password")
+            assert exc_info.value.status_code == PASSWORD_HASHER_BUSY_EXCEPTION.status_code
+
+            await running
+        finally:
+            hasher.shutdown()
+
+        assert hasher.stats.rejected == 1
+
+
+class TestBcryptCost:
+    def test_hash_rounds(self):
+        hashed = hash_password("password", rounds=5)
+
+        assert get_hash_rounds(hashed) == 5
+        assert needs_rehash(hashed, rounds=6)
+        assert not needs_rehash(hashed, rounds=5)
+
+    def test_calibration_respects_budget(self):
+        rounds, timings = calibrate_bcrypt_rounds(target_ms=0, min_rounds=4, max_rounds=6, samples=1)
+
+        assert rounds == 4
+        assert list(timings) == [4]
+
+
+class TestBloomFilter:
+    def test_no_false_negatives(self):
+        bloom = BloomFilter(capacity=1000, fp_rate=0.01)
+        items = [str(i) for i in range(1000)]
+        for item in items:
+            bloom.add(item)
+
+        assert all(item in bloom for item in items)
+
+    def test_false_positive_rate(self):
+        bloom = BloomFilter(capacity=10_000, fp_rate=0.01)
+        for i in range(10_000):
+            bloom.add(f"revoked-{i}")
+
+        probes = 50_000
+        false_positives = sum(f"valid-{i}" in bloom for i in range(probes))
+
+        assert false_positives / probes < 0.02
+
+
+def contact_row(last_name: str, first_name: str = "Ivan", organisation: str = "Acme", email: str = "a@b.c") -> tuple:
+    return (uuid.uuid4(), last_name, first_name, "", organisation, "", email, "79990000000")
+
+
+def address_book_row(*args, **kwargs) -> tuple:
+    # the book keeps ids as text
+    row = contact_row(*args, **kwargs)
+    return (str(row[0]), *row[1:])
+
+
+class TestContactPrefixIndex:
+    def test_suggest_in_value_order(self):
+        index = ContactPrefixIndex(budget_bytes=2 ** 20, ttl_s=60)
+        rows = [contact_row("Petrov"), contact_row("Ivanova"), contact_row("Sidorov", email="iv@x.y")]
+        generation = index.begin_build(1)
+        owner = index.build(1, generation, rows)
+
+        # "iv@x.y" sorts before the first name "ivan" everyone shares
+        assert owner.suggest("iv", 1) == [rows[2]]
+        assert len(owner.suggest("ivan", 10)) == 3
+        assert owner.suggest("ivano", 10) == [rows[1]]
+        assert owner.suggest("zzz", 10) == []
+
+    def test_changes_patch_the_index(self):
+        index = ContactPrefixIndex(budget_bytes=2 ** 20, ttl_s=60)
+        row = contact_row("Petrov")
+        generation = index.begin_build(1)
+        index.build(1, generation, [row])
+        contact = ContactInDb(owner_id=1, **dict(zip(CONTACT_FIELDS, row)))
+
+        index.apply([(UPSERT, contact.copy(update={"last_name": "Smirnov"}))])
+        assert index.get(1).suggest("petr", 10) == []
+        assert index.get(1).suggest("smir", 10)[0][1] == "Smirnov"
+
+        index.apply([(DELETE, 1, row[0])])
+        assert index.get(1).suggest("smir", 10) == []
+        assert len(index.get(1)) == 0
+
+        index.apply([(INVALIDATE, 1)])
+        assert index.get(1) is None
+
+    def test_write_during_build_is_not_missed(self):
+        index = ContactPrefixIndex(budget_bytes=2 ** 20, ttl_s=60)
+        generation = index.begin_build(1)
+        index.apply([(INVALIDATE, 1)])
+        index.build(1, generation, [contact_row("Petrov")])
+        assert index.get(1) is None
+
+    def test_later_build_does_not_hide_a_write_from_an_earlier_one(self):
+        index = ContactPrefixIndex(budget_bytes=2 ** 20, ttl_s=60)
+        old, new = contact_row("Petrov"), contact_row("Smirnov")
+        first = index.begin_build(1)
+        index.apply([(UPSERT, ContactInDb(owner_id=1, **dict(zip(CONTACT_FIELDS, new))))])
+        second = index.begin_build(1)
+
+        # the first build read its rows before the write
+        index.build(1, first, [old])
+        assert index.get(1) is None
+        index.build(1, second, [old, new])
+        assert index.get(1).suggest("smir", 10) == [new]
+
+    def test_least_recently_used_owner_is_evicted(self):
+        index = ContactPrefixIndex(budget_bytes=2 ** 20, ttl_s=60)
+        for owner_id in (1, 2):
+            generation = index.begin_build(owner_id)
+            index.build(owner_id, generation, [contact_row(f"name-{i}") for i in range(100)])
+        index.budget_bytes = index.size - 1
+        index.get(1)
+        generation = index.begin_build(3)
+        index.build(3, generation, [contact_row("Petrov")])
+
+        assert index.get(2) is None
+        assert index.get(1) is not None
+        assert index.stats["evictions"] == 1
+
+    def test_owner_over_the_budget_is_remembered(self):
+        now = [0.0]
+        index = ContactPrefixIndex(budget_bytes=1, ttl_s=60, clock=lambda: now[0])
+        generation = index.begin_build(1)
+        owner = index.build(1, generation, [contact_row("Petrov")])
+
+        assert owner.suggest("petr", 10) != []
+        assert index.get(1) is None
+        assert index.oversized(1)
+        assert not index.oversized(2)
+        now[0] = 61
+        assert not index.oversized(1)
+
+    def test_entry_expires(self):
+        now = [0.0]
+        index = ContactPrefixIndex(budget_bytes=2 ** 20, ttl_s=60, clock=lambda: now[0])
+        generation = index.begin_build(1)
+        index.build(1, generation, [contact_row("Petrov")])
+        now[0] = 61
+        assert index.get(1) is None
+
+
+def address_book_ranks(rows: list[tuple]) -> list[list[int]]:
+    """What Postgres numbers rows by under the C collation, NULLs last"""
+    ranks = []
+    for field in ORDER_FIELDS:
+        column = CONTACT_FIELDS.index(field)
+        order = sorted(range(len(rows)), key=lambda n: (rows[n][column] is None, rows[n][column] or "", rows[n][0]))
+        field_ranks = [0] * len(rows)
+        for position, number in enumerate(order):
+            field_ranks[number] = position + 1
+        ranks.append(field_ranks)
+    return ranks
+
+
+class TestAddressBook:
+    def build(self, books: AddressBooks, owner_id: int, rows: list[tuple]):
+        generation = books.begin_build(owner_id)
+        return books.build(owner_id, generation, 7, rows, address_book_ranks(rows))
+
+    def test_pages_follow_order_and_filters(self):
+        books = AddressBooks(budget_bytes=2 ** 20, ttl_s=60, max_contacts=100)
+        rows = [address_book_row(name, organisation=org) for name, org in (
+            ("Petrov", "Acme"), ("Ivanov", "Initech"), ("Sidorov", "Acme"), ("Ivanov", "Acme"),
+        )]
+        book = self.build(books, 1, rows)
+        by_name = sorted(rows, key=lambda row: (row[1], row[0]))
+
+        assert book.version == 7
+        assert book.page({}, "last_name", 10) == by_name
+        assert book.page({}, "last_name", 2) == by_name[:2]
+        after = ContactsCursor(order_by="last_name", value=by_name[1][1], id=by_name[1][0])
+        assert book.page({}, "last_name", 10, after) == by_name[2:]
+
+        acme = [row for row in by_name if row[4] == "Acme"]
+        assert book.page({"organisation": "Acme"}, "last_name", 10) == acme
+        assert book.page({"organisation": "Acme", "last_name": "Ivanov"}, "last_name", 10) == acme[:1]
+        assert book.page({"organisation": "Acme"}, "last_name", 10, after) == [row for row in acme if row in by_name[2:]]
+        assert book.page({"organisation": "Globex"}, "last_name", 10) == []
+
+    def test_cursor_of_a_changed_row_goes_to_the_database(self):
+        books = AddressBooks(budget_bytes=2 ** 20, ttl_s=60, max_contacts=100)
+        row = address_book_row("Petrov")
+        book = self.build(books, 1, [row])
+
+        assert book.page({}, "last_name", 10, ContactsCursor(order_by="last_name", value="Smirnov", id=row[0])) is None
+        assert book.page({}, "last_name", 10, ContactsCursor(order_by="last_name", value="Petrov", id=uuid.uuid4())) is None
+
+    def test_nulls_sort_last_and_end_keyset_pages(self):
+        books = AddressBooks(budget_bytes=2 ** 20, ttl_s=60, max_contacts=100)
+        rows = [address_book_row("Petrov", organisation=None), address_book_row("Ivanov", organisation="Acme")]
+        book = self.build(books, 1, rows)
+
+        assert book.page({}, "organisation", 10) == [rows[1], rows[0]]
+        after = ContactsCursor(order_by="organisation", value="Acme", id=rows[1][0])
+        assert book.page({}, "organisation", 10, after) == []
+
+    def test_writes_drop_the_book(self):
+        books = AddressBooks(budget_bytes=2 ** 20, ttl_s=60, max_contacts=100)
+        row = address_book_row("Petrov")
+        self.build(books, 1, [row])
+        self.build(books, 2, [address_book_row("Ivanov")])
+
+        books.apply([(DELETE, 1, row[0])])
+        assert books.get(1) is None
+        assert books.get(2) is not None
+
+        generation = books.begin_build(2)
+        books.apply([(INVALIDATE, None)])
+        assert books.get(2) is None
+        assert books.build(2, generation, 8, [], [[] for _ in ORDER_FIELDS]) is not None
+        assert books.get(2) is None
+
+    def test_book_read_before_a_write_is_not_kept(self):
+        books = AddressBooks(budget_bytes=2 ** 20, ttl_s=60, max_contacts=100)
+        old, new = address_book_row("Petrov"), address_book_row("Smirnov")
+        first = books.begin_build(1)
+        books.apply([(UPSERT, ContactInDb(owner_id=1, **dict(zip(CONTACT_FIELDS, new))))])
+        second = books.begin_build(1)
+
+        books.build(1, second, 8, [old, new], address_book_ranks([old, new]))
+        books.build(1, first, 7, [old], address_book_ranks([old]))
+        assert books.get(1).version == 8
+        assert books.get(1).page({}, "last_name", 10) == [old, new]
+
+    def test_oversized_owner_is_not_built(self):
+        books = AddressBooks(budget_bytes=2 ** 20, ttl_s=60, max_contacts=1)
+        rows = [address_book_row("Petrov"), address_book_row("Ivanov")]
+
+        assert self.build(books, 1, rows) is None
+        assert books.oversized(1)
+        assert books.get(1) is None
+
+
+async def chunked(data: bytes, size: int):
+    for start in range(0, len(data), size):
+        yield data[start:start + size]
+
+
+class TestImportParsers:
+    @pytest.mark.asyncio
+    async def test_csv_fields_may_span_chunks_and_lines(self):
+        data = (
+            "Last_Name,first_name,job_title\r\n"
+            "Иванов,Иван,\"Head, sales\"\r\n"
+            "\r\n"
+            "Petrov,Petr,\"two\nlines\"\n"
+        ).encode("utf-8")
+        # 3-byte chunks split both lines and multibyte characters
+        records = [record async for record in csv_records(chunked(data, 3))]
+        assert records == [
+            {"last_name": "Иванов", "first_name": "Иван", "job_title": "Head, sales"},
+            {"last_name": "Petrov", "first_name": "Petr", "job_title": "two\nlines"},
+        ]
+
+    @pytest.mark.asyncio
+    async def test_csv_stray_quote_ends_with_its_line(self):
+        data = (
+            "last_name,job_title\n"
+            "Ivanov,27\" monitor buyer\n"
+            + "".join(f"Petrov{n},sales\n" for n in range(5))
+        ).encode("utf-8")
+        records = [record async for record in csv_records(chunked(data, 7))]
+        assert records == [{"last_name": "Ivanov", "job_title": "27\" monitor buyer"}] + [
+            {"last_name": f"Petrov{n}", "job_title": "sales"} for n in range(5)
+        ]
+
+    @pytest.mark.asyncio
+    async def test_csv_unterminated_quote_is_rejected_and_parsing_resumes(self, monkeypatch):
+        monkeypatch.setattr(imports, "CSV_MAX_RECORD_CHARS", 20)
+        data = (
+            "last_name,job_title\n"
+            "Ivanov,\"never closed\n"
+            "Sidorov,sales\n"
+            "Kuznetsov,sales\n"
+            "Petrov,sales\n"
+        ).encode("utf-8")
+        records = [record async for record in csv_records(chunked(data, 7))]
+        assert records == [
+            {"": "Ivanov,\"never closed\nSidorov,sales"},
+            {"last_name": "Kuznetsov", "job_title": "sales"},
+            {"last_name": "Petrov", "job_title": "sales"},
+        ]
+
+    @pytest.mark.asyncio
+    async def test_vcard(self):
+        data = (
+            "BEGIN:VCARD\r\n"
+            "VERSION:3.0\r\n"
+            "N:Ivanov;Ivan;Ivano\r\n"
+            " vich;;\r\n"
+            "ORG:Acme\\, Inc;Sales\r\n"
+            "TEL;TYPE=CELL:+7 (999) 123-45-67\r\n"
+            "TEL;TYPE=WORK:+7 (999) 000-00-00\r\n"
+            "EMAIL:ivan@example.com\r\n"
+            "END:VCARD\r\n"
+            "BEGIN:VCARD\r\n"
+            "N:Petrov;Petr\r\n"
+            "END:VCARD"
+        ).encode("utf-8")
+        records = [record async for record in vcard_records(chunked(data, 5))]
+        assert records == [
+            {
+                "last_name": "Ivanov",
+                "first_name": "Ivan",
+                "middle_name": "Ivanovich",
+                "organisation": "Acme, Inc",
+                "job_title": "",
+                "phone_number": "79991234567",
+                "email": "ivan@example.com",
+            },
+            {
+                "last_name": "Petrov",
+                "first_name": "Petr",
+                "middle_name": "",
+                "organisation": "",
+                "job_title": "",
+            },
+        ]
+
+
+class TestDuplicates:
+    def test_blocks_group_reformatted_copies(self):
+        ids = [uuid.UUID(int=n) for n in range(5)]
+        rows = [
+            (ids[0], 1, "Ivanov", "Ivan", None, "ivan.ivanov@example.com", "79991234567"),
+            (ids[1], 1, "IVANOVA", "ivan", None, "ivanivanov+home@example.com", "89991234567"),
+            # same person for another owner
+            (ids[2], 2, "Ivanov", "Ivan", None, "ivan.ivanov@example.com", "79991234567"),
+            # namesake
+            (ids[3], 1, "Ivanov", "Ivan", None, "vanya@example.com", "79990000000"),
+            (ids[4], 1, "Petrov", "Petr", None, None, "79991112233"),
+        ]
+        duplicates, counters = find_duplicates(rows, threshold=0.85, max_block=10)
+
+        assert {(contact_id, cluster_id) for contact_id, _, cluster_id, _ in duplicates} == {
+            (ids[0], ids[0]),
+            (ids[1], ids[0]),
+        }
+        assert all(score >= 0.85 for *_, score in duplicates)
+        assert counters["clusters"] == 1
+
+    def test_oversized_blocks_are_skipped(self):
+        rows = [
+            (uuid.UUID(int=n), 1, "Ivanov", "Ivan", None, None, f"7999000{n:04}")
+            for n in range(3)
+        ]
+        duplicates, counters = find_duplicates(rows, threshold=0.5, max_block=2)
+
+        assert duplicates == []
+        assert counters["blocks_skipped"] == 1
+        assert counters["pairs_scored"] == 0
+
+    @pytest.mark.asyncio
+    async def test_job_replaces_owner_results(self):
+        user = await create_user()
+        number = str(uuid.uuid4().int)[:10]
+        original = await create_contact(
+            owner_id=user.id,
+            last_name="Sidorov",
+            first_name="Semen",
+            middle_name="Petrovich",
+            email="semen@example.com",
+            phone_number=f"7{number}",
+        )
+        copy = await create_contact(
+            owner_id=user.id,
+            last_name="SIDOROV",
+            first_name="Semen",
+            middle_name="Petrovich",
+            email="semen+work@example.com",
+            phone_number=f"8{number}",
+        )
+        detection = DuplicateDetection(workers=1, batch_size=100, fetch_size=50, threshold=0.85, max_block=100)
+
+        stats = await detection.run(ASYNC_SESSION)
+        assert stats["error"] is None
+        duplicates = await get_contact_duplicates(user.id)
+        assert {contact_id for contact_id, _ in duplicates} == {original.id, copy.id}
+        assert {cluster_id for _, cluster_id in duplicates} == {min(original.id, copy.id)}
+
+        await delete_contact(ASYNC_SESSION(), copy.id)
+        await detection.run(ASYNC_SESSION)
+        assert await get_contact_duplicates(user.id) == []